@@ -0,0 +1,139 @@
+"""Нагрузочный тест API в процессе: пропускная способность и p50/p99.
+
+Приложение работает через httpx.ASGITransport на рабочей копии базы из
+generate.ensure_db — без сети и отдельного сервера, поэтому замер
+включает FastAPI, сериализацию и базу, но не uvicorn. concurrency
+клиентов параллельно шлют запросы одного сценария; каждый сценарий
+прогоняется без кэша ответов и с ним.
+
+    python bench/bench_api.py --rows 100000 --requests 2000 --json results/api.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from common import percentiles, write_results
+from generate import copy_db, ensure_db
+
+import main
+from blob_store import BlobStore
+from database import Database
+from logs import setup_logging
+from response_cache import ResponseCache
+
+JOB_LIST_URLS = [
+    '/api/jobs',
+    '/api/jobs?location=Dubai',
+    '/api/jobs?search=pytorch',
+    '/api/jobs?position=scientist',
+    '/api/jobs?tags=Docker&tags=Kubernetes',
+    '/api/jobs?salary_min=8000&sort=salary',
+    '/api/jobs?experience_max=2&limit=20',
+]
+
+# Запрос сценария: (метод, url, параметры httpx) по номеру запроса
+Request = Tuple[str, str, dict]
+
+
+def pdf_bytes(i: int, size: int = 64 * 1024) -> bytes:
+    """Уникальный PDF: каждое резюме — новый блоб"""
+    return b'%PDF-1.4\n' + f"% bench {i}\n".encode() + b'0' * size
+
+
+def scenarios(job_ids: List[int], emails: List[str]) -> Dict[str, Callable[[int], Request]]:
+    return {
+        "jobs": lambda i: ('GET', JOB_LIST_URLS[i % len(JOB_LIST_URLS)], {}),
+        "job_by_id": lambda i: ('GET', f'/api/jobs/{job_ids[i % len(job_ids)]}', {}),
+        "stats": lambda i: ('GET', '/api/stats', {}),
+        "applications_get": lambda i: ('GET', '/api/applications', {
+            "params": {"user_email": emails[i % len(emails)]},
+        }),
+        "applications_post": lambda i: ('POST', '/api/applications', {
+            "data": {
+                'job_id': job_ids[i % len(job_ids)], 'name': 'Bench Candidate',
+                'email': f'load{i % 1000}@example.com', 'message': 'Interested in the role',
+            },
+            "files": {'resume': ('cv.pdf', pdf_bytes(i), 'application/pdf')},
+        }),
+    }
+
+
+async def load(client: httpx.AsyncClient, make: Callable[[int], Request], requests: int, concurrency: int) -> dict:
+    """requests запросов в concurrency параллельных клиентах"""
+    latencies, statuses = [], Counter()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            method, url, kwargs = make(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "rps": round(requests / elapsed),
+        **percentiles(latencies),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def run(rows: int, requests: int, concurrency: int, only: List[str]) -> dict:
+    results = {"rows": rows, "requests": requests, "concurrency": concurrency}
+    source = ensure_db(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        main.db = Database(copy_db(source, os.path.join(tmp, 'bench.db')))
+        await main.db.init_db()
+        main.db.add_write_listener(main.invalidate_response_cache)
+        main.outbox.db = main.db
+        main.blob_store = BlobStore(os.path.join(tmp, 'resumes'))
+
+        rnd = random.Random(42)
+        async with main.db.pool.reader() as conn:
+            async with conn.execute("SELECT id FROM jobs") as cursor:
+                job_ids = [row[0] for row in await cursor.fetchall()]
+            async with conn.execute("SELECT DISTINCT email FROM applications") as cursor:
+                emails = [row[0] for row in await cursor.fetchall()] or ['nobody@example.com']
+        job_ids = [rnd.choice(job_ids) for _ in range(1000)]
+
+        transport = httpx.ASGITransport(app=main.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=60) as client:
+                for mode, cache in (("uncached", ResponseCache(enabled=False)), ("cached", ResponseCache())):
+                    main.response_cache = cache
+                    for name, make in scenarios(job_ids, emails).items():
+                        if only and name not in only:
+                            continue
+                        results.setdefault(name, {})[mode] = await load(client, make, requests, concurrency)
+        finally:
+            await main.db.close()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000, help='Размер базы: 10000, 100000, 1000000')
+    parser.add_argument('--requests', type=int, default=2000, help='Запросов на сценарий')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--only', nargs='*', default=[], help='Только эти сценарии')
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+    setup_logging(level='warning')
+
+    results = asyncio.run(run(args.rows, args.requests, args.concurrency, args.only))
+    write_results("api", results, args.json)
+
+
+if __name__ == '__main__':
+    main_cli()
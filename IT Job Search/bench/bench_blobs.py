@@ -0,0 +1,99 @@
+"""Хранилище резюме: дедупликация, кэш вложений и сборка мусора.
+
+Один кандидат откликается на N вакансий с одним и тем же PDF через
+POST /api/applications. Замеряется, сколько файлов легло на диск, время
+сборки письма работодателю без кэша вложения и с ним, и что сборщик
+мусора удаляет блоб только после удаления всех ссылающихся откликов.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+import httpx
+
+from common import Timer, make_job, write_results
+
+import main
+from blob_store import BlobStore
+from confiq import settings
+from database import Database
+
+
+def pdf_bytes(size: int) -> bytes:
+    return b'%PDF-1.4\n' + os.urandom(size - 9)
+
+
+def count_files(root: str) -> int:
+    return sum(len(files) for _, _, files in os.walk(root))
+
+
+async def run(applications: int, size_kb: int) -> dict:
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            main.db = Database(os.path.join(tmp, 'bench.db'))
+            await main.db.init_db()
+            main.blob_store = BlobStore()
+            job_ids = [await main.db.add_job(make_job(i)) for i in range(applications)]
+            resume = pdf_bytes(size_kb * 1024)
+
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+                for job_id in job_ids:
+                    response = await client.post('/api/applications', data={
+                        'job_id': job_id, 'name': 'Bench', 'email': 'bench@example.com',
+                        'message': 'Hi',
+                    }, files={'resume': ('cv.pdf', resume, 'application/pdf')})
+                    response.raise_for_status()
+
+            results = {
+                "applications": applications,
+                "resume_kb": size_kb,
+                "blob_files_on_disk": count_files(settings.RESUME_BLOB_DIR),
+            }
+
+            job = await main.db.get_job_by_id(job_ids[0])
+            application = await main.db.get_application_by_id(1)
+            service = main.email_service
+            service.resume_parts.clear()
+            with Timer() as t:
+                for _ in range(applications):
+                    service.resume_parts.clear()
+                    (await service.build_application_email(job, application, application.resume_path)).as_bytes()
+            results["build_uncached_ms"] = round(t.elapsed / applications * 1000, 3)
+            with Timer() as t:
+                for _ in range(applications):
+                    (await service.build_application_email(job, application, application.resume_path)).as_bytes()
+            results["build_cached_ms"] = round(t.elapsed / applications * 1000, 3)
+
+            # grace=0: в бенчмарке не нужно ждать, пока файлы «остынут»
+            kept = await main.blob_store.gc(main.db, grace=0)
+            async with main.db.pool.writer() as conn:
+                await conn.execute("DELETE FROM email_outbox")
+                await conn.execute("DELETE FROM applications")
+            collected = await main.blob_store.gc(main.db, grace=0)
+            results["gc_while_referenced"] = kept["blobs_removed"]
+            results["gc_after_delete"] = collected["blobs_removed"]
+            results["blob_files_after_gc"] = count_files(settings.RESUME_BLOB_DIR)
+
+            await main.db.close()
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--applications', type=int, default=30)
+    parser.add_argument('--size-kb', type=int, default=2048)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.applications, args.size_kb))
+    write_results("blobs", results, args.json)
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,86 @@
+"""Кэш ответов: запросы в секунду без кэша и с ним, 304 и инвалидация.
+
+Клиент по кругу запрашивает несколько популярных фильтров /api/jobs,
+карточки вакансий и /api/stats. Затем проверяется, что If-None-Match
+даёт 304, а add_job сразу меняет ответ /api/stats.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+import httpx
+
+from common import Timer, make_job, write_results
+
+import main
+from database import Database
+from response_cache import ResponseCache
+
+HOT_URLS = [
+    '/api/jobs',
+    '/api/jobs?location=Dubai',
+    '/api/jobs?location=dubai&limit=20',
+    '/api/jobs?search=python',
+    '/api/jobs?position=engineer',
+    '/api/stats',
+] + [f'/api/jobs/{i}' for i in range(1, 21)]
+
+
+async def hammer(client: httpx.AsyncClient, requests: int) -> float:
+    with Timer() as t:
+        for i in range(requests):
+            response = await client.get(HOT_URLS[i % len(HOT_URLS)])
+            response.raise_for_status()
+    return requests / t.elapsed
+
+
+async def run(rows: int, requests: int) -> dict:
+    rnd = random.Random(42)
+    results = {"rows": rows, "requests": requests}
+    with tempfile.TemporaryDirectory() as tmp:
+        main.db = Database(os.path.join(tmp, 'bench.db'))
+        await main.db.init_db()
+        main.db.add_write_listener(main.invalidate_response_cache)
+        for start in range(0, rows, 1000):
+            await main.db.add_jobs([make_job(i, rnd) for i in range(start, min(rows, start + 1000))])
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            main.response_cache = ResponseCache(enabled=False)
+            results["uncached_rps"] = round(await hammer(client, requests))
+
+            main.response_cache = ResponseCache()
+            results["cached_rps"] = round(await hammer(client, requests))
+            results["metrics"] = main.response_cache.metrics()
+
+            first = await client.get('/api/stats')
+            again = await client.get('/api/stats', headers={'If-None-Match': first.headers['etag']})
+            results["if_none_match_status"] = again.status_code
+
+            await main.db.add_job(make_job(rows + 1, rnd))
+            after = await client.get('/api/stats', headers={'If-None-Match': first.headers['etag']})
+            results["after_add_job_status"] = after.status_code
+            results["total_jobs_updated"] = (
+                after.status_code == 200 and after.json()["total_jobs"] == first.json()["total_jobs"] + 1
+            )
+
+        await main.db.close()
+    results["speedup"] = round(results["cached_rps"] / results["uncached_rps"], 1)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.requests))
+    write_results("cache", results, args.json)
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,197 @@
+"""Бенчмарк фильтров по зарплате и опыту: разбор строк в Python против индексов.
+
+Базовая линия — то, что пришлось бы делать без числовых колонок: читать
+вакансии в порядке выдачи и разбирать salary/experience каждой строки,
+пока не наберётся страница (для сортировки по зарплате — всю таблицу).
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+
+from common import LOCATIONS, Timer, write_results
+from bench_search import percentile
+
+from compensation import parse_experience, parse_salary
+from database import Database
+from models import JobFilter
+
+SALARIES = (
+    [f"${low}k-{high}k" for low in range(2, 10) for high in range(low + 1, 13)]
+    + [f"{low}000-{low + 2}000 EUR" for low in range(2, 8)]
+    + [f"£{low}0k-{low + 2}0k" for low in range(3, 9)]
+    + [f"${rate}-{rate + 20}/hour" for rate in (30, 40, 50, 60)]
+    + ['Competitive'] * 20
+)
+# Зарплата у одной вакансии из тысячи: редкий диапазон ведёт выборку по индексу
+TOP_SALARY = '$20k-25k'
+EXPERIENCE = ['1-2 years', '1-3 years', '2-3 years', '2-4 years', '3-5 years', '3+ years', '5+ years', '5-7 years']
+QUERIES = {
+    'salary_from_9k': JobFilter(salary_min=9000),
+    'salary_from_12k': JobFilter(salary_min=12_000),
+    'salary_from_20k': JobFilter(salary_min=20_000),
+    'salary_from_9k_junior': JobFilter(salary_min=9000, experience_max=1),
+    'experience_5_plus': JobFilter(experience_min=5, experience_max=10),
+    'salary_3k_4k_dubai': JobFilter(salary_min=3000, salary_max=4000, location='Dubai'),
+}
+
+
+def populate(db_path: str, rows: int, seed: int = 42):
+    """Вставить вакансии со случайными строками опыта и зарплаты"""
+    rnd = random.Random(seed)
+    parsed = {}
+    conn = sqlite3.connect(db_path)
+    batch = []
+    for i in range(rows):
+        experience, salary = rnd.choice(EXPERIENCE), rnd.choice(SALARIES)
+        if i % 1000 == 0:
+            salary = TOP_SALARY
+        if (experience, salary) not in parsed:
+            parsed[experience, salary] = Database.compensation_params(experience, salary)
+        batch.append((
+            'ML Engineer', f"Company {i}", rnd.choice(LOCATIONS), experience, salary,
+            'No description available', 'Python', 't.me/bench', '2024-01-01',
+            'jobs@example.com', '@bench', *parsed[experience, salary],
+        ))
+        if len(batch) == 10_000:
+            conn.executemany(Database.INSERT_JOB_SQL, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(Database.INSERT_JOB_SQL, batch)
+    conn.commit()
+    conn.close()
+
+
+def _matches(filters: JobFilter, experience: str, salary: str, location: str) -> bool:
+    """Тот же фильтр, что и в SQL, но по исходным строкам"""
+    if filters.location and location != filters.location:
+        return False
+    low, high = parse_experience(experience)
+    if filters.experience_max is not None and (low is None or low > filters.experience_max):
+        return False
+    if filters.experience_min is not None and (
+            low is None or (high is not None and high < filters.experience_min)):
+        return False
+    if filters.salary_min is not None or filters.salary_max is not None:
+        parsed = parse_salary(salary)
+        if parsed is None:
+            return False
+        if filters.salary_min is not None and parsed.max < filters.salary_min:
+            return False
+        if filters.salary_max is not None and parsed.min > filters.salary_max:
+            return False
+    return True
+
+
+async def python_page(db: Database, filters: JobFilter, limit: int = 50) -> list:
+    """Страница фильтрацией в Python по мере чтения"""
+    page = []
+    async with db.pool.reader() as conn:
+        async with conn.execute(
+            "SELECT id, experience, salary, location FROM jobs ORDER BY created_at DESC, id DESC"
+        ) as cursor:
+            while len(page) < limit:
+                rows = await cursor.fetchmany(1000)
+                if not rows:
+                    break
+                page.extend(r['id'] for r in rows if _matches(filters, r['experience'], r['salary'], r['location']))
+    return page[:limit]
+
+
+async def python_top_salaries(db: Database, limit: int = 50) -> list:
+    """Первая страница по убыванию зарплаты: разбор всей таблицы"""
+    scored = []
+    async with db.pool.reader() as conn:
+        async with conn.execute("SELECT id, salary FROM jobs") as cursor:
+            async for row in cursor:
+                parsed = parse_salary(row['salary'])
+                if parsed:
+                    scored.append((parsed.max, parsed.min, row['id']))
+    return [job_id for *_, job_id in sorted(scored, reverse=True)[:limit]]
+
+
+def _timings(samples):
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "p99_ms": round(percentile(samples, 0.99), 2),
+    }
+
+
+async def measure(db: Database, repeat: int) -> dict:
+    results = {}
+    for name, filters in QUERIES.items():
+        python_times, indexed_times = [], []
+        for _ in range(repeat):
+            with Timer() as t:
+                expected = await python_page(db, filters)
+            python_times.append(t.elapsed * 1000)
+            with Timer() as t:
+                rows, _ = await db.get_jobs_page(filters, 50, fields=['id'])
+            indexed_times.append(t.elapsed * 1000)
+        assert [r['id'] for r in rows] == expected, name
+        results[name] = {"python": _timings(python_times), "indexed": _timings(indexed_times)}
+
+    python_times, indexed_times, deep_times = [], [], []
+    for _ in range(max(1, repeat // 5)):
+        with Timer() as t:
+            expected = await python_top_salaries(db)
+        python_times.append(t.elapsed * 1000)
+    for _ in range(repeat):
+        with Timer() as t:
+            rows, cursor = await db.get_jobs_page(JobFilter(), 50, fields=['id'], sort='salary')
+        indexed_times.append(t.elapsed * 1000)
+        # Двадцатая страница по курсору
+        with Timer() as t:
+            for _ in range(19):
+                _, cursor = await db.get_jobs_page(JobFilter(), 50, cursor, fields=['id'], sort='salary')
+        deep_times.append(t.elapsed * 1000 / 19)
+    assert [r['id'] for r in rows] == expected
+    results['sort_salary'] = {
+        "python": _timings(python_times),
+        "indexed": _timings(indexed_times),
+        "indexed_next_page": _timings(deep_times),
+    }
+    return results
+
+
+async def run(sizes, repeat: int) -> dict:
+    parse_samples = SALARIES * 100
+    with Timer() as t:
+        for text in parse_samples:
+            parse_salary(text)
+    results = {"parse_salary_per_sec": round(len(parse_samples) / t.elapsed)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            db_path = os.path.join(tmp, f'compensation_{rows}.db')
+            db = Database(db_path)
+            await db.init_db()
+            await db.close()
+            with Timer() as populate_timer:
+                populate(db_path, rows)
+            db = Database(db_path)
+            await db.init_db()
+            results[str(rows)] = {
+                "populate_sec": round(populate_timer.elapsed, 1),
+                "queries": await measure(db, repeat),
+            }
+            await db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.sizes, args.repeat))
+    write_results("compensation", results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Бенчмарк обхода каналов: последовательно против ChannelCrawler.
+
+Использует FakeTelegramClient с задержкой и FloodWait, сеть не нужна.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+from common import Timer, write_results
+from fake_telegram import FakeTelegramClient
+
+from crawler import ChannelCrawler
+from database import Database
+from peer_cache import PeerCache
+from telegram_parser import TelegramParser
+
+
+def make_parser(client: FakeTelegramClient, db: Database = None) -> TelegramParser:
+    parser = TelegramParser(peer_cache=PeerCache(db))
+    parser.client = client
+    return parser
+
+
+async def run(channels: int, latency: float, concurrency: int) -> dict:
+    names = [f"channel_{i}" for i in range(channels)]
+    flood_waits = {names[0]: 1, names[1]: 2}
+
+    client = FakeTelegramClient(latency=latency, flood_waits=flood_waits)
+    parser = make_parser(client)
+    with Timer() as sequential:
+        sequential_jobs = 0
+        for name in names:
+            sequential_jobs += len(await parser.parse_channel(name))
+
+    client = FakeTelegramClient(latency=latency, flood_waits=flood_waits)
+    crawler = ChannelCrawler(
+        make_parser(client), names,
+        max_concurrency=concurrency, min_interval=0, max_flood_wait=30
+    )
+    with Timer() as concurrent:
+        results = await crawler.crawl()
+
+    # Инкрементальный цикл: high-water marks в БД, в каждом канале 5 новых сообщений
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'crawler.db'))
+        await db.init_db()
+        client = FakeTelegramClient(latency=latency / 10)
+        crawler = ChannelCrawler(
+            make_parser(client, db), names, db=db,
+            max_concurrency=concurrency, min_interval=0
+        )
+
+        async def store(result):
+            await db.save_channel_jobs(result.channel, result.jobs, result.last_message_id)
+
+        await crawler.crawl(on_result=store)
+        first_cycle_messages = client.messages_served
+        for name in names:
+            client.post(name, 5)
+        await crawler.crawl(on_result=store)
+        second_cycle_messages = client.messages_served - first_cycle_messages
+        second_cycle_entity_calls = client.entity_calls - len(names)
+
+        # Перезапуск: новый кэш читает access_hash из БД; один канал устарел
+        client.rotate_access_hash(names[0])
+        entity_calls_before = client.entity_calls
+        crawler = ChannelCrawler(
+            make_parser(client, db), names, db=db,
+            max_concurrency=concurrency, min_interval=0
+        )
+        await crawler.crawl(on_result=store)
+        restart_entity_calls = client.entity_calls - entity_calls_before
+        await db.close()
+
+    return {
+        "incremental_first_cycle_messages": first_cycle_messages,
+        "incremental_second_cycle_messages": second_cycle_messages,
+        "incremental_second_cycle_entity_calls": second_cycle_entity_calls,
+        "restart_entity_calls": restart_entity_calls,
+        "channels": channels,
+        "latency_sec": latency,
+        "concurrency": concurrency,
+        "sequential_sec": round(sequential.elapsed, 2),
+        "sequential_jobs": sequential_jobs,
+        "crawler_sec": round(concurrent.elapsed, 2),
+        "crawler_jobs": sum(len(r.jobs) for r in results),
+        "crawler_flood_waits": sum(r.flood_waits for r in results),
+        "crawler_failed_channels": [r.channel for r in results if not r.ok],
+        "max_in_flight": client.max_in_flight,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--channels', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.channels, args.latency, args.concurrency))
+    write_results("crawler", results, args.json)
+
+
+if __name__ == '__main__':
+    main()
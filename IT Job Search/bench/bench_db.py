@@ -0,0 +1,276 @@
+"""Микробенчмарки: разбор поста TelegramParser и каждый публичный метод Database.
+
+Методы вызываются на рабочей копии базы из generate.ensure_db (10k, 100k
+или 1M вакансий). Для каждого случая — ops/s и задержка одного вызова
+p50/p99. Сначала идут чтения, затем записи, чтобы записи не меняли
+данные для чтений. Публичные методы без случая попадают в "uncovered":
+новый метод Database без замера виден в результатах сразу.
+
+    python bench/bench_db.py --rows 100000 --json results/db.json
+"""
+import argparse
+import asyncio
+import inspect
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from common import Timer, percentiles, write_results
+from generate import CHANNELS, PostGenerator, copy_db, ensure_db
+
+from database import Database
+from extraction import JobExtractor
+from logs import setup_logging
+from models import Application, JobFilter
+from telegram_parser import TelegramParser
+from uploads import StoredUpload
+
+# Жизненный цикл базы замеряется отдельно (init_db) или не имеет смысла в цикле
+LIFECYCLE = {'init_db', 'close'}
+
+Case = Tuple[str, str, Callable[[int], Awaitable]]
+
+
+async def _drain(iterator, batches: int = None) -> int:
+    """Прочитать batches пачек асинхронного генератора (все, если None)"""
+    rows = 0
+    async for batch in iterator:
+        rows += len(batch)
+        batches = None if batches is None else batches - 1
+        if batches == 0:
+            break
+    await iterator.aclose()
+    return rows
+
+
+async def measure(call: Callable[[int], Awaitable], iterations: int, budget: float) -> dict:
+    """Вызывать call(i) до iterations раз или budget секунд, но не меньше 5 раз"""
+    samples = []
+    perf_counter = time.perf_counter
+    deadline = perf_counter() + budget
+    for i in range(iterations):
+        started = perf_counter()
+        await call(i)
+        samples.append(perf_counter() - started)
+        if i >= 4 and perf_counter() > deadline:
+            break
+    return {
+        "calls": len(samples),
+        "ops_per_sec": round(len(samples) / sum(samples)),
+        **percentiles(samples),
+    }
+
+
+def bench_parser(posts: List[str], chatter: List[str]) -> dict:
+    """TelegramParser._parse_job_from_text и фильтр по ключевым словам"""
+    parser = TelegramParser()
+    extractor: JobExtractor = parser.extractor
+    date = datetime(2024, 1, 1)
+    results = {}
+    for name, call in (
+        ("parse_job_from_text", lambda text: parser._parse_job_from_text(text, 'bench', date)),
+        ("scan_then_parse", lambda text: parser._parse_job_from_text(text, 'bench', date, extractor.scan(text))),
+    ):
+        samples = []
+        for text in posts:
+            started = time.perf_counter()
+            call(text)
+            samples.append(time.perf_counter() - started)
+        results[name] = {"calls": len(samples), "ops_per_sec": round(len(samples) / sum(samples)), **percentiles(samples)}
+
+    samples = []
+    for text in chatter:
+        started = time.perf_counter()
+        extractor.is_job(text)
+        samples.append(time.perf_counter() - started)
+    results["is_job_chatter"] = {"calls": len(samples), "ops_per_sec": round(len(samples) / sum(samples)), **percentiles(samples)}
+    return results
+
+
+async def prepare(db: Database, generator: PostGenerator, rows: int):
+    """Данные для случаев: id вакансий и откликов, курсор, свежие вакансии"""
+    rnd = random.Random(7)
+    async with db.pool.reader() as conn:
+        async with conn.execute("SELECT id FROM jobs") as cursor:
+            job_ids = [row[0] for row in await cursor.fetchall()]
+        async with conn.execute("SELECT id, email FROM applications") as cursor:
+            applications = [tuple(row) for row in await cursor.fetchall()]
+    _, next_cursor = await db.get_jobs_page(JobFilter(), limit=50)
+
+    extractor = JobExtractor()
+    fresh = []
+    posts = generator.jobs()
+    while len(fresh) < 20_000:
+        text, channel, _ = next(posts)
+        # Даты после сгенерированных: новые строки, а не дубликаты
+        job = extractor.extract(text, channel, datetime(2030, 1, 1 + len(fresh) % 28))
+        if job:
+            fresh.append(job)
+    return {
+        "job_ids": [rnd.choice(job_ids) for _ in range(1000)],
+        "applications": applications,
+        "cursor": next_cursor,
+        "fresh": fresh,
+        "rows": rows,
+    }
+
+
+def read_cases(db: Database, data: dict) -> List[Case]:
+    job_ids, applications = data["job_ids"], data["applications"]
+    pick = lambda i: job_ids[i % len(job_ids)]  # noqa: E731
+    email = applications[0][1] if applications else 'nobody@example.com'
+    return [
+        ("get_jobs", "default", lambda i: db.get_jobs(JobFilter())),
+        ("get_jobs", "location", lambda i: db.get_jobs(JobFilter(location='Dubai'))),
+        ("get_jobs", "search", lambda i: db.get_jobs(JobFilter(search='pytorch'))),
+        ("get_jobs", "tags_all", lambda i: db.get_jobs(JobFilter(tags=['Docker', 'Kubernetes']))),
+        ("get_jobs", "tags_any", lambda i: db.get_jobs(JobFilter(tags=['Spark', 'Hadoop'], tag_mode='any'))),
+        ("get_jobs", "salary_min_15k", lambda i: db.get_jobs(JobFilter(salary_min=15000))),
+        ("get_jobs", "experience_max_1", lambda i: db.get_jobs(JobFilter(experience_max=1))),
+        ("get_jobs_page", "second_page", lambda i: db.get_jobs_page(JobFilter(), cursor=data["cursor"])),
+        ("get_jobs_page", "sort_salary", lambda i: db.get_jobs_page(JobFilter(), sort='salary')),
+        ("get_jobs_page", "fields", lambda i: db.get_jobs_page(JobFilter(), fields=['id', 'title', 'company'])),
+        ("get_tag_facets", "all", lambda i: db.get_tag_facets()),
+        ("get_tag_facets", "location", lambda i: db.get_tag_facets(JobFilter(location='Canada'))),
+        ("get_job_by_id", "random", lambda i: db.get_job_by_id(pick(i))),
+        ("get_job_duplicates", "random", lambda i: db.get_job_duplicates(pick(i))),
+        ("get_stats", "default", lambda i: db.get_stats()),
+        ("get_jobs_daily", "30_days", lambda i: db.get_jobs_daily(30)),
+        ("get_applications", "all", lambda i: db.get_applications()),
+        ("get_applications", "by_email", lambda i: db.get_applications(email)),
+        ("get_application_by_id", "random", lambda i: db.get_application_by_id(
+            applications[i % len(applications)][0] if applications else 1)),
+        ("iter_jobs", "first_batch", lambda i: _drain(db.iter_jobs(), batches=1)),
+        ("iter_jobs", "filtered_all", lambda i: _drain(db.iter_jobs(JobFilter(salary_min=15000)))),
+        ("iter_applications", "all", lambda i: _drain(db.iter_applications())),
+        ("get_import_checkpoint", "missing", lambda i: db.get_import_checkpoint('result.json')),
+        ("get_channel_high_water_marks", "default", lambda i: db.get_channel_high_water_marks()),
+        ("get_ingest_runs", "last_20", lambda i: db.get_ingest_runs()),
+        ("get_lease", "ingest", lambda i: db.get_lease('ingest')),
+        ("get_change_versions", "default", lambda i: db.get_change_versions()),
+        ("get_telegram_peers", "default", lambda i: db.get_telegram_peers()),
+        ("get_due_emails", "limit_50", lambda i: db.get_due_emails(50)),
+        ("get_outbox_stats", "default", lambda i: db.get_outbox_stats()),
+        ("get_unreferenced_blobs", "default", lambda i: db.get_unreferenced_blobs()),
+        ("get_blob_hashes", "default", lambda i: db.get_blob_hashes()),
+    ]
+
+
+def write_cases(db: Database, data: dict) -> List[Case]:
+    fresh, job_ids = data["fresh"], data["job_ids"]
+    state = {"next": 0, "run_id": None, "email_id": None, "application_id": None}
+
+    def take(count: int):
+        start = state["next"]
+        state["next"] += count
+        return [fresh[(start + k) % len(fresh)] for k in range(count)]
+
+    async def add_application(i):
+        state["application_id"] = await db.add_application(Application(
+            job_id=job_ids[i % len(job_ids)], name="Bench", email=f"bench{i}@example.com",
+            message="Hello", resume_path=f"uploads/bench_{i}.pdf", applied_date=datetime.now(),
+        ), emails=['application'], resume=StoredUpload(f"uploads/bench_{i}.pdf", 1024, f"{i:064x}"))
+
+    async def enqueue_email(i):
+        state["email_id"] = await db.enqueue_email('status_update', state["application_id"] or 1, {"status": "viewed"})
+
+    async def start_ingest_run(i):
+        state["run_id"] = await db.start_ingest_run('bench')
+
+    checkpoint = lambda i: {  # noqa: E731
+        'source_file': 'bench.json', 'channel': 'benchimport', 'file_size': 1, 'file_mtime': 1.0,
+        'byte_offset': i, 'last_message_id': i, 'messages_read': i, 'jobs_inserted': 0,
+        'duplicates': 0, 'finished': 0,
+    }
+    return [
+        ("add_job", "single", lambda i: db.add_job(take(1)[0])),
+        ("add_jobs", "batch_100", lambda i: db.add_jobs(take(100))),
+        ("save_channel_jobs", "batch_20", lambda i: db.save_channel_jobs(CHANNELS[0], take(20), 10_000 + i)),
+        ("save_import_batch", "batch_100", lambda i: db.save_import_batch(take(100), checkpoint(i))),
+        ("delete_import_checkpoint", "default", lambda i: db.delete_import_checkpoint('bench.json')),
+        ("add_application", "with_email_and_resume", add_application),
+        ("update_application_status", "viewed", lambda i: db.update_application_status(
+            state["application_id"] or 1, 'viewed')),
+        ("enqueue_email", "status_update", enqueue_email),
+        ("mark_email_failed", "retry", lambda i: db.mark_email_failed(state["email_id"] or 1, 'timeout', time.time() + 60)),
+        ("postpone_email", "connection_error", lambda i: db.postpone_email(
+            state["email_id"] or 1, 'connection refused', time.time() + 60)),
+        ("mark_email_sent", "default", lambda i: db.mark_email_sent(state["email_id"] or 1)),
+        ("delete_unreferenced_blobs", "none_left", lambda i: db.delete_unreferenced_blobs(['0' * 64])),
+        ("start_ingest_run", "default", start_ingest_run),
+        ("save_ingest_channel", "default", lambda i: db.save_ingest_channel(state["run_id"], {
+            'channel': f"bench{i}", 'duration': 0.1, 'messages_fetched': 100, 'jobs_parsed': 10,
+            'jobs_inserted': 5, 'duplicates': 5, 'flood_waits': 0, 'error': None,
+        })),
+        ("finish_ingest_run", "ok", lambda i: db.finish_ingest_run(state["run_id"], 'ok', 1.0)),
+        ("interrupt_ingest_runs", "none_running", lambda i: db.interrupt_ingest_runs()),
+        ("acquire_lease", "renew", lambda i: db.acquire_lease('bench', 'holder', 30)),
+        ("release_lease", "default", lambda i: db.release_lease('bench', 'holder')),
+        ("request_ingest", "default", lambda i: db.request_ingest()),
+        ("save_telegram_peer", "default", lambda i: db.save_telegram_peer(f"channel{i % 50}", 'channel', i, i * 7)),
+        ("delete_telegram_peer", "default", lambda i: db.delete_telegram_peer(f"channel{i % 50}")),
+    ]
+
+
+def uncovered(cases: List[Case]) -> List[str]:
+    """Публичные async-методы Database, для которых нет случая"""
+    covered = {method for method, _, _ in cases} | LIFECYCLE
+    return sorted(
+        name for name, member in inspect.getmembers(Database)
+        if not name.startswith('_') and name not in covered
+        and (inspect.iscoroutinefunction(member) or inspect.isasyncgenfunction(member))
+    )
+
+
+async def bench_database(path: str, generator: PostGenerator, rows: int, iterations: int, budget: float) -> dict:
+    db = Database(path)
+    results: Dict[str, dict] = {}
+    try:
+        with Timer() as t:
+            await db.init_db()
+        results["init_db"] = {"existing_db_ms": round(t.elapsed * 1000, 1)}
+        data = await prepare(db, generator, rows)
+        cases = read_cases(db, data) + write_cases(db, data)
+        for method, label, call in cases:
+            results.setdefault(method, {})[label] = await measure(call, iterations, budget)
+        results["uncovered"] = uncovered(cases)
+    finally:
+        await db.close()
+    return results
+
+
+def run(rows: int, iterations: int, budget: float, posts: int) -> dict:
+    generator = PostGenerator(seed=1)
+    results = {"rows": rows, "iterations": iterations}
+    messages = list(generator.messages(posts * 3))
+    texts = [m["text"] for m in messages if m.get("text")]
+    extractor = JobExtractor()
+    job_texts = [text for text in texts if extractor.is_job(text)]
+    chatter = [text for text in texts if not extractor.is_job(text)]
+    results["parser"] = bench_parser(job_texts, chatter)
+
+    source = ensure_db(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = copy_db(source, os.path.join(tmp, 'bench.db'))
+        results["database"] = asyncio.run(bench_database(path, generator, rows, iterations, budget))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000, help='Размер базы: 10000, 100000, 1000000')
+    parser.add_argument('--iterations', type=int, default=200, help='Вызовов на случай (не больше)')
+    parser.add_argument('--budget', type=float, default=2.0, help='Секунд на случай (не больше)')
+    parser.add_argument('--posts', type=int, default=5000, help='Постов для замера парсера')
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+    setup_logging(level='warning')
+
+    write_results("db", run(args.rows, args.iterations, args.budget, args.posts), args.json)
+
+
+if __name__ == '__main__':
+    main()
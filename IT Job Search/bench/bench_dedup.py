@@ -0,0 +1,75 @@
+"""Бенчмарк поиска почти-дубликатов: скорость загрузки и точность склейки.
+
+Часть вакансий публикуется повторно в другом канале с изменённым
+заголовком и мелкими правками описания — такие должны попасть в
+job_duplicates, а уникальные вакансии — в jobs.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+from common import Timer, make_job, write_results
+
+from database import Database
+
+
+def repost(job, i: int, rnd: random.Random):
+    """Перепост в другом канале: другой заголовок, компания и слово в описании"""
+    words = job.description.split()
+    words[rnd.randrange(len(words))] = rnd.choice(['apply', 'now', 'urgent', 'hot'])
+    return job.model_copy(update={
+        "title": job.title + " (repost)",
+        "company": f"{job.company} via channel {i}",
+        "description": " ".join(words) + " https://t.me/jobs_repost",
+        "source": "t.me/repost",
+    })
+
+
+async def run(rows: int, repost_share: float, batch_size: int) -> dict:
+    rnd = random.Random(42)
+    originals = [make_job(i, rnd) for i in range(rows)]
+    reposts = [
+        repost(job, i, rnd) for i, job in enumerate(originals) if rnd.random() < repost_share
+    ]
+    # Перепосты приходят позже оригиналов
+    jobs = originals + reposts
+    totals = {"inserted": 0, "duplicates": 0, "near_duplicates": 0}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'dedup.db'))
+        await db.init_db()
+        with Timer() as t:
+            for start in range(0, len(jobs), batch_size):
+                result = await db.add_jobs(jobs[start:start + batch_size])
+                for key in totals:
+                    totals[key] += result[key]
+        await db.close()
+
+    return {
+        "rows": len(jobs),
+        "reposts": len(reposts),
+        "rows_per_sec": round(len(jobs) / t.elapsed, 1),
+        **totals,
+        # Доля перепостов, найденных как почти-дубликаты
+        "recall": round(totals["near_duplicates"] / len(reposts), 3) if reposts else None,
+        # Уникальные вакансии, ошибочно склеенные с другими
+        "false_merges": max(0, totals["near_duplicates"] - len(reposts)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repost-share', type=float, default=0.2)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.repost_share, args.batch_size))
+    write_results("dedup", results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""Отправка писем: новое SMTP-соединение на каждое письмо против очереди.
+
+Локальный aiosmtpd заменяет SMTP-сервер; задержка на EHLO имитирует
+стоимость TCP + STARTTLS + AUTH у настоящего сервера. Замеряются
+пропускная способность (писем в минуту) и задержка POST /api/applications,
+который теперь только ставит письмо в очередь.
+
+Требуется aiosmtpd: pip install aiosmtpd
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import time
+from email.mime.text import MIMEText
+
+import aiosmtplib
+import httpx
+from aiosmtpd.controller import Controller
+
+from common import Timer, make_job, write_results
+
+import main
+from database import Database
+from email_service import EmailService, SMTPConnection
+from outbox import EmailOutbox
+
+
+class SlowHandshakeHandler:
+    """Обработчик aiosmtpd: считает письма, EHLO стоит handshake секунд"""
+
+    def __init__(self, handshake: float):
+        self.handshake = handshake
+        self.messages = 0
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        await asyncio.sleep(self.handshake)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return '250 OK'
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(samples, q):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def make_message(i: int) -> MIMEText:
+    message = MIMEText(f"<p>Отклик #{i}</p>", 'html')
+    message['From'] = 'bench@example.com'
+    message['To'] = f'hr{i}@example.com'
+    message['Subject'] = f'Отклик #{i}'
+    return message
+
+
+async def throughput(port: int, count: int) -> dict:
+    latencies = []
+    with Timer() as t:
+        for i in range(count):
+            started = time.perf_counter()
+            await aiosmtplib.send(make_message(i), hostname='127.0.0.1', port=port, start_tls=False)
+            latencies.append((time.perf_counter() - started) * 1000)
+    per_message = {
+        "messages_per_min": round(count / t.elapsed * 60),
+        "send_p50_ms": round(statistics.median(latencies), 2),
+    }
+
+    connection = SMTPConnection('127.0.0.1', port, start_tls=False)
+    latencies = []
+    with Timer() as t:
+        for i in range(count):
+            started = time.perf_counter()
+            await connection.send(make_message(i))
+            latencies.append((time.perf_counter() - started) * 1000)
+    await connection.close()
+    persistent = {
+        "messages_per_min": round(count / t.elapsed * 60),
+        "send_p50_ms": round(statistics.median(latencies), 2),
+        "connects": connection.connects,
+    }
+    return {"per_message_connection": per_message, "persistent_connection": persistent}
+
+
+async def endpoint(port: int, count: int, tmp: str) -> dict:
+    main.db = Database(os.path.join(tmp, 'bench.db'))
+    await main.db.init_db()
+    job_id = await main.db.add_job(make_job(1))
+
+    main.email_service = EmailService()
+    main.email_service.from_email = 'bench@example.com'
+    main.email_service.connection = SMTPConnection('127.0.0.1', port, start_tls=False)
+    main.outbox = EmailOutbox(main.db, main.email_service)
+    main.outbox.start()
+
+    latencies = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        with Timer() as t:
+            for i in range(count):
+                started = time.perf_counter()
+                response = await client.post('/api/applications', data={
+                    'job_id': job_id,
+                    'name': f'Candidate {i}',
+                    'email': f'candidate{i}@example.com',
+                    'message': 'Hello',
+                }, files={'resume': ('cv.pdf', b'%PDF-1.4 bench', 'application/pdf')})
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+            # Ждём, пока очередь опустеет
+            while (await main.db.get_outbox_stats())['pending']:
+                await asyncio.sleep(0.05)
+
+    stats = await main.db.get_outbox_stats()
+    await main.outbox.close()
+    await main.db.close()
+    return {
+        "requests": count,
+        "endpoint_p50_ms": round(statistics.median(latencies), 2),
+        "endpoint_p99_ms": round(percentile(latencies, 0.99), 2),
+        "all_delivered_sec": round(t.elapsed, 2),
+        "outbox": stats,
+        "worker": main.outbox.metrics(),
+    }
+
+
+async def run(count: int, handshake_ms: float) -> dict:
+    handler = SlowHandshakeHandler(handshake_ms / 1000)
+    port = free_port()
+    controller = Controller(handler, hostname='127.0.0.1', port=port)
+    controller.start()
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Резюме сохраняются в uploads/resumes относительно текущего каталога
+            os.makedirs(os.path.join(tmp, 'uploads', 'resumes'))
+            os.chdir(tmp)
+            results = {"messages": count, "handshake_ms": handshake_ms}
+            results.update(await throughput(port, count))
+            results["applications_endpoint"] = await endpoint(port, count, tmp)
+    finally:
+        os.chdir(cwd)
+        controller.stop()
+    results["smtp_sessions"] = handler.sessions
+    results["smtp_messages"] = handler.messages
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--handshake-ms', type=float, default=50)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.messages, args.handshake_ms))
+    write_results("email", results, args.json)
+
+
+if __name__ == '__main__':
+    main_cli()
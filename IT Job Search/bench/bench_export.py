@@ -0,0 +1,95 @@
+"""Потоковая выгрузка вакансий: строк в секунду и пиковая память.
+
+По умолчанию 1M вакансий. Замеряется тот же конвейер, что отдаёт
+GET /api/export/jobs (iter_jobs -> stream_export), без HTTP: тестовый
+ASGI-транспорт httpx собирает весь ответ в памяти и исказил бы замер.
+Пиковая память Python-аллокаций меряется tracemalloc в отдельном
+проходе. Эндпоинт проверяется на небольшой выборке.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import tracemalloc
+
+import httpx
+
+from bench_search import populate
+from common import Timer, write_results
+
+import main
+from confiq import settings
+from database import Database
+from export import FORMATS, encoder_for, stream_export
+
+
+async def export_once(db: Database, fmt: str) -> int:
+    size = 0
+    encode = encoder_for(fmt, Database.JOB_FIELDS)
+    async for chunk in stream_export(db.iter_jobs(), encode):
+        size += len(chunk)
+    return size
+
+
+async def run(rows: int, formats: list) -> dict:
+    results = {"rows": rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        db = Database(path)
+        await db.init_db()
+        await db.close()
+        with Timer() as t:
+            populate(path, rows)
+        results["populate_sec"] = round(t.elapsed, 1)
+
+        db = Database(path)
+        await db.init_db()
+        for fmt in formats:
+            with Timer() as t:
+                size = await export_once(db, fmt)
+            tracemalloc.start()
+            await export_once(db, fmt)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[fmt] = {
+                "rows_per_sec": round(rows / t.elapsed),
+                "seconds": round(t.elapsed, 1),
+                "size_mb": round(size / 2 ** 20, 1),
+                "peak_python_mb": round(peak / 2 ** 20, 1),
+            }
+
+        main.db = db
+        # Выгрузка доступна только администратору
+        settings.ADMIN_TOKEN = settings.ADMIN_TOKEN or 'bench'
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url='http://bench',
+            headers={'X-Admin-Token': settings.ADMIN_TOKEN}
+        ) as client:
+            response = await client.get('/api/export/jobs', params={
+                'format': 'csv', 'search': '"computer vision"', 'location': 'Dubai'
+            })
+            results["endpoint"] = {
+                "status": response.status_code,
+                "content_type": response.headers.get('content-type'),
+                "rows": response.text.count('\n') - 1,
+            }
+            response = await client.get('/api/export/jobs', params={'format': 'xml'})
+            results["endpoint"]["unknown_format_status"] = response.status_code
+        await db.close()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.formats.split(',')))
+    write_results("export", results, args.json)
+
+
+if __name__ == '__main__':
+    main_cli()
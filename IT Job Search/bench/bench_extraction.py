@@ -0,0 +1,86 @@
+"""Микробенчмарк извлечения вакансий и сверка с эталоном.
+
+tests/fixtures/extraction_golden.json записан старой реализацией
+TelegramParser._parse_job_from_text. Все поля должны совпадать, кроме
+тегов: новая реализация ищет их целыми словами, поэтому ложные «R»,
+«Git» в «GitHub» и «Sql» в «NoSQL» пропадают. Такие расхождения
+выводятся отдельно, а появление новых тегов считается ошибкой.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from common import Timer, write_results
+
+from extraction import JobExtractor
+
+# Корпус и эталон общие с tests/test_extraction.py
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+DATE = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def parse(extractor: JobExtractor, text: str):
+    scan = extractor.scan(text) if text else None
+    if not scan or not scan["keywords"]:
+        return None
+    return extractor.extract(text, 'fixture', DATE, scan)
+
+
+def check_golden(extractor: JobExtractor, messages, golden) -> dict:
+    mismatches, fixed_tags = [], []
+    for i, (text, expected) in enumerate(zip(messages, golden)):
+        job = parse(extractor, text)
+        actual = job.model_dump(exclude={'id', 'created_at', 'snippet'}) if job else None
+        if (actual is None) != (expected["job"] is None):
+            mismatches.append({"message": i, "field": "is_job"})
+            continue
+        if actual is None:
+            continue
+        for field, value in expected["job"].items():
+            if field == 'tags':
+                continue
+            if actual[field] != value:
+                mismatches.append({"message": i, "field": field,
+                                   "expected": value, "actual": actual[field]})
+        removed = [t for t in expected["job"]["tags"] if t not in actual["tags"]]
+        added = [t for t in actual["tags"] if t not in expected["job"]["tags"]]
+        if added and actual["tags"] != ['Python', 'Machine Learning']:
+            mismatches.append({"message": i, "field": "tags", "added": added})
+        if removed:
+            fixed_tags.append({"message": i, "removed": removed})
+    return {"mismatches": mismatches, "fixed_false_positive_tags": fixed_tags}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES_DIR, 'extraction_messages.json'), encoding='utf-8') as f:
+        messages = json.load(f)
+    with open(os.path.join(FIXTURES_DIR, 'extraction_golden.json'), encoding='utf-8') as f:
+        golden = json.load(f)
+
+    extractor = JobExtractor()
+    golden_report = check_golden(extractor, messages, golden)
+
+    with Timer() as t:
+        for _ in range(args.repeat):
+            for text in messages:
+                parse(extractor, text)
+
+    results = {
+        "messages": len(messages) * args.repeat,
+        "messages_per_sec": round(len(messages) * args.repeat / t.elapsed, 1),
+        **golden_report,
+    }
+    write_results("extraction", results, args.json)
+    if golden_report["mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
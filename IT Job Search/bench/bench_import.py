@@ -0,0 +1,143 @@
+"""Бенчмарк офлайн-импорта экспорта Telegram Desktop.
+
+Генерирует синтетический result.json, сравнивает пиковую память
+(tracemalloc) потокового чтения и json.load, меряет скорость полного
+импорта и проверяет, что импорт в два запуска (с остановкой и
+продолжением по контрольной точке) даёт те же вакансии, что и за один.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+from common import COMPANIES, LOCATIONS, TITLES, WORDS, Timer, write_results
+
+from database import Database
+from extraction import JOB_KEYWORDS, PRIORITY_LOCATIONS
+from parse_pool import ParsingPool
+from telegram_import import TelegramExportReader, TelegramImporter
+
+CHANNEL = 'benchjobs'
+
+
+def _post(i: int, rnd: random.Random):
+    """Текст вакансии; часть постов — список сущностей, как в экспорте"""
+    title = rnd.choice(TITLES)
+    lines = [
+        f"🚀 Senior {title}",
+        f"Company: {rnd.choice(COMPANIES)} {i}",
+        f"Location: {rnd.choice(LOCATIONS)}",
+        "We are hiring a machine learning engineer to " + " ".join(
+            rnd.choice(WORDS) + rnd.choice(WORDS) for _ in range(15)
+        ),
+        f"Experience: {rnd.randint(1, 3)}-{rnd.randint(4, 6)} years with Python and SQL",
+        f"Salary: ${rnd.randint(3, 6)}k-{rnd.randint(7, 12)}k",
+        f"Contact: jobs{i}@example.com",
+    ]
+    if i % 3:
+        return "\n".join(lines)
+    return [{"type": "bold", "text": lines[0]}, "\n" + "\n".join(lines[1:])]
+
+
+def generate_export(path: str, messages: int, seed: int = 42):
+    """Записать экспорт канала: ~30% вакансий, болтовня и служебные сообщения"""
+    rnd = random.Random(seed)
+    started = datetime(2021, 1, 1)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n "name": "Bench Jobs",\n "type": "public_channel",\n "id": 1234567,\n "messages": [\n')
+        for i in range(1, messages + 1):
+            date = started + timedelta(minutes=7 * i)
+            message = {"id": i, "type": "message", "date": date.isoformat(),
+                       "date_unixtime": str(int(date.timestamp())), "from": "Bench Jobs"}
+            kind = rnd.random()
+            if kind < 0.3:
+                message["text"] = _post(i, rnd)
+            elif kind < 0.95:
+                message["text"] = "Обсуждение {в чате}: " + " ".join(rnd.choice(WORDS) for _ in range(30))
+            else:
+                message = {"id": i, "type": "service", "date": date.isoformat(),
+                           "action": "pin_message", "text": ""}
+            if i > 1:
+                f.write(',\n')
+            f.write('  ' + json.dumps(message, ensure_ascii=False, indent=1).replace('\n', '\n  '))
+        f.write('\n ]\n}\n')
+
+
+async def _import(db_path: str, export: str, batch_size: int, max_messages=None, runs: int = 1):
+    db = Database(db_path)
+    await db.init_db()
+    pool = ParsingPool(JOB_KEYWORDS, PRIORITY_LOCATIONS, workers=0)
+    importer = TelegramImporter(db, pool, batch_size=batch_size, progress_interval=3600)
+    try:
+        for _ in range(runs):
+            checkpoint = await importer.import_file(export, CHANNEL, max_messages=max_messages)
+        async with db.pool.reader() as conn:
+            async with conn.execute("SELECT title, company, posted_date FROM jobs ORDER BY 1, 2, 3") as cursor:
+                rows = [tuple(r) for r in await cursor.fetchall()]
+        marks = await db.get_channel_high_water_marks()
+    finally:
+        pool.close()
+        await db.close()
+    return checkpoint, rows, marks
+
+
+def run(messages: int, batch_size: int) -> dict:
+    results = {"messages": messages, "batch_size": batch_size}
+    with tempfile.TemporaryDirectory() as tmp:
+        export = os.path.join(tmp, 'result.json')
+        generate_export(export, messages)
+        results["file_mb"] = round(os.path.getsize(export) / 2 ** 20, 1)
+
+        with Timer() as t:
+            count = sum(1 for _ in TelegramExportReader(export))
+        assert count == messages
+        results["stream_read_msgs_per_sec"] = round(messages / t.elapsed)
+
+        tracemalloc.start()
+        for _ in TelegramExportReader(export):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results["stream_read_peak_mb"] = round(peak / 2 ** 20, 1)
+
+        tracemalloc.start()
+        with open(export, encoding='utf-8') as f:
+            json.load(f)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results["json_load_peak_mb"] = round(peak / 2 ** 20, 1)
+
+        with Timer() as t:
+            full, full_rows, marks = asyncio.run(_import(os.path.join(tmp, 'full.db'), export, batch_size))
+        results["import_msgs_per_sec"] = round(messages / t.elapsed)
+        results["jobs_inserted"] = full["jobs_inserted"]
+        results["high_water_mark"] = marks.get(CHANNEL)
+
+        # Запуски по половине файла: второй продолжает с контрольной точки,
+        # третий видит завершённый импорт
+        resumed, resumed_rows, _ = asyncio.run(_import(
+            os.path.join(tmp, 'resumed.db'), export, batch_size,
+            max_messages=messages // 2, runs=3,
+        ))
+        results["resume_finished"] = bool(resumed["finished"])
+        results["resume_messages_read"] = resumed["messages_read"]
+        results["resume_matches_full"] = resumed_rows == full_rows
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=100_000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    write_results("import", run(args.messages, args.batch_size), args.json)
+
+
+if __name__ == '__main__':
+    main()
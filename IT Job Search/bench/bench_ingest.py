@@ -0,0 +1,59 @@
+"""Бенчмарк загрузки вакансий: add_job построчно против add_jobs пачкой"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+from common import Timer, make_job, write_results
+
+from database import Database
+
+
+async def run(rows: int, batch_size: int) -> dict:
+    rnd = random.Random(42)
+    jobs = [make_job(i, rnd) for i in range(rows)]
+    results = {"rows": rows, "batch_size": batch_size}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'per_row.db'))
+        await db.init_db()
+        with Timer() as t:
+            for job in jobs:
+                await db.add_job(job)
+        await db.close()
+        results["per_row_rows_per_sec"] = round(rows / t.elapsed, 1)
+
+        db = Database(os.path.join(tmp, 'batched.db'))
+        await db.init_db()
+        inserted = 0
+        with Timer() as t:
+            for start in range(0, rows, batch_size):
+                result = await db.add_jobs(jobs[start:start + batch_size])
+                inserted += result["inserted"]
+        # Повторная загрузка должна дать только дубликаты
+        duplicates = (await db.add_jobs(jobs[:batch_size]))["duplicates"]
+        await db.close()
+        results["batched_rows_per_sec"] = round(rows / t.elapsed, 1)
+        results["batched_inserted"] = inserted
+        results["batched_reload_duplicates"] = duplicates
+
+    results["speedup"] = round(
+        results["batched_rows_per_sec"] / results["per_row_rows_per_sec"], 1
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.batch_size))
+    write_results("ingest", results, args.json)
+
+
+if __name__ == '__main__':
+    main()
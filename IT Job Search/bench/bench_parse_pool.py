@@ -0,0 +1,117 @@
+"""Задержка API во время бэкфилла: парсинг в event loop против ParsingPool.
+
+Пока парсится 50k сообщений, клиент непрерывно запрашивает
+/api/jobs/{id}; замеряются p50/p99 задержки ответа.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+from datetime import datetime, timezone
+
+import httpx
+
+from common import Timer, make_job, write_results
+from fake_telegram import SAMPLE_POST, FakeMessage
+
+import main
+from database import Database
+from extraction import JOB_KEYWORDS, PRIORITY_LOCATIONS
+from parse_pool import ParsingPool
+from telegram_parser import TelegramParser
+
+
+def percentile(samples, q):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def probe_latency(client: httpx.AsyncClient, stop: asyncio.Event,
+                        interval: float = 0.01) -> list:
+    """Запросы по расписанию раз в interval секунд.
+
+    Задержка считается от запланированного момента отправки, поэтому
+    время, пока event loop был занят, тоже попадает в замер.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    latencies = []
+    tick = 0
+    while not stop.is_set():
+        scheduled = started + tick * interval
+        tick += 1
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await client.get('/api/jobs/1')
+        latencies.append((loop.time() - scheduled) * 1000)
+    return latencies
+
+
+async def backfill(parser: TelegramParser, messages: list, chunk: int) -> int:
+    found = 0
+    # Как при обходе канала: пачки по MAX_BACKFILL_MESSAGES
+    for start in range(0, len(messages), chunk):
+        jobs = await parser.parse_messages_async(messages[start:start + chunk], 'bench')
+        found += len(jobs)
+    return found
+
+
+async def measure(parser: TelegramParser, messages: list, chunk: int) -> dict:
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        probe = asyncio.create_task(probe_latency(client, stop))
+        await asyncio.sleep(0.2)
+        with Timer() as t:
+            found = await backfill(parser, messages, chunk)
+        stop.set()
+        latencies = await probe
+    return {
+        "backfill_sec": round(t.elapsed, 2),
+        "jobs_found": found,
+        "api_requests": len(latencies),
+        "api_p50_ms": round(statistics.median(latencies), 2),
+        "api_p99_ms": round(percentile(latencies, 0.99), 2),
+        "api_max_ms": round(max(latencies), 2),
+    }
+
+
+async def run(count: int, workers: int, chunk: int) -> dict:
+    now = datetime.now(timezone.utc)
+    messages = [
+        FakeMessage(i, SAMPLE_POST.replace('Acme', f'Acme{i}'), now) for i in range(count)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main.db = Database(os.path.join(tmp, 'bench.db'))
+        await main.db.init_db()
+        await main.db.add_job(make_job(1))
+
+        inline = await measure(TelegramParser(), messages, chunk)
+
+        pool = ParsingPool(JOB_KEYWORDS, PRIORITY_LOCATIONS, workers=workers)
+        # Прогрев: запуск процессов не входит в замер
+        await pool.parse([(SAMPLE_POST, 'bench', now)] * workers)
+        pooled = await measure(TelegramParser(parse_pool=pool), messages, chunk)
+        pool.close()
+
+        await main.db.close()
+
+    return {"messages": count, "workers": workers, "inline": inline, "process_pool": pooled}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--chunk', type=int, default=2000)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.messages, args.workers, args.chunk))
+    write_results("parse_pool", results, args.json)
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,127 @@
+"""Бенчмарк поиска: LIKE '%x%' против FTS5 (bm25) на 100k и 1M вакансий"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+
+from common import Timer, write_results
+
+from database import Database
+from models import JobFilter
+
+WORDS = (
+    "python pytorch tensorflow model pipeline data team remote senior junior "
+    "research production inference training cloud aws docker kubernetes spark "
+    "analytics platform feature store vision language llm startup fintech "
+    "healthcare retail growth equity relocation visa english"
+).split()
+QUERIES = ['pytorch', 'kubernetes spark', '"computer vision"', 'fintech relocation', 'infer', 'zq']
+
+
+def make_vocabulary(rnd: random.Random, size: int = 5000):
+    """Словарь «обычных» слов, чтобы технические термины были избирательными"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rnd.choices(letters, k=rnd.randint(3, 9))) for _ in range(size)]
+
+
+# Числовые колонки опыта и зарплаты одинаковы у всех строк
+COMPENSATION = Database.compensation_params('2-3 years', '$5k-7k')
+
+
+def populate(db_path: str, rows: int, seed: int = 42):
+    """Заполнить jobs синтетическими строками (триггеры FTS срабатывают при вставке)"""
+    rnd = random.Random(seed)
+    vocabulary = make_vocabulary(rnd)
+    conn = sqlite3.connect(db_path)
+    batch = []
+    for i in range(rows):
+        words = rnd.choices(vocabulary, k=40) + rnd.sample(WORDS, 2)
+        rnd.shuffle(words)
+        description = ' '.join(words)
+        if i % 50 == 0:
+            description += ' computer vision'
+        batch.append((
+            rnd.choice(['ML Engineer', 'Data Scientist', 'AI Developer']),
+            f"Company {i}", rnd.choice(['Dubai', 'Canada', 'Remote']),
+            '2-3 years', '$5k-7k', description, 'Python,Sql',
+            't.me/bench', '2024-01-01', 'jobs@example.com', '@bench',
+            *COMPENSATION,
+        ))
+        if len(batch) == 10_000:
+            conn.executemany(Database.INSERT_JOB_SQL, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(Database.INSERT_JOB_SQL, batch)
+    conn.commit()
+    conn.close()
+
+
+def percentile(samples, q):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def measure(db: Database, repeat: int) -> dict:
+    results = {}
+    for query in QUERIES:
+        like_times, fts_times = [], []
+        like_term = '%' + query.strip('"') + '%'
+        for _ in range(repeat):
+            with Timer() as t:
+                async with db.pool.reader() as conn:
+                    async with conn.execute(
+                        "SELECT * FROM jobs WHERE title LIKE ? OR company LIKE ? "
+                        "OR description LIKE ? ORDER BY created_at DESC LIMIT 50",
+                        (like_term, like_term, like_term)
+                    ) as cursor:
+                        await cursor.fetchall()
+            like_times.append(t.elapsed * 1000)
+
+            with Timer() as t:
+                await db.get_jobs(JobFilter(search=query), 50)
+            fts_times.append(t.elapsed * 1000)
+
+        results[query] = {
+            "like_p50_ms": round(statistics.median(like_times), 2),
+            "like_p99_ms": round(percentile(like_times, 0.99), 2),
+            "fts_p50_ms": round(statistics.median(fts_times), 2),
+            "fts_p99_ms": round(percentile(fts_times, 0.99), 2),
+        }
+    return results
+
+
+async def run(sizes, repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            db_path = os.path.join(tmp, f'search_{rows}.db')
+            db = Database(db_path)
+            await db.init_db()
+            await db.close()
+            with Timer() as t:
+                populate(db_path, rows)
+            db = Database(db_path)
+            await db.init_db()
+            results[str(rows)] = {
+                "populate_sec": round(t.elapsed, 1),
+                "queries": await measure(db, repeat),
+            }
+            await db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.sizes, args.repeat))
+    write_results("search", results, args.json)
+
+
+if __name__ == '__main__':
+    main()
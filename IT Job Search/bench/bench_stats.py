@@ -0,0 +1,102 @@
+"""Статистика: полные агрегаты по таблицам против счётчиков stat_counters"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+
+from bench_search import populate
+from common import Timer, write_results
+
+from database import Database
+
+# Запросы прежнего get_stats
+LEGACY_STATS_SQL = [
+    "SELECT COUNT(*) FROM jobs",
+    "SELECT COUNT(*) FROM applications",
+    "SELECT location, COUNT(*) as count FROM jobs GROUP BY location",
+    "SELECT status, COUNT(*) as count FROM applications GROUP BY status",
+]
+
+
+def populate_applications(db_path: str, rows: int, seed: int = 42):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO applications (job_id, name, email, message, resume_path, status) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (rnd.randint(1, 1000), f"Candidate {i}", f"c{i}@example.com", "Hi", "cv.pdf",
+             rnd.choice(['sent', 'viewed', 'rejected', 'accepted']))
+            for i in range(rows)
+        )
+    )
+    conn.commit()
+    conn.close()
+
+
+async def legacy_stats(db: Database) -> dict:
+    results = []
+    async with db.pool.reader() as conn:
+        for sql in LEGACY_STATS_SQL:
+            async with conn.execute(sql) as cursor:
+                results.append(await cursor.fetchall())
+    return {
+        "total_jobs": results[0][0][0],
+        "total_applications": results[1][0][0],
+        "jobs_by_location": dict(results[2]),
+        "applications_by_status": dict(results[3]),
+    }
+
+
+async def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        with Timer() as t:
+            await fn()
+        samples.append(t.elapsed * 1000)
+    return round(statistics.median(samples), 3)
+
+
+async def run(rows: int, applications: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        db = Database(path)
+        await db.init_db()
+        await db.close()
+        populate(path, rows)
+        populate_applications(path, applications)
+
+        db = Database(path)
+        await db.init_db()
+        legacy = await legacy_stats(db)
+        counters = await db.get_stats()
+        results = {
+            "rows": rows,
+            "applications": applications,
+            "results_match": legacy == counters,
+            "legacy_p50_ms": await timed(lambda: legacy_stats(db), repeat),
+            "counters_p50_ms": await timed(db.get_stats, repeat),
+            "daily_p50_ms": await timed(lambda: db.get_jobs_daily(30), repeat),
+        }
+        await db.close()
+    results["speedup"] = round(results["legacy_p50_ms"] / results["counters_p50_ms"], 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--applications', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.applications, args.repeat))
+    write_results("stats", results, args.json)
+
+
+if __name__ == '__main__':
+    main()
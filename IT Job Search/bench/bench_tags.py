@@ -0,0 +1,163 @@
+"""Бенчмарк фильтра по тегам: LIKE по jobs.tags против job_tags на 100k и 1M вакансий.
+
+Теги распределены по Ципфу: «Python» есть почти у двух третей вакансий,
+редкие теги — у долей процента, Niche — у одной вакансии из 10 000.
+Меряется и время миграции, переносящей теги из колонки jobs.tags в
+tags/job_tags.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+
+from common import LOCATIONS, Timer, write_results
+from bench_search import percentile
+
+from database import Database
+from migrations import _job_tags
+from models import JobFilter
+
+TAGS = [
+    'Python', 'Sql', 'Pytorch', 'Docker', 'Aws', 'Spark', 'Nlp', 'Mlops',
+    'Tensorflow', 'Kubernetes', 'Airflow', 'Gcp', 'Azure', 'Linux', 'Git',
+    'Keras', 'Tableau', 'Hadoop', 'Nosql', 'R',
+] + [f'Rare{i}' for i in range(40)]
+WEIGHTS = [1 / (i + 1) ** 1.2 for i in range(len(TAGS))]
+# Тег у одной вакансии из десяти тысяч: LIKE читает почти всю таблицу
+NICHE = 'Niche'
+FILTERS = {
+    'niche': ([NICHE], 'all'),
+    'niche+python': ([NICHE, 'Python'], 'all'),
+    'python': (['Python'], 'all'),
+    'python+sql': (['Python', 'Sql'], 'all'),
+    'spark+nlp': (['Spark', 'Nlp'], 'all'),
+    'rare': (['Rare39'], 'all'),
+    'rare+python': (['Rare39', 'Python'], 'all'),
+    'rare|rare': (['Rare38', 'Rare39'], 'any'),
+    'docker|kubernetes': (['Docker', 'Kubernetes'], 'any'),
+}
+
+
+# Числовые колонки опыта и зарплаты одинаковы у всех строк
+COMPENSATION = Database.compensation_params('2-3 years', '$5k-7k')
+
+
+def populate(db_path: str, rows: int, seed: int = 42):
+    """Вставить вакансии в обход Database: job_tags заполнит миграция"""
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    batch = []
+    for i in range(rows):
+        tags = list(dict.fromkeys(rnd.choices(TAGS, WEIGHTS, k=4)))
+        if i % 10_000 == 0:
+            tags.append(NICHE)
+        batch.append((
+            'ML Engineer', f"Company {i}", rnd.choice(LOCATIONS), '2-3 years', '$5k-7k',
+            'No description available', ','.join(tags),
+            't.me/bench', '2024-01-01', 'jobs@example.com', '@bench',
+            *COMPENSATION,
+        ))
+        if len(batch) == 10_000:
+            conn.executemany(Database.INSERT_JOB_SQL, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(Database.INSERT_JOB_SQL, batch)
+    # Откат к схеме до нормализации тегов: перенос выполнит миграция
+    conn.execute("DROP TABLE job_tags")
+    conn.execute("DROP TABLE tags")
+    conn.execute("DROP TRIGGER jobs_tags_ad")
+    conn.execute("DELETE FROM stat_counters WHERE metric = 'jobs_by_tag'")
+    conn.commit()
+    conn.close()
+
+
+def _timings(samples):
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "p99_ms": round(percentile(samples, 0.99), 2),
+    }
+
+
+async def measure(db: Database, repeat: int) -> dict:
+    results = {}
+    for name, (tags, mode) in FILTERS.items():
+        like_times, indexed_times = [], []
+        like = ' AND '.join(["(',' || tags || ',') LIKE ?"] * len(tags))
+        if mode == 'any':
+            like = like.replace(' AND ', ' OR ')
+        for _ in range(repeat):
+            with Timer() as t:
+                async with db.pool.reader() as conn:
+                    async with conn.execute(
+                        f"SELECT * FROM jobs WHERE {like} ORDER BY created_at DESC, id DESC LIMIT 51",
+                        [f'%,{tag},%' for tag in tags]
+                    ) as cursor:
+                        like_rows = await cursor.fetchall()
+            like_times.append(t.elapsed * 1000)
+
+            with Timer() as t:
+                rows, _ = await db.get_jobs_page(JobFilter(tags=tags, tag_mode=mode), 50)
+            indexed_times.append(t.elapsed * 1000)
+        assert [r['id'] for r in like_rows[:50]] == [r['id'] for r in rows], name
+        results[name] = {
+            "matches_first_page": len(rows),
+            "like": _timings(like_times),
+            "job_tags": _timings(indexed_times),
+        }
+
+    facets = {
+        'all_jobs': JobFilter(),
+        'location': JobFilter(location='Dubai'),
+        'tag_python': JobFilter(tags=['Python']),
+        'tag_rare': JobFilter(tags=['Rare39']),
+    }
+    for name, filters in facets.items():
+        samples = []
+        for _ in range(max(3, repeat // 5)):
+            with Timer() as t:
+                await db.get_tag_facets(filters, 20)
+            samples.append(t.elapsed * 1000)
+        results[f"facets_{name}"] = _timings(samples)
+    return results
+
+
+async def run(sizes, repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            db_path = os.path.join(tmp, f'tags_{rows}.db')
+            db = Database(db_path)
+            await db.init_db()
+            await db.close()
+            with Timer() as populate_timer:
+                populate(db_path, rows)
+            db = Database(db_path)
+            await db.init_db()
+            with Timer() as migrate_timer:
+                async with db.pool.writer() as conn:
+                    await _job_tags(conn)
+            results[str(rows)] = {
+                "populate_sec": round(populate_timer.elapsed, 1),
+                "migration_sec": round(migrate_timer.elapsed, 1),
+                "queries": await measure(db, repeat),
+            }
+            await db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.sizes, args.repeat))
+    write_results("tags", results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Рендер писем через EmailTemplates: скорость и экранирование.
+
+Проверяет, что HTML из полей отклика и вакансии экранируется, и
+замеряет рендеры в секунду поштучно и пачкой (render_many).
+При найденной инъекции скрипт завершается с кодом 1.
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from common import Timer, make_job, write_results
+
+from email_service import EmailService
+from email_templates import EmailTemplates
+from models import Application
+
+PAYLOADS = [
+    '<script>alert(1)</script>',
+    '"><img src=x onerror=alert(1)>',
+    "</p><a href='javascript:alert(1)'>click</a>",
+]
+
+
+def make_application(i: int, message: str = 'Здравствуйте! Интересна вакансия.') -> Application:
+    return Application(
+        job_id=1,
+        name=f'Candidate {i}',
+        email=f'candidate{i}@example.com',
+        phone='+10000000000',
+        message=message,
+        resume_path='cv.pdf',
+        applied_date=datetime.now(),
+    )
+
+
+def check_escaping(templates: EmailTemplates) -> list:
+    """Пейлоады в каждом пользовательском поле; возвращает найденные утечки"""
+    leaks = []
+    for payload in PAYLOADS:
+        job = make_job(1).model_copy(update={'title': payload, 'company': payload})
+        application = make_application(1, message=payload).model_copy(update={'name': payload})
+        for name in ('application.html', 'confirmation.html', 'status_update.html'):
+            html = templates.render(name, job=job, application=application, status_text=payload)
+            if payload in html or '<script' in html or '<img' in html:
+                leaks.append({"template": name, "payload": payload})
+    return leaks
+
+
+def run(renders: int) -> dict:
+    templates = EmailTemplates()
+    leaks = check_escaping(templates)
+
+    job = make_job(1)
+    applications = [make_application(i) for i in range(renders)]
+
+    with Timer() as t:
+        for application in applications:
+            templates.render('application.html', job=job, application=application)
+    single = renders / t.elapsed
+
+    with Timer() as t:
+        templates.render_many('status_update.html', (
+            {"application": a, "job": job, "status_text": 'accepted'} for a in applications
+        ))
+    batch = renders / t.elapsed
+
+    service = EmailService()
+    service.from_email = 'bench@example.com'
+    with Timer() as t:
+        service.build_status_update_emails([(a, job) for a in applications], 'accepted')
+    messages = renders / t.elapsed
+
+    return {
+        "renders": renders,
+        "escaping_leaks": leaks,
+        "application_renders_per_sec": round(single),
+        "status_render_many_per_sec": round(batch),
+        "status_mime_messages_per_sec": round(messages),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--renders', type=int, default=20_000)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = run(args.renders)
+    write_results("templates", results, args.json)
+    if results["escaping_leaks"]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
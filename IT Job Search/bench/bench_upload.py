@@ -0,0 +1,114 @@
+"""Загрузка резюме: память на загрузку и отказ на больших/не-PDF файлах.
+
+Сравнивает пиковую память (tracemalloc) при чтении файла целиком
+(await upload.read(), как раньше) и при потоковом BlobStore.put_upload,
+затем проверяет ответы POST /api/applications на файл с чужой
+сигнатурой и файл больше MAX_UPLOAD_SIZE.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import tracemalloc
+
+import httpx
+from starlette.datastructures import UploadFile
+
+from common import Timer, make_job, write_results
+
+import main
+from blob_store import BlobStore
+from confiq import settings
+from database import Database
+
+
+def pdf_bytes(size: int) -> bytes:
+    return b'%PDF-1.4\n' + b'0' * (size - 9)
+
+
+async def peak_memory(size: int, tmp: str) -> dict:
+    # Как у Starlette: большое тело формы уже лежит во временном файле на диске
+    source = os.path.join(tmp, 'source.pdf')
+    with open(source, 'wb') as f:
+        f.write(pdf_bytes(size))
+
+    with open(source, 'rb') as f:
+        upload = UploadFile(f, filename='cv.pdf')
+        tracemalloc.start()
+        content = await upload.read()
+        with open(os.path.join(tmp, 'buffered.pdf'), 'wb') as out:
+            out.write(content)
+        _, buffered_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del content
+
+    with open(source, 'rb') as f:
+        upload = UploadFile(f, filename='cv.pdf')
+        tracemalloc.start()
+        with Timer() as t:
+            stored = await BlobStore(os.path.join(tmp, 'blobs')).put_upload(upload, max_size=size)
+        _, streamed_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "file_mb": round(size / 2 ** 20, 1),
+        "buffered_peak_kb": round(buffered_peak / 1024),
+        "streamed_peak_kb": round(streamed_peak / 1024),
+        "streamed_mb_per_sec": round(size / 2 ** 20 / t.elapsed, 1),
+        "stored_size_ok": stored.size == size and len(stored.sha256) == 64,
+    }
+
+
+async def rejections(tmp: str) -> dict:
+    main.db = Database(os.path.join(tmp, 'bench.db'))
+    await main.db.init_db()
+    job_id = await main.db.add_job(make_job(1))
+    form = {'job_id': job_id, 'name': 'Bench', 'email': 'bench@example.com', 'message': 'Hi'}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        async def post(content: bytes) -> int:
+            response = await client.post('/api/applications', data=form, files={
+                'resume': ('cv.pdf', content, 'application/pdf')
+            })
+            return response.status_code
+
+        results = {
+            "not_pdf_status": await post(b'MZ\x90\x00' + b'0' * 1024),
+            "oversized_status": await post(pdf_bytes(settings.MAX_UPLOAD_SIZE + 256 * 1024)),
+            "valid_status": await post(pdf_bytes(256 * 1024)),
+        }
+    await main.outbox.close()
+    await main.db.close()
+    # Во временных именах *.part ничего не должно остаться
+    results["leftover_part_files"] = len([
+        name for _, _, names in os.walk(settings.UPLOAD_DIR) for name in names if name.endswith('.part')
+    ])
+    return results
+
+
+async def run(size_mb: float) -> dict:
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, settings.UPLOAD_DIR))
+        os.chdir(tmp)
+        try:
+            memory = await peak_memory(int(size_mb * 2 ** 20), tmp)
+            checks = await rejections(tmp)
+        finally:
+            os.chdir(cwd)
+    return {"memory": memory, "endpoint": checks}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=float, default=8)
+    parser.add_argument('--json', help='Сохранить результаты в файл')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.size_mb))
+    write_results("upload", results, args.json)
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,115 @@
+"""Общие утилиты для бенчмарков.
+
+Скрипты запускаются из каталога проекта: python bench/bench_ingest.py
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# tests — для имитации Telethon (fake_telegram), общей с тестами
+for path in (PROJECT_DIR, os.path.join(PROJECT_DIR, 'tests')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from models import Job  # noqa: E402
+
+TITLES = ['ML Engineer', 'Data Scientist', 'AI Developer', 'MLOps Engineer', 'NLP Engineer']
+COMPANIES = ['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries']
+LOCATIONS = ['Dubai', 'Canada', 'Ireland', 'Serbia', 'Remote']
+TAGS = ['Python', 'Pytorch', 'Sql', 'Docker', 'Aws', 'Spark', 'Nlp', 'Mlops']
+# Слова для описаний: из пар слов получается словарь в ~1300 токенов,
+# и разные вакансии не выглядят почти-дубликатами
+WORDS = [
+    'build', 'models', 'pipelines', 'ranking', 'search', 'vision', 'speech', 'fraud',
+    'team', 'product', 'research', 'platform', 'training', 'inference', 'features',
+    'experiments', 'deploy', 'monitoring', 'clients', 'payments', 'retail', 'health',
+    'robotics', 'ads', 'recommendations', 'forecasting', 'startup', 'remote', 'office',
+    'mentoring', 'growth', 'scale', 'latency', 'quality', 'labels', 'annotation',
+]
+
+
+def make_job(i: int, rnd: random.Random = None) -> Job:
+    """Синтетическая вакансия с уникальным ключом (title, company, posted_date)"""
+    rnd = rnd or random
+    posted = datetime(2024, 1, 1) + timedelta(days=i % 365)
+    company = f"{rnd.choice(COMPANIES)} {i}"
+    return Job(
+        title=rnd.choice(TITLES),
+        company=company,
+        location=rnd.choice(LOCATIONS),
+        experience=f"{rnd.randint(1, 3)}-{rnd.randint(4, 6)} years",
+        salary=f"${rnd.randint(3, 6)}k-{rnd.randint(7, 12)}k",
+        description="We are looking for an engineer: " + " ".join(
+            rnd.choice(WORDS) + rnd.choice(WORDS) for _ in range(20)
+        ),
+        tags=rnd.sample(TAGS, 3),
+        source="t.me/bench",
+        posted_date=posted.strftime('%Y-%m-%d'),
+        contact_email=f"jobs{i}@example.com",
+        contact_telegram="@bench",
+    )
+
+
+class Timer:
+    """Контекстный менеджер для замера времени"""
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
+
+
+def environment() -> dict:
+    """Коммит и окружение запуска: результаты сравниваются между коммитами"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_DIR,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip())
+    except (OSError, subprocess.SubprocessError):
+        commit, dirty = None, False
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "cpus": os.cpu_count(),
+    }
+
+
+def percentiles(samples: list) -> dict:
+    """p50/p99/max в миллисекундах по замерам в секундах"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50_ms": None, "p99_ms": None, "max_ms": None}
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {"p50_ms": at(0.5), "p99_ms": at(0.99), "max_ms": round(ordered[-1] * 1000, 3)}
+
+
+def write_results(name: str, results: dict, path: str = None):
+    """Вывести результаты и, если указан путь, сохранить их в JSON"""
+    payload = {
+        "benchmark": name,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "environment": environment(),
+        "results": results,
+    }
+    print(json.dumps(payload, ensure_ascii=False, indent=2))
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
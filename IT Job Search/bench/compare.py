@@ -0,0 +1,98 @@
+"""Сравнение двух файлов результатов (--json любого бенчмарка), например двух коммитов.
+
+    python bench/compare.py base.json new.json --threshold 10
+
+Сравниваются числовые значения с одинаковым путём. Для метрик, где
+направление понятно по имени (*_ms, *seconds* — меньше лучше; rps,
+*per_sec* — больше лучше), изменение сильнее threshold процентов
+помечается как regression или improvement. С --fail-on-regression
+скрипт завершается с кодом 1, если есть регрессии.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Optional
+
+LOWER_IS_BETTER = ('_ms', 'seconds', '_sec', '_mb', '_kb')
+HIGHER_IS_BETTER = ('rps', 'per_sec', 'speedup')
+
+
+def flatten(value, prefix: str = '') -> Dict[str, float]:
+    """Числовые листья вложенного JSON: {"a.b.c": 1.5}"""
+    if isinstance(value, bool):
+        return {}
+    if isinstance(value, (int, float)):
+        return {prefix: value}
+    items = {}
+    if isinstance(value, dict):
+        for key, child in value.items():
+            items.update(flatten(child, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(value, list):
+        for i, child in enumerate(value):
+            items.update(flatten(child, f"{prefix}[{i}]"))
+    return items
+
+
+def direction(path: str) -> int:
+    """1 — больше лучше, -1 — меньше лучше, 0 — неизвестно"""
+    name = path.rsplit('.', 1)[-1]
+    if any(marker in name for marker in HIGHER_IS_BETTER):
+        return 1
+    if any(name.endswith(marker) or marker in name for marker in LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def verdict(path: str, change: Optional[float], threshold: float) -> str:
+    sign = direction(path)
+    if change is None or not sign or abs(change) < threshold:
+        return ''
+    return 'improvement' if change * sign > 0 else 'regression'
+
+
+def compare(base: dict, new: dict, threshold: float) -> list:
+    old_values = flatten(base.get('results', base))
+    new_values = flatten(new.get('results', new))
+    rows = []
+    for path in sorted(old_values.keys() & new_values.keys()):
+        old, value = old_values[path], new_values[path]
+        change = (value - old) / abs(old) * 100 if old else None
+        rows.append((path, old, value, change, verdict(path, change, threshold)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Порог изменения, %%')
+    parser.add_argument('--all', action='store_true', help='Показать и неизменившиеся значения')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.new, encoding='utf-8') as f:
+        new = json.load(f)
+
+    for label, payload in (('base', base), ('new', new)):
+        env = payload.get('environment', {})
+        print(f"{label}: {payload.get('benchmark')} {payload.get('timestamp')} "
+              f"commit={env.get('commit')}{'+dirty' if env.get('dirty') else ''} python={env.get('python')}")
+
+    rows = compare(base, new, args.threshold)
+    width = max((len(row[0]) for row in rows), default=10)
+    regressions = 0
+    for path, old, value, change, mark in rows:
+        if not args.all and not mark:
+            continue
+        regressions += mark == 'regression'
+        shown = f"{change:+.1f}%" if change is not None else 'n/a'
+        print(f"{path:<{width}}  {old:>12g}  {value:>12g}  {shown:>8}  {mark}")
+    print(f"{len(rows)} значений, регрессий: {regressions}")
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""Синтетические сообщения каналов с вакансиями и базы jobs.db заданного размера.
+
+Посты похожи на настоящие: разные шаблоны (английский, русский, список
+через эмодзи, хэштеги), форматы зарплаты и опыта из compensation,
+длинный хвост компаний и технологий, репосты одной вакансии в разных
+каналах. Между вакансиями — обсуждения и служебные сообщения.
+
+Базы собираются обычным путём приложения — JobExtractor и
+Database.add_jobs, — поэтому в них заполнены job_tags, отпечатки
+дедупликации и числовые колонки. Готовые файлы кэшируются в bench/data:
+
+    python bench/generate.py db --sizes 10000 100000 1000000
+    python bench/generate.py export --messages 50000 --out result.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+
+from common import PROJECT_DIR, Timer, write_results
+
+from database import Database
+from extraction import JobExtractor
+from logs import setup_logging
+from models import Application
+
+DATA_DIR = os.path.join(PROJECT_DIR, 'bench', 'data')
+CHANNELS = ['datasciencejobs', 'ml_jobs_global', 'ai_vacancies', 'remote_ds', 'mljobs_ru']
+STARTED = datetime(2023, 1, 1)
+
+SENIORITY = ['', 'Junior ', 'Middle ', 'Senior ', 'Lead ', 'Staff ', 'Principal ']
+TITLES = [
+    'ML Engineer', 'Machine Learning Engineer', 'Data Scientist', 'AI Developer',
+    'Deep Learning Engineer', 'NLP Engineer (Machine Learning)', 'Computer Vision ML Engineer',
+    'MLOps Engineer / ML Engineer', 'Research Data Scientist', 'Applied ML Engineer',
+]
+LOCATIONS = [
+    'Dubai', 'Canada', 'Ireland', 'Serbia', 'Remote', 'Berlin, Germany', 'London, UK',
+    'Amsterdam', 'Warsaw', 'Lisbon', 'Tbilisi', 'Limassol, Cyprus', 'Belgrade', 'Toronto',
+]
+STACK = [
+    'Python', 'PyTorch', 'TensorFlow', 'Keras', 'scikit-learn', 'R', 'SQL', 'NoSQL',
+    'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP', 'Spark', 'Hadoop', 'NLP',
+    'computer vision', 'MLOps', 'Git', 'Linux', 'Tableau', 'Power BI', 'Airflow',
+    'FastAPI', 'Kafka', 'ClickHouse', 'LLMs', 'Ray', 'Triton', 'dbt',
+]
+DOMAINS = [
+    'fintech', 'e-commerce', 'healthcare', 'adtech', 'gaming', 'logistics', 'edtech',
+    'cybersecurity', 'proptech', 'retail', 'insurance', 'telecom', 'autonomous driving',
+]
+SALARIES = [
+    # (шаблон, множитель суммы) — суммы в тысячах долларов в месяц
+    ('${lo}k-{hi}k', 1), ('$ {lo}k–{hi}k / month', 1), ('€{lo}k-{hi}k', 1),
+    ('{lo_full}-{hi_full} USD', 1000), ('{lo_full}-{hi_full} EUR', 1000),
+    ('£{lo_year}k-{hi_year}k per year', 12), ('{lo_year}k-{hi_year}k CAD', 12),
+    ('${lo_hour}-{hi_hour}/hour', 0), ('от {lo_rub} 000 до {hi_rub} 000 ₽', 90),
+]
+EXPERIENCE = ['{lo}-{hi} years', '{lo}+ years', 'опыт {lo}-{hi} лет', 'Experience: {lo}-{hi}', '{lo}+ лет']
+CHATTER = [
+    'Кто-нибудь проходил собеседование в {company}? Как впечатления?',
+    'Подскажите курс по {stack} для начинающих',
+    'Thanks for sharing! Is relocation to {location} still available?',
+    'Вебинар про {stack} в {domain} начнётся через 10 минут',
+    'Reminder: no spam in comments, please. Job posts go through @admin_bot',
+]
+
+
+def make_vocabulary(rnd: random.Random, size: int = 4000) -> List[str]:
+    """Словарь «обычных» слов: описания разных вакансий не похожи друг на друга"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rnd.choices(letters, k=rnd.randint(3, 9))) for _ in range(size)]
+
+
+class PostGenerator:
+    """Поток сообщений каналов: вакансии, обсуждения и служебные сообщения"""
+
+    def __init__(self, seed: int = 42, companies: int = 5000):
+        self.rnd = random.Random(seed)
+        self.vocabulary = make_vocabulary(self.rnd)
+        self.companies = [self._company_name(i) for i in range(companies)]
+        # Частоты компаний и технологий — длинный хвост, как в каналах
+        self.company_weights = [1 / (i + 1) ** 0.8 for i in range(companies)]
+        self.stack_weights = [1 / (i + 1) ** 0.6 for i in range(len(STACK))]
+        self._reposts: List[str] = []
+
+    def _company_name(self, i: int) -> str:
+        first = self.rnd.choice(['Neuro', 'Data', 'Deep', 'Quant', 'Vision', 'Cloud', 'Smart', 'Open'])
+        second = self.rnd.choice(['Labs', 'Works', 'Systems', 'AI', 'Tech', 'Soft', 'Analytics'])
+        return f"{first}{second} {i}"
+
+    def _stack(self, k: int) -> List[str]:
+        chosen = []
+        while len(chosen) < k:
+            name = self.rnd.choices(STACK, self.stack_weights)[0]
+            if name not in chosen:
+                chosen.append(name)
+        return chosen
+
+    def _salary(self) -> str:
+        template, _ = self.rnd.choice(SALARIES)
+        lo = self.rnd.randint(2, 12)
+        hi = lo + self.rnd.randint(1, 6)
+        # Редкие высокие вилки — для избирательных фильтров salary_min
+        if self.rnd.random() < 0.002:
+            lo, hi = 20, 25
+        return template.format(
+            lo=lo, hi=hi, lo_full=lo * 1000, hi_full=hi * 1000,
+            lo_year=lo * 12, hi_year=hi * 12, lo_hour=lo * 6, hi_hour=hi * 6,
+            lo_rub=lo * 90, hi_rub=hi * 90,
+        )
+
+    def _experience(self) -> str:
+        lo = self.rnd.choice([0, 1, 1, 2, 2, 3, 3, 4, 5, 7])
+        return self.rnd.choice(EXPERIENCE).format(lo=lo, hi=lo + self.rnd.randint(1, 3))
+
+    def _sentence(self, words: int) -> str:
+        return ' '.join(self.rnd.choices(self.vocabulary, k=words))
+
+    def job_post(self) -> str:
+        """Текст вакансии в одном из шаблонов"""
+        rnd = self.rnd
+        # Около 3% — репост уже опубликованной вакансии (почти-дубликат)
+        if self._reposts and rnd.random() < 0.03:
+            return rnd.choice(self._reposts) + '\n#repost'
+
+        company = rnd.choices(self.companies, self.company_weights)[0]
+        title = rnd.choice(SENIORITY) + rnd.choice(TITLES)
+        location = rnd.choice(LOCATIONS)
+        stack = ', '.join(self._stack(rnd.randint(2, 7)))
+        domain = rnd.choice(DOMAINS)
+        handle = company.lower().replace(' ', '_') + '_hr'
+        email = f"jobs@{company.lower().replace(' ', '')}.com"
+        about = f"We build {domain} products: {self._sentence(rnd.randint(12, 40))}"
+        duties = self._sentence(rnd.randint(8, 25))
+
+        style = rnd.random()
+        if style < 0.45:
+            lines = [
+                f"🚀 {title}",
+                f"Company: {company}",
+                f"Location: {location}",
+                about,
+                f"Requirements: {self._experience()} with {stack}",
+                f"Responsibilities: {duties}",
+                f"Salary: {self._salary()}",
+                f"Contact: @{handle} or {email}",
+            ]
+        elif style < 0.7:
+            lines = [
+                f"Вакансия: {title}",
+                f"Компания: {company}",
+                f"Локация: {location}",
+                f"Ищем специалиста в {domain}, machine learning и анализ данных: {duties}",
+                f"Опыт: {self._experience()}, стек {stack}",
+                f"Зарплата: {self._salary()}",
+                f"Писать @{handle}",
+            ]
+        elif style < 0.9:
+            lines = [
+                f"#vacancy #{domain.replace(' ', '')} #remote",
+                f"{title} at @{handle}",
+                f"🌍 {location}",
+                f"💼 {self._experience()}",
+                f"💰 {self._salary()}",
+                f"🛠 {stack}",
+                about,
+                f"📩 {email}",
+            ]
+        else:
+            # Короткий пост без структуры: часть полей не найдётся
+            lines = [
+                f"Hiring {title.lower()} for machine learning team, {location}. "
+                f"{stack}. {self._salary()}. DM @{handle}",
+            ]
+        text = '\n'.join(lines)
+        if rnd.random() < 0.02:
+            self._reposts.append(text)
+            if len(self._reposts) > 200:
+                self._reposts.pop(0)
+        return text
+
+    def chatter(self) -> str:
+        return self.rnd.choice(CHATTER).format(
+            company=self.rnd.choice(self.companies), stack=self.rnd.choice(STACK),
+            location=self.rnd.choice(LOCATIONS), domain=self.rnd.choice(DOMAINS),
+        )
+
+    def messages(self, count: int, job_share: float = 0.35) -> Iterator[dict]:
+        """Сообщения в формате экспорта Telegram Desktop (id, date, text)"""
+        for i in range(1, count + 1):
+            date = STARTED + timedelta(minutes=11 * i)
+            message = {
+                "id": i, "type": "message", "date": date.isoformat(),
+                "date_unixtime": str(int(date.timestamp())), "from": "Bench Jobs",
+            }
+            kind = self.rnd.random()
+            if kind < job_share:
+                message["text"] = self.job_post()
+            elif kind < 0.96:
+                message["text"] = self.chatter()
+            else:
+                message = {"id": i, "type": "service", "date": date.isoformat(),
+                           "action": "pin_message", "text": ""}
+            yield message
+
+    def jobs(self) -> Iterator[Tuple[str, str, datetime]]:
+        """Бесконечный поток (текст, канал, дата) только с вакансиями"""
+        i = 0
+        while True:
+            i += 1
+            yield self.job_post(), self.rnd.choice(CHANNELS), STARTED + timedelta(minutes=3 * i)
+
+
+def write_export(path: str, messages: int, seed: int = 42):
+    """Записать result.json экспорта канала Telegram Desktop"""
+    generator = PostGenerator(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n "name": "Bench Jobs",\n "type": "public_channel",\n "id": 1234567,\n "messages": [\n')
+        for i, message in enumerate(generator.messages(messages)):
+            if i:
+                f.write(',\n')
+            f.write('  ' + json.dumps(message, ensure_ascii=False))
+        f.write('\n ]\n}\n')
+
+
+async def build_db(path: str, rows: int, seed: int = 42, batch_size: int = 2000) -> dict:
+    """Заполнить базу до rows вакансий через JobExtractor и add_jobs.
+
+    Дубликаты и репосты отбрасываются как в приложении, поэтому
+    сообщений разбирается больше, чем строк в итоге. Отклики — по одному
+    на сотню вакансий от тысячи соискателей.
+    """
+    generator = PostGenerator(seed)
+    extractor = JobExtractor()
+    db = Database(path)
+    await db.init_db()
+    totals = {"rows": 0, "parsed": 0, "duplicates": 0, "near_duplicates": 0}
+    try:
+        posts = generator.jobs()
+        while totals["rows"] < rows:
+            batch = []
+            while len(batch) < min(batch_size, rows - totals["rows"]):
+                text, channel, date = next(posts)
+                job = extractor.extract(text, channel, date)
+                if job:
+                    batch.append(job)
+            totals["parsed"] += len(batch)
+            result = await db.add_jobs(batch)
+            totals["rows"] += result["inserted"]
+            totals["duplicates"] += result["duplicates"]
+            totals["near_duplicates"] += result["near_duplicates"]
+
+        # id идут с пропусками: INSERT OR IGNORE тратит значения AUTOINCREMENT
+        async with db.pool.reader() as conn:
+            async with conn.execute("SELECT id FROM jobs") as cursor:
+                job_ids = [row[0] for row in await cursor.fetchall()]
+        rnd = random.Random(seed)
+        for i in range(max(1, rows // 100)):
+            await db.add_application(Application(
+                job_id=rnd.choice(job_ids), name=f"Candidate {i % 1000}",
+                email=f"candidate{i % 1000}@example.com", message=generator._sentence(20),
+                resume_path=f"uploads/bench_{i}.pdf", applied_date=datetime.now(),
+            ))
+    finally:
+        await db.close()
+    return totals
+
+
+def db_path(rows: int, seed: int = 42, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, f"jobs_{rows}_{seed}.db")
+
+
+def ensure_db(rows: int, seed: int = 42, data_dir: str = DATA_DIR) -> str:
+    """Путь к готовой базе из кэша; собирает её при первом обращении"""
+    path = db_path(rows, seed, data_dir)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        partial = path + '.partial'
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(partial + suffix):
+                os.remove(partial + suffix)
+        asyncio.run(build_db(partial, rows, seed))
+        os.replace(partial, path)
+    return path
+
+
+def copy_db(source: str, target: str) -> str:
+    """Рабочая копия базы из кэша: бенчмарки записи не портят исходник"""
+    shutil.copyfile(source, target)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    db_cmd = sub.add_parser('db', help='Собрать базы jobs.db в bench/data')
+    db_cmd.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    db_cmd.add_argument('--seed', type=int, default=42)
+    db_cmd.add_argument('--force', action='store_true', help='Пересобрать существующие')
+    export_cmd = sub.add_parser('export', help='Записать result.json экспорта канала')
+    export_cmd.add_argument('--messages', type=int, default=50_000)
+    export_cmd.add_argument('--seed', type=int, default=42)
+    export_cmd.add_argument('--out', default='result.json')
+    args = parser.parse_args()
+    setup_logging(level='warning')
+
+    if args.command == 'export':
+        with Timer() as t:
+            write_export(args.out, args.messages, args.seed)
+        write_results("generate_export", {
+            "messages": args.messages, "path": args.out, "seconds": round(t.elapsed, 1),
+            "file_mb": round(os.path.getsize(args.out) / 2 ** 20, 1),
+        })
+        return
+
+    results = {}
+    for rows in args.sizes:
+        path = db_path(rows, args.seed)
+        if args.force and os.path.exists(path):
+            os.remove(path)
+        with Timer() as t:
+            ensure_db(rows, args.seed)
+        results[str(rows)] = {
+            "path": os.path.relpath(path, PROJECT_DIR),
+            "seconds": round(t.elapsed, 1),
+            "file_mb": round(os.path.getsize(path) / 2 ** 20, 1),
+        }
+    write_results("generate_db", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Хранилище резюме, адресуемое содержимым.
+
+Файл лежит по пути <root>/<sha[:2]>/<sha>.pdf, поэтому одинаковые резюме
+хранятся один раз. Таблица resume_blobs считает ссылки из applications
+(счётчик ведут триггеры). Блобы без ссылок удаляет сборщик мусора:
+    python blob_store.py gc jobs.db [--grace 3600] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from typing import Optional
+
+from fastapi import UploadFile
+
+from uploads import StoredUpload, stream_pdf_upload
+from confiq import settings
+from logs import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+
+class BlobStore:
+    """Файлы резюме по SHA-256 содержимого"""
+
+    def __init__(self, root: str = None):
+        self.root = root or settings.RESUME_BLOB_DIR
+        self._tmp_dir = os.path.join(self.root, 'tmp')
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], f"{sha256}.pdf")
+
+    async def put_upload(self, upload: UploadFile, max_size: int = None) -> StoredUpload:
+        """Сохранить загрузку; если такое содержимое уже есть — переиспользовать файл"""
+        await asyncio.to_thread(os.makedirs, self._tmp_dir, exist_ok=True)
+        part_path = os.path.join(self._tmp_dir, f"{uuid.uuid4().hex}.part")
+        size, sha256 = await stream_pdf_upload(upload, part_path, max_size)
+        path = self.path_for(sha256)
+        await asyncio.to_thread(self._commit, part_path, path)
+        return StoredUpload(path, size, sha256)
+
+    @staticmethod
+    def _commit(part_path: str, path: str):
+        try:
+            # Свежий mtime защищает блоб от сборщика, пока отклик не записан в БД
+            os.utime(path)
+            os.remove(part_path)
+            return
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(part_path, path)
+
+    def _is_stale(self, path: str, grace: float) -> bool:
+        try:
+            return time.time() - os.path.getmtime(path) > grace
+        except FileNotFoundError:
+            return True
+
+    async def gc(self, db, grace: float = 3600, dry_run: bool = False) -> dict:
+        """Удалить блобы без ссылок и файлы без записи в БД.
+
+        Трогаются только файлы старше grace секунд: загрузка, ещё не
+        успевшая записать отклик, не попадёт под удаление. Файлы
+        удаляются внутри транзакции записи (как и add_application) после
+        повторной проверки возраста: повторная загрузка того же резюме
+        обновляет mtime и спасает блоб.
+        """
+        stale, freed = [], 0
+
+        for blob in await db.get_unreferenced_blobs():
+            if not self._is_stale(blob['path'], grace):
+                continue
+            stale.append(blob['sha256'])
+            freed += blob['size']
+
+        known = await db.get_blob_hashes()
+        orphans = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                sha256 = name.rsplit('.', 1)[0]
+                in_tmp = dirpath == self._tmp_dir
+                if (in_tmp or sha256 not in known) and self._is_stale(path, grace):
+                    orphans.append(path)
+                    freed += os.path.getsize(path)
+
+        if dry_run:
+            return {
+                "blobs_removed": len(stale),
+                "orphan_files_removed": len(orphans),
+                "bytes_freed": freed,
+                "dry_run": dry_run,
+            }
+
+        freed, removed_files = 0, []
+
+        async def remove(path: str) -> bool:
+            nonlocal freed
+            removed = await asyncio.to_thread(self._remove_if_stale, path, grace)
+            if removed is None:
+                return False
+            freed += removed
+            removed_files.append(path)
+            return True
+
+        deleted = await db.delete_unreferenced_blobs(stale, remove, orphans)
+        return {
+            "blobs_removed": len(deleted),
+            "orphan_files_removed": len(removed_files) - len(deleted),
+            "bytes_freed": freed,
+            "dry_run": dry_run,
+        }
+
+    def _remove_if_stale(self, path: str, grace: float) -> Optional[int]:
+        """Удалить файл, если он всё ещё старше grace; размер удалённого или None"""
+        if not self._is_stale(path, grace):
+            return None
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        return size
+
+
+async def _gc(db_path: str, grace: float, dry_run: bool, root: Optional[str]):
+    from database import Database
+
+    db = Database(db_path)
+    await db.init_db()
+    try:
+        result = await BlobStore(root).gc(db, grace=grace, dry_run=dry_run)
+    finally:
+        await db.close()
+    log.info("Сборка мусора резюме", **result)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Хранилище резюме")
+    commands = parser.add_subparsers(dest='command', required=True)
+    gc_parser = commands.add_parser('gc', help='Удалить резюме без ссылок')
+    gc_parser.add_argument('db_path', help='Путь к jobs.db')
+    gc_parser.add_argument('--grace', type=float, default=3600,
+                           help='Не трогать файлы моложе стольких секунд')
+    gc_parser.add_argument('--dry-run', action='store_true')
+    gc_parser.add_argument('--root', help='Каталог блобов (по умолчанию RESUME_BLOB_DIR)')
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(_gc(args.db_path, args.grace, args.dry_run, args.root))
@@ -0,0 +1,119 @@
+"""Разбор строк опыта и зарплаты в числовые диапазоны.
+
+Вакансии хранят исходный текст («$5k-7k», «2-3 years»), а для фильтров и
+сортировки при вставке из него получаются числа: опыт — в годах,
+зарплата — в долларах в месяц. Курсы валют статические: точности
+«примерно столько в долларах» для поиска хватает, а исходная сумма и
+валюта сохраняются рядом.
+"""
+import re
+from typing import NamedTuple, Optional, Tuple
+
+# Долларов за единицу валюты
+RATES_TO_USD = {
+    'USD': 1.0,
+    'EUR': 1.08,
+    'GBP': 1.27,
+    'CAD': 0.73,
+    'AED': 0.27,
+    'RUB': 0.011,
+    'RSD': 0.0092,
+}
+CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP', '₽': 'RUB'}
+
+# Множитель к месячной сумме: 40 часов в неделю, 52 недели в году
+PERIOD_TO_MONTH = {'hour': 40 * 52 / 12, 'month': 1.0, 'year': 1 / 12}
+# Без явного периода он угадывается по сумме в долларах:
+# меньше HOURLY_BELOW — почасовая ставка, от YEARLY_FROM — годовая
+HOURLY_BELOW = 200
+YEARLY_FROM = 20_000
+
+_AMOUNT = r'(\d+(?:[.,]\d+)?(?:[  ,]\d{3})*)\s*([kк])?'
+_RANGE_RE = re.compile(_AMOUNT + r'(?:\s*(?:[-–—]|to|до)\s*' + _AMOUNT + r')?', re.IGNORECASE)
+_CODE_RE = re.compile(r'\b(' + '|'.join(RATES_TO_USD) + r')\b', re.IGNORECASE)
+_PERIOD_RES = [
+    ('hour', re.compile(r'/\s*(?:h|hr|hour)\b|per\s+hour|hourly|в\s+час|/\s*час', re.IGNORECASE)),
+    ('year', re.compile(r'/\s*(?:y|yr|year)\b|per\s+(?:year|annum)|annual|yearly|в\s+год|/\s*год', re.IGNORECASE)),
+    ('month', re.compile(r'/\s*(?:mo|month)\b|per\s+month|monthly|в\s+месяц|/\s*мес', re.IGNORECASE)),
+]
+
+_EXPERIENCE_RANGE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:[-–—]|to|до)\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+_EXPERIENCE_OPEN_RE = re.compile(r'(\d+(?:\.\d+)?)\s*\+')
+_EXPERIENCE_SINGLE_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+
+class Salary(NamedTuple):
+    """Зарплата в долларах в месяц и исходные валюта и период"""
+    min: int
+    max: int
+    currency: str
+    period: str
+
+
+def parse_experience(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """«2-3 years» → (2, 3), «5+ years» → (5, None), без чисел → (None, None)"""
+    if not text:
+        return None, None
+    match = _EXPERIENCE_RANGE_RE.search(text)
+    if match:
+        low, high = sorted((float(match.group(1)), float(match.group(2))))
+        return int(low), int(high)
+    match = _EXPERIENCE_OPEN_RE.search(text)
+    if match:
+        return int(float(match.group(1))), None
+    match = _EXPERIENCE_SINGLE_RE.search(text)
+    if match:
+        years = int(float(match.group(1)))
+        return years, years
+    return None, None
+
+
+def _amount(number: str, thousands: Optional[str]) -> float:
+    digits = re.sub(r'[  ]', '', number)
+    # «120,000» — разделитель тысяч, «2,5» — десятичная запятая
+    if re.fullmatch(r'\d{1,3}(?:,\d{3})+', digits):
+        digits = digits.replace(',', '')
+    value = float(digits.replace(',', '.'))
+    return value * 1000 if thousands else value
+
+
+def _currency(text: str) -> str:
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        if symbol in text:
+            return code
+    match = _CODE_RE.search(text)
+    return match.group(1).upper() if match else 'USD'
+
+
+def _period(text: str, usd_amount: float) -> str:
+    for period, pattern in _PERIOD_RES:
+        if pattern.search(text):
+            return period
+    if usd_amount < HOURLY_BELOW:
+        return 'hour'
+    if usd_amount >= YEARLY_FROM:
+        return 'year'
+    return 'month'
+
+
+def parse_salary(text: Optional[str]) -> Optional[Salary]:
+    """«$5k-7k» → Salary(5000, 7000, 'USD', 'month'); без суммы → None"""
+    if not text:
+        return None
+    match = _RANGE_RE.search(text)
+    if not match:
+        return None
+    low_number, low_k, high_number, high_k = match.groups()
+    # «5-7k»: множитель второй границы относится и к первой
+    low = _amount(low_number, low_k or (high_k if high_number else None))
+    high = _amount(high_number, high_k) if high_number else low
+    if low > high:
+        low, high = high, low
+    if high <= 0:
+        return None
+
+    currency = _currency(text)
+    rate = RATES_TO_USD[currency]
+    period = _period(text, high * rate)
+    factor = rate * PERIOD_TO_MONTH[period]
+    return Salary(round(low * factor), round(high * factor), currency, period)
@@ -8,25 +8,55 @@ class Settings:
     # API Settings
     API_HOST = os.getenv('API_HOST', '0.0.0.0')
     API_PORT = int(os.getenv('API_PORT', 8090))
+    API_WORKERS = int(os.getenv('API_WORKERS', 1))
     
     # Database
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'data/jobs.db')
+    DB_POOL_READERS = int(os.getenv('DB_POOL_READERS', 4))
+    DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', 16384))
+    DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', 256 * 1024 * 1024))
+    
+    # Deployment: all — процесс может стать ведущим (загрузка каналов и
+    # очередь писем), api — только обслуживает запросы
+    ROLE = os.getenv('ROLE', 'all').lower()
+    LEADER_LEASE_TTL = float(os.getenv('LEADER_LEASE_TTL', 30))
+    CACHE_SYNC_INTERVAL = float(os.getenv('CACHE_SYNC_INTERVAL', 1))
+    
+    # Logging: logfmt или json
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'logfmt')
+    
+    # Diagnostics: /api/admin/* и заголовок X-Profile работают только с ADMIN_TOKEN
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN') or None
+    PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', 60))
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 0))  # 0 — журнал медленных запросов выключен
     
     # Telegram
     TELEGRAM_API_ID = os.getenv('TELEGRAM_API_ID')
     TELEGRAM_API_HASH = os.getenv('TELEGRAM_API_HASH')
     TELEGRAM_PHONE = os.getenv('TELEGRAM_PHONE')
     
-    # Channels to monitor
+    # Channels to monitor (comma-separated in TELEGRAM_CHANNELS)
     TELEGRAM_CHANNELS = [
-        'revacancy_global',
-        'datasciencejobs'
+        channel.strip().lstrip('@')
+        for channel in os.getenv('TELEGRAM_CHANNELS', 'revacancy_global,datasciencejobs').split(',')
+        if channel.strip()
     ]
     
+    # Crawler settings
+    CRAWL_CONCURRENCY = int(os.getenv('CRAWL_CONCURRENCY', 4))
+    CRAWL_CHANNEL_MIN_INTERVAL = float(os.getenv('CRAWL_CHANNEL_MIN_INTERVAL', 30))
+    CRAWL_MAX_FLOOD_WAIT = float(os.getenv('CRAWL_MAX_FLOOD_WAIT', 300))
+    
     # Parsing settings
     PARSE_INTERVAL_MINUTES = int(os.getenv('PARSE_INTERVAL_MINUTES', 10))
     MESSAGES_LIMIT = int(os.getenv('MESSAGES_LIMIT', 100))
+    MAX_BACKFILL_MESSAGES = int(os.getenv('MAX_BACKFILL_MESSAGES', 2000))
     DAYS_BACK = int(os.getenv('DAYS_BACK', 7))
+    PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', 2))  # 0 — парсинг в основном процессе
+    PARSE_BATCH_SIZE = int(os.getenv('PARSE_BATCH_SIZE', 200))
+    PARSE_MAX_PENDING_BATCHES = int(os.getenv('PARSE_MAX_PENDING_BATCHES', 4))
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 5000))  # сообщений экспорта на транзакцию
     
     # SMTP Settings
     SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
@@ -34,10 +64,31 @@ class Settings:
     SMTP_USER = os.getenv('SMTP_USER')
     SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
     FROM_EMAIL = os.getenv('FROM_EMAIL', SMTP_USER)
+    SMTP_START_TLS = os.getenv('SMTP_START_TLS', 'true').lower() in ('1', 'true', 'yes')
+    SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', 30))
+    SMTP_IDLE_TIMEOUT = float(os.getenv('SMTP_IDLE_TIMEOUT', 60))  # сервер закрывает простаивающее соединение
+    
+    # Email outbox
+    EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', 20))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 6))
+    EMAIL_RETRY_BASE_DELAY = float(os.getenv('EMAIL_RETRY_BASE_DELAY', 30))
+    EMAIL_RETRY_MAX_DELAY = float(os.getenv('EMAIL_RETRY_MAX_DELAY', 3600))
+    EMAIL_POLL_INTERVAL = float(os.getenv('EMAIL_POLL_INTERVAL', 5))
+    
+    # Response cache
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', 60))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1000))
+    
+    # Export
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 5000))
     
     # Upload settings
     UPLOAD_DIR = os.getenv('UPLOAD_DIR', 'uploads/resumes')
-    MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10 MB
+    MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_SIZE', 10 * 1024 * 1024))  # 10 MB
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 64 * 1024))
+    RESUME_BLOB_DIR = os.getenv('RESUME_BLOB_DIR', os.path.join(UPLOAD_DIR, 'blobs'))
+    RESUME_PART_CACHE_BYTES = int(os.getenv('RESUME_PART_CACHE_BYTES', 64 * 1024 * 1024))  # закодированные вложения в памяти
     
     # Job filtering
     PRIORITY_LOCATIONS = ['Dubai', 'Canada', 'Ireland', 'Serbia']
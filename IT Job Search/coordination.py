@@ -0,0 +1,180 @@
+"""Несколько процессов API над одной базой SQLite.
+
+Фоновые задачи (загрузка каналов, очередь писем) должны идти ровно в
+одном процессе — его выбирает аренда в таблице leases. Кэши ответов
+живут в каждом процессе, и записи других процессов сбрасывают их через
+PRAGMA data_version и change_counters.
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from database import Database
+from confiq import settings
+from logs import get_logger
+
+log = get_logger(__name__)
+
+
+class LeaderElection:
+    """Выбор ведущего процесса арендой в SQLite.
+
+    Каждые ttl/3 секунд процесс занимает или продлевает аренду name.
+    Получив её, он вызывает on_elected(), потеряв — on_demoted(). Если
+    ведущий процесс умер, аренду через ttl секунд займёт другой; при
+    штатной остановке она освобождается сразу.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        name: str = 'ingest',
+        ttl: float = None,
+    ):
+        self.db = db
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.name = name
+        self.ttl = ttl or settings.LEADER_LEASE_TTL
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.elections = 0
+        self._expires_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def _renew(self) -> bool:
+        started = time.monotonic()
+        try:
+            acquired = await self.db.acquire_lease(self.name, self.holder, self.ttl)
+        except Exception as e:
+            log.error("Ошибка продления аренды", lease=self.name, error=e)
+            # Уже полученная аренда действует до своего срока
+            return self.is_leader and time.monotonic() < self._expires_at
+        if acquired:
+            self._expires_at = started + self.ttl
+        return acquired
+
+    async def run(self):
+        while True:
+            acquired = await self._renew()
+            if acquired and not self.is_leader:
+                self.is_leader = True
+                self.elections += 1
+                log.info("Процесс стал ведущим", lease=self.name, holder=self.holder)
+                await self._call(self.on_elected)
+            elif not acquired and self.is_leader:
+                self.is_leader = False
+                log.warning("Процесс потерял аренду", lease=self.name, holder=self.holder)
+                await self._call(self.on_demoted)
+            await asyncio.sleep(self.ttl / 3)
+
+    @staticmethod
+    async def _call(callback: Callable[[], Awaitable[None]]):
+        try:
+            await callback()
+        except Exception as e:
+            log.error("Ошибка смены роли процесса", error=e)
+
+    def metrics(self) -> dict:
+        return {
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "elections": self.elections,
+            "ttl_sec": self.ttl,
+        }
+
+    async def close(self):
+        """Остановить продление, снять роль и освободить аренду"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            self.is_leader = False
+            await self._call(self.on_demoted)
+            await self.db.release_lease(self.name, self.holder)
+
+
+class ChangeWatcher:
+    """Сброс кэшей процесса после записей из других процессов.
+
+    Раз в interval секунд читается PRAGMA data_version — это не трогает
+    файл, пока никто не писал. Если значение изменилось, по
+    change_counters определяется, какие таблицы менялись, и для них
+    вызывается on_change(tables), как у write listener базы.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        on_change: Callable[[Tuple[str, ...]], None],
+        interval: float = None,
+    ):
+        self.db = db
+        self.on_change = on_change
+        self.interval = interval or settings.CACHE_SYNC_INTERVAL
+        self._data_version: Optional[int] = None
+        self._versions: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.checks = 0
+        self.changes = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def check(self) -> Tuple[str, ...]:
+        """Проверить изменения; возвращает изменившиеся таблицы"""
+        self.checks += 1
+        data_version = await self.db.pool.data_version()
+        if data_version == self._data_version:
+            return ()
+        self._data_version = data_version
+        versions = await self.db.get_change_versions()
+        # Первое чтение — точка отсчёта, а не изменение
+        changed = tuple(
+            name for name, version in versions.items()
+            if self._versions and self._versions.get(name) != version
+        )
+        self._versions = versions
+        if changed:
+            self.changes += 1
+            self.on_change(changed)
+        return changed
+
+    async def run(self):
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                log.error("Ошибка проверки изменений БД", error=e)
+            await asyncio.sleep(self.interval)
+
+    def metrics(self) -> dict:
+        return {
+            "interval_sec": self.interval,
+            "checks": self.checks,
+            "changes": self.changes,
+            "versions": dict(self._versions),
+        }
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
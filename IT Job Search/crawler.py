@@ -0,0 +1,164 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from telethon.errors import FloodWaitError
+
+from models import Job
+from telegram_parser import TelegramParser
+from database import Database
+from confiq import settings
+from logs import get_logger
+
+log = get_logger(__name__)
+
+
+class ChannelResult:
+    """Результат обхода одного канала"""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.jobs: List[Job] = []
+        self.messages_fetched = 0
+        self.last_message_id: Optional[int] = None
+        self.duration = 0.0
+        self.flood_waits = 0
+        self.error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _ChannelState:
+    """Состояние ограничения частоты для канала"""
+
+    def __init__(self):
+        self.next_allowed_at = 0.0
+        self.backoff_until = 0.0
+        self.flood_strikes = 0
+
+
+class ChannelCrawler:
+    """Параллельный обход каналов Telegram.
+
+    Одновременно загружается не больше max_concurrency каналов. Каждый
+    канал опрашивается не чаще раза в min_interval секунд. FloodWaitError
+    откладывает только свой канал на время, указанное Telegram, с
+    экспоненциальным ростом при повторных ошибках.
+    """
+
+    def __init__(
+        self,
+        parser: TelegramParser,
+        channels: List[str] = None,
+        db: Database = None,
+        max_concurrency: int = None,
+        min_interval: float = None,
+        max_flood_wait: float = None,
+        max_retries: int = 2,
+    ):
+        self.parser = parser
+        self.db = db
+        self.channels = list(channels or settings.TELEGRAM_CHANNELS)
+        self.max_concurrency = max_concurrency or settings.CRAWL_CONCURRENCY
+        self.min_interval = (
+            settings.CRAWL_CHANNEL_MIN_INTERVAL if min_interval is None else min_interval
+        )
+        self.max_flood_wait = (
+            settings.CRAWL_MAX_FLOOD_WAIT if max_flood_wait is None else max_flood_wait
+        )
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._states: Dict[str, _ChannelState] = {}
+        self._high_water_marks: Dict[str, int] = {}
+
+    def _state(self, channel: str) -> _ChannelState:
+        if channel not in self._states:
+            self._states[channel] = _ChannelState()
+        return self._states[channel]
+
+    async def _wait_turn(self, state: _ChannelState) -> bool:
+        """Дождаться разрешённого момента опроса; False — канал пропускается"""
+        ready_at = max(state.next_allowed_at, state.backoff_until)
+        delay = ready_at - time.monotonic()
+        if delay > self.max_flood_wait:
+            return False
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return True
+
+    async def crawl_channel(self, channel: str) -> ChannelResult:
+        """Загрузить и распарсить один канал с учётом FloodWait"""
+        result = ChannelResult(channel)
+        state = self._state(channel)
+        started = time.monotonic()
+
+        for attempt in range(self.max_retries + 1):
+            # Ожидание идёт вне семафора, чтобы не занимать слот
+            if not await self._wait_turn(state):
+                result.error = "FloodWait: канал отложен до следующего цикла"
+                break
+
+            try:
+                async with self._semaphore:
+                    state.next_allowed_at = time.monotonic() + self.min_interval
+                    messages = await self.parser.fetch_messages(
+                        channel, min_id=self._high_water_marks.get(channel, 0)
+                    )
+            except FloodWaitError as e:
+                result.flood_waits += 1
+                state.flood_strikes += 1
+                backoff = e.seconds * (2 ** (state.flood_strikes - 1))
+                state.backoff_until = time.monotonic() + backoff
+                log.warning("FloodWait", channel=channel, wait_sec=e.seconds, backoff_sec=backoff)
+                result.error = f"FloodWait {e.seconds}s"
+                continue
+            except Exception as e:
+                result.error = str(e)
+                log.error("Ошибка загрузки канала", channel=channel, error=e)
+                break
+
+            state.flood_strikes = 0
+            result.error = None
+            result.messages_fetched = len(messages)
+            try:
+                result.jobs = await self.parser.parse_messages_async(messages, channel)
+            except Exception as e:
+                # Отметка не сдвигается: сообщения перечитаются в следующем цикле
+                result.error = f"Ошибка разбора: {e}"
+                log.error("Ошибка разбора канала", channel=channel, error=e)
+                break
+            if messages:
+                result.last_message_id = max(m.id for m in messages)
+            break
+
+        result.duration = time.monotonic() - started
+        return result
+
+    async def crawl(
+        self,
+        on_result: Callable[[ChannelResult], Awaitable[None]] = None
+    ) -> List[ChannelResult]:
+        """Обойти все каналы параллельно.
+
+        on_result вызывается для каждого канала сразу по готовности,
+        не дожидаясь остальных. Если задан db, загрузка каждого канала
+        начинается после его сохранённого high-water mark. Ошибка в
+        on_result записывается в error своего канала и не прерывает
+        обход остальных.
+        """
+        if self.db:
+            self._high_water_marks = await self.db.get_channel_high_water_marks()
+
+        async def run(channel: str) -> ChannelResult:
+            result = await self.crawl_channel(channel)
+            if on_result:
+                try:
+                    await on_result(result)
+                except Exception as e:
+                    result.error = result.error or f"Ошибка сохранения: {e}"
+                    log.error("Ошибка сохранения канала", channel=channel, error=e)
+            return result
+
+        return list(await asyncio.gather(*(run(c) for c in self.channels)))
@@ -1,15 +1,97 @@
-import aiosqlite
-from typing import List, Optional
+import asyncio
+import html
+import json
+import math
+import os
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 from models import Job, Application, JobFilter
+from db_pool import ConnectionPool
+from uploads import StoredUpload
+from migrations import migrate
+from pagination import encode_cursor, decode_cursor
+from confiq import settings
+import compensation
+import dedup
+from logs import get_logger
+from metrics import instrument_methods
 
+log = get_logger(__name__)
+
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+_TOKEN_RE = re.compile(r'\w+')
+
+def build_fts_query(search: str) -> Optional[str]:
+    """Преобразовать пользовательский поиск в запрос FTS5.
+    
+    Фразы в кавычках ищутся целиком, остальные слова — по префиксу.
+    Все части объединяются через AND. Спецсимволы FTS5 отбрасываются,
+    поэтому пользовательский ввод не может сломать синтаксис MATCH.
+    """
+    parts = []
+    for phrase in _PHRASE_RE.findall(search):
+        tokens = _TOKEN_RE.findall(phrase)
+        if tokens:
+            parts.append('"' + ' '.join(tokens) + '"')
+    for token in _TOKEN_RE.findall(_PHRASE_RE.sub(' ', search)):
+        parts.append(f'"{token}"*')
+    return ' AND '.join(parts) if parts else None
+
+# Границы совпадений в snippet(): управляющие символы вместо <mark>,
+# чтобы разметку добавлять уже после экранирования текста сообщения
+_SNIPPET_START, _SNIPPET_END = '\x02', '\x03'
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    """Фрагмент FTS5 как безопасный HTML: текст экранирован, совпадения в <mark>"""
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet, quote=False)
+        .replace(_SNIPPET_START, '<mark>')
+        .replace(_SNIPPET_END, '</mark>')
+    )
+
+@instrument_methods
 class Database:
-    def __init__(self, db_path: str = "jobs.db"):
+    def __init__(self, db_path: str = "jobs.db", readers: int = None):
         self.db_path = db_path
+        self.pool = ConnectionPool(
+            db_path,
+            readers=readers or settings.DB_POOL_READERS,
+            cache_size_kb=settings.DB_CACHE_SIZE_KB,
+            mmap_size=settings.DB_MMAP_SIZE,
+            slow_query_ms=settings.SLOW_QUERY_MS,
+        )
+        self._write_listeners: List[Callable[[Tuple[str, ...]], None]] = []
+    
+    def add_write_listener(self, listener: Callable[[Tuple[str, ...]], None]):
+        """Подписаться на изменения данных.
+        
+        listener(tables) вызывается после коммита с именами изменённых
+        таблиц — например, чтобы сбросить кэш ответов API.
+        """
+        self._write_listeners.append(listener)
+    
+    def _notify_write(self, *tables: str):
+        for listener in self._write_listeners:
+            try:
+                listener(tables)
+            except Exception as e:
+                log.error("Ошибка обработчика изменений БД", tables=",".join(tables), error=e)
+    
+    def _notify_jobs_written(self, result: dict):
+        if result["inserted"] or result["near_duplicates"]:
+            self._notify_write("jobs")
     
     async def init_db(self):
         """Инициализация базы данных"""
-        async with aiosqlite.connect(self.db_path) as db:
+        await self.pool.open()
+        async with self.pool.writer() as db:
+            # Несколько воркеров стартуют одновременно: миграции должны
+            # выполняться по очереди, а не падать с SQLITE_BUSY на записи
+            await db.execute("BEGIN IMMEDIATE")
             # Таблица вакансий
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS jobs (
@@ -51,66 +133,873 @@ class Database:
             await db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_title ON jobs(title)")
             await db.execute("CREATE INDEX IF NOT EXISTS idx_applications_job ON applications(job_id)")
             
-            await db.commit()
-            print("✅ База данных инициализирована")
+            await migrate(db)
+            
+        log.info("База данных инициализирована", path=self.db_path)
+    
+    async def close(self):
+        """Закрыть соединения с базой данных"""
+        await self.pool.close()
+    
+    def pool_metrics(self) -> dict:
+        """Метрики пула соединений"""
+        return self.pool.metrics()
+    
+    INSERT_JOB_SQL = """
+        INSERT OR IGNORE INTO jobs 
+        (title, company, location, experience, salary, description, 
+         tags, source, posted_date, contact_email, contact_telegram,
+         experience_min, experience_max, salary_min, salary_max,
+         salary_currency, salary_period)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    @staticmethod
+    def compensation_params(experience: Optional[str], salary: Optional[str]) -> tuple:
+        """Числовые колонки опыта и зарплаты для INSERT_JOB_SQL"""
+        parsed = compensation.parse_salary(salary)
+        return (
+            *compensation.parse_experience(experience),
+            *(parsed if parsed else (None, None, None, None))
+        )
+    
+    @classmethod
+    def _job_params(cls, job: Job) -> tuple:
+        """Параметры INSERT для вакансии"""
+        return (
+            job.title, job.company, job.location, job.experience,
+            job.salary, job.description, ','.join(job.tags),
+            job.source, job.posted_date, job.contact_email,
+            job.contact_telegram,
+            *cls.compensation_params(
+                None if job.experience_is_default else job.experience, job.salary
+            )
+        )
+    
+    # Ключ точного дубликата — как UNIQUE(title, company, posted_date)
+    _BY_KEY = "FROM jobs WHERE title = ? AND company = ? AND posted_date = ?"
+    
+    @staticmethod
+    def _job_key(job: Job) -> tuple:
+        return (job.title, job.company, job.posted_date)
     
     async def add_job(self, job: Job) -> Optional[int]:
-        """Добавить вакансию"""
+        """Добавить вакансию; возвращает id новой строки или None для дубликата"""
+        job_id = None
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute("""
-                    INSERT OR IGNORE INTO jobs 
-                    (title, company, location, experience, salary, description, 
-                     tags, source, posted_date, contact_email, contact_telegram)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    job.title, job.company, job.location, job.experience,
-                    job.salary, job.description, ','.join(job.tags),
-                    job.source, job.posted_date, job.contact_email,
-                    job.contact_telegram
-                ))
-                await db.commit()
-                return cursor.lastrowid
+            async with self.pool.writer() as db:
+                result = await self._insert_jobs(db, [job])
+                if result["inserted"]:
+                    async with db.execute(f"SELECT id {self._BY_KEY}", self._job_key(job)) as cursor:
+                        job_id = (await cursor.fetchone())[0]
         except Exception as e:
-            print(f"❌ Ошибка добавления вакансии: {e}")
+            log.error("Ошибка добавления вакансии", error=e)
             return None
+        self._notify_jobs_written(result)
+        return job_id
     
-    async def get_jobs(self, filters: JobFilter, limit: int = 50) -> List[Job]:
-        """Получить вакансии с фильтрами"""
-        query = "SELECT * FROM jobs WHERE 1=1"
-        params = []
+    async def _find_near_duplicate(self, db, job: Job, signature: int, job_bands: list):
+        """Ближайшая сохранённая вакансия из тех же LSH-корзин.
+        
+        Возвращает (ключ, расстояние), "exact" — если вакансия с тем же
+        ключом уже есть (её отбросит UNIQUE), или None.
+        """
+        buckets = " UNION ".join([
+            "SELECT job_id FROM (SELECT job_id FROM job_lsh"
+            " WHERE band = ? AND bucket = ? ORDER BY job_id DESC LIMIT ?)"
+        ] * len(job_bands))
+        params = [
+            value
+            for band, bucket in job_bands
+            for value in (band, bucket, dedup.MAX_BUCKET_CANDIDATES)
+        ]
+        async with db.execute(f"""
+            SELECT c.job_id, f.simhash
+            FROM ({buckets}) c
+            JOIN job_fingerprints f ON f.job_id = c.job_id
+        """, params) as cursor:
+            candidates = await cursor.fetchall()
+        
+        # Строки jobs читаются только для близких кандидатов, а не для всей корзины
+        close = {}
+        for job_id, simhash in candidates:
+            dist = dedup.distance(signature, dedup.from_sqlite(simhash))
+            if dist <= dedup.MAX_DISTANCE:
+                close[job_id] = dist
+        if not close:
+            return None
+        
+        # Вакансия с тем же ключом тоже попадает в выборку: её отбросит UNIQUE
+        key = self._job_key(job)
+        async with db.execute(f"""
+            SELECT id, title, company, posted_date FROM jobs
+            WHERE id IN ({','.join('?' * len(close))})
+               OR (title = ? AND company = ? AND posted_date = ?)
+        """, [*close, *key]) as cursor:
+            rows = await cursor.fetchall()
+        
+        best = None
+        for row in rows:
+            other_key = (row['title'], row['company'], row['posted_date'])
+            if other_key == key:
+                return "exact"
+            dist = close[row['id']]
+            if best is None or dist < best[1]:
+                best = (other_key, dist)
+        return best
+    
+    async def _split_near_duplicates(self, db, jobs: List[Job]):
+        """Отделить почти-дубликаты уже сохранённых и соседних по пачке вакансий.
+        
+        Возвращает (вакансии к вставке, их отпечатки, ссылки на канонические).
+        """
+        to_insert, fingerprints, links = [], [], []
+        batch_buckets = {}
+        for job in jobs:
+            key = self._job_key(job)
+            signature = dedup.simhash(job.description)
+            if signature is None:
+                to_insert.append(job)
+                continue
+            job_bands = list(enumerate(dedup.bands(signature)))
+            
+            # Сначала кандидаты из этой же пачки, затем из базы
+            match = None
+            for band in job_bands:
+                for other_signature, other_key in batch_buckets.get(band, ()):
+                    dist = dedup.distance(signature, other_signature)
+                    if other_key != key and dist <= dedup.MAX_DISTANCE:
+                        match = (other_key, dist)
+                        break
+                if match:
+                    break
+            if match is None:
+                match = await self._find_near_duplicate(db, job, signature, job_bands)
+            
+            if match and match != "exact":
+                links.append((match[0], match[1], job))
+                continue
+            to_insert.append(job)
+            fingerprints.append((key, signature, job_bands))
+            for band in job_bands:
+                batch_buckets.setdefault(band, []).append((signature, key))
+        return to_insert, fingerprints, links
+    
+    async def _insert_jobs(self, db, jobs: List[Job]) -> dict:
+        """Вставить пачку вакансий в открытой транзакции писателя"""
+        result = {"inserted": 0, "duplicates": 0, "near_duplicates": 0}
+        if not jobs:
+            return result
+        
+        to_insert, fingerprints, links = await self._split_near_duplicates(db, jobs)
+        
+        if to_insert:
+            cursor = await db.executemany(
+                self.INSERT_JOB_SQL,
+                [self._job_params(job) for job in to_insert]
+            )
+            # rowcount у executemany — сумма вставленных строк без учёта триггеров
+            result["inserted"] = cursor.rowcount
+            result["duplicates"] = len(to_insert) - cursor.rowcount
+        
+        # id новых строк неизвестны после executemany — связываем по ключу
+        if to_insert:
+            await self._link_tags(db, to_insert)
+        
+        if fingerprints:
+            await db.executemany(
+                f"INSERT OR IGNORE INTO job_fingerprints (job_id, simhash) SELECT id, ? {self._BY_KEY}",
+                [(dedup.to_sqlite(signature), *key) for key, signature, _ in fingerprints]
+            )
+            await db.executemany(
+                f"INSERT OR IGNORE INTO job_lsh (band, bucket, job_id) SELECT ?, ?, id {self._BY_KEY}",
+                [
+                    (band, bucket, *key)
+                    for key, _, job_bands in fingerprints
+                    for band, bucket in job_bands
+                ]
+            )
+        
+        if links:
+            cursor = await db.executemany(f"""
+                INSERT OR IGNORE INTO job_duplicates
+                (canonical_job_id, title, company, source, posted_date, distance)
+                SELECT id, ?, ?, ?, ?, ? {self._BY_KEY}
+            """, [
+                (job.title, job.company, job.source, job.posted_date, dist, *canonical_key)
+                for canonical_key, dist, job in links
+            ])
+            # Повторно присланный почти-дубликат уже записан: это точный дубликат
+            result["near_duplicates"] = cursor.rowcount
+            result["duplicates"] += len(links) - cursor.rowcount
+        
+        return result
+    
+    @staticmethod
+    def _tag_names(tags: List[str]) -> List[str]:
+        """Теги без пробелов по краям и повторов (без учёта регистра)"""
+        names = {}
+        for tag in tags:
+            name = tag.strip()
+            if name:
+                names.setdefault(name.lower(), name)
+        return list(names.values())
+    
+    async def _link_tags(self, db, jobs: List[Job]):
+        """Записать теги вставленных вакансий в tags и job_tags.
+        
+        Сравнение jobs.tags отсекает точные дубликаты: строка с тем же
+        ключом, но другими тегами, уже сохранена и не меняется.
+        """
+        names = {}
+        for job in jobs:
+            for name in self._tag_names(job.tags):
+                names.setdefault(name.lower(), name)
+        if not names:
+            return
+        await db.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", [(n,) for n in names.values()])
+        await db.executemany("""
+            INSERT OR IGNORE INTO job_tags (tag_id, job_id)
+            SELECT tags.id, jobs.id FROM jobs JOIN tags ON tags.name = ?
+            WHERE jobs.title = ? AND jobs.company = ? AND jobs.posted_date = ? AND jobs.tags = ?
+        """, [
+            (name, *self._job_key(job), ','.join(job.tags))
+            for job in jobs
+            for name in self._tag_names(job.tags)
+        ])
+    
+    async def add_jobs(self, jobs: List[Job]) -> dict:
+        """Добавить пачку вакансий одной транзакцией.
+        
+        Возвращает {"inserted": N, "duplicates": M, "near_duplicates": K}.
+        Дубликаты — строки, отброшенные ограничением
+        UNIQUE(title, company, posted_date); почти-дубликаты — вакансии с
+        похожим описанием, записанные ссылкой в job_duplicates.
+        """
+        empty = {"inserted": 0, "duplicates": 0, "near_duplicates": 0}
+        if not jobs:
+            return empty
+        
+        try:
+            async with self.pool.writer() as db:
+                result = await self._insert_jobs(db, jobs)
+        except Exception as e:
+            log.error("Ошибка пакетного добавления вакансий", jobs=len(jobs), error=e)
+            return empty
+        self._notify_jobs_written(result)
+        return result
+    
+    async def save_channel_jobs(
+        self,
+        channel: str,
+        jobs: List[Job],
+        last_message_id: Optional[int]
+    ) -> Optional[dict]:
+        """Сохранить вакансии канала и сдвинуть его high-water mark.
+        
+        Обе записи идут в одной транзакции: если вставка не удалась,
+        отметка не сдвигается, и сообщения будут загружены повторно.
+        Возвращает None при ошибке.
+        """
+        try:
+            async with self.pool.writer() as db:
+                result = await self._insert_jobs(db, jobs)
+                await self._advance_channel(db, channel, last_message_id)
+        except Exception as e:
+            log.error("Ошибка сохранения вакансий канала", channel=channel, error=e)
+            return None
+        self._notify_jobs_written(result)
+        return result
+    
+    @staticmethod
+    async def _advance_channel(db, channel: str, last_message_id: Optional[int]):
+        """Сдвинуть high-water mark канала (только вперёд)"""
+        if not last_message_id:
+            return
+        await db.execute("""
+            INSERT INTO channel_state (channel, last_message_id, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(channel) DO UPDATE SET
+                last_message_id = MAX(last_message_id, excluded.last_message_id),
+                updated_at = CURRENT_TIMESTAMP
+        """, (channel, last_message_id))
+    
+    CHECKPOINT_FIELDS = (
+        'source_file', 'channel', 'file_size', 'file_mtime', 'byte_offset',
+        'last_message_id', 'messages_read', 'jobs_inserted', 'duplicates', 'finished',
+    )
+    
+    async def save_import_batch(self, jobs: List[Job], checkpoint: dict) -> dict:
+        """Сохранить пачку импорта вместе с контрольной точкой.
+        
+        Вакансии, high-water mark канала и checkpoint пишутся одной
+        транзакцией: после сбоя импорт продолжится ровно с первой
+        несохранённой пачки. Счётчики checkpoint увеличиваются на
+        результат вставки. Ошибки пробрасываются вызывающему.
+        """
+        async with self.pool.writer() as db:
+            result = await self._insert_jobs(db, jobs)
+            checkpoint['jobs_inserted'] += result['inserted']
+            checkpoint['duplicates'] += result['duplicates'] + result['near_duplicates']
+            await self._advance_channel(db, checkpoint['channel'], checkpoint['last_message_id'])
+            placeholders = ', '.join('?' * len(self.CHECKPOINT_FIELDS))
+            updates = ', '.join(f"{f} = excluded.{f}" for f in self.CHECKPOINT_FIELDS[1:])
+            await db.execute(f"""
+                INSERT INTO import_checkpoints ({', '.join(self.CHECKPOINT_FIELDS)}, updated_at)
+                VALUES ({placeholders}, CURRENT_TIMESTAMP)
+                ON CONFLICT(source_file) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP
+            """, [checkpoint[f] for f in self.CHECKPOINT_FIELDS])
+        self._notify_jobs_written(result)
+        return result
+    
+    async def get_import_checkpoint(self, source_file: str) -> Optional[dict]:
+        """Контрольная точка импорта файла или None"""
+        async with self.pool.reader() as db:
+            async with db.execute(
+                "SELECT * FROM import_checkpoints WHERE source_file = ?", (source_file,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+    
+    async def delete_import_checkpoint(self, source_file: str):
+        """Забыть контрольную точку, чтобы импортировать файл заново"""
+        async with self.pool.writer() as db:
+            await db.execute("DELETE FROM import_checkpoints WHERE source_file = ?", (source_file,))
+    
+    async def get_channel_high_water_marks(self) -> Dict[str, int]:
+        """Последний обработанный message.id по каждому каналу"""
+        async with self.pool.reader() as db:
+            async with db.execute(
+                "SELECT channel, last_message_id FROM channel_state"
+            ) as cursor:
+                return {row['channel']: row['last_message_id'] for row in await cursor.fetchall()}
+    
+    INGEST_CHANNEL_FIELDS = (
+        'channel', 'duration', 'messages_fetched', 'jobs_parsed',
+        'jobs_inserted', 'duplicates', 'flood_waits', 'error',
+    )
+    
+    async def start_ingest_run(self, trigger: str) -> int:
+        """Записать начало цикла загрузки, вернуть его id"""
+        async with self.pool.writer() as db:
+            cursor = await db.execute(
+                "INSERT INTO ingest_runs (trigger) VALUES (?)", (trigger,)
+            )
+            return cursor.lastrowid
+    
+    async def save_ingest_channel(self, run_id: int, stats: dict):
+        """Итог обхода одного канала в цикле run_id"""
+        placeholders = ', '.join('?' * len(self.INGEST_CHANNEL_FIELDS))
+        async with self.pool.writer() as db:
+            await db.execute(f"""
+                INSERT OR REPLACE INTO ingest_run_channels (run_id, {', '.join(self.INGEST_CHANNEL_FIELDS)})
+                VALUES (?, {placeholders})
+            """, [run_id] + [stats.get(f) for f in self.INGEST_CHANNEL_FIELDS])
+    
+    async def finish_ingest_run(self, run_id: int, status: str, duration: float, error: str = None):
+        async with self.pool.writer() as db:
+            await db.execute("""
+                UPDATE ingest_runs
+                SET status = ?, duration = ?, error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (status, duration, error[:500] if error else None, run_id))
+    
+    async def interrupt_ingest_runs(self) -> int:
+        """Пометить циклы, оборванные остановкой процесса, как interrupted"""
+        async with self.pool.writer() as db:
+            cursor = await db.execute("""
+                UPDATE ingest_runs SET status = 'interrupted', finished_at = CURRENT_TIMESTAMP
+                WHERE status = 'running'
+            """)
+            return cursor.rowcount
+    
+    async def get_ingest_runs(self, limit: int = 20) -> List[dict]:
+        """Последние циклы загрузки со статистикой по каналам"""
+        async with self.pool.reader() as db:
+            async with db.execute(
+                "SELECT * FROM ingest_runs ORDER BY id DESC LIMIT ?", (limit,)
+            ) as cursor:
+                runs = [dict(row) for row in await cursor.fetchall()]
+            if not runs:
+                return []
+            by_id = {run['id']: run for run in runs}
+            for run in runs:
+                run['channels'] = []
+            placeholders = ', '.join('?' * len(runs))
+            async with db.execute(f"""
+                SELECT * FROM ingest_run_channels
+                WHERE run_id IN ({placeholders}) ORDER BY run_id, channel
+            """, list(by_id)) as cursor:
+                for row in await cursor.fetchall():
+                    channel = dict(row)
+                    by_id[channel.pop('run_id')]['channels'].append(channel)
+        return runs
+    
+    async def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        """Занять или продлить аренду name на ttl секунд.
+        
+        Успешно, если аренда свободна, истекла или уже принадлежит
+        holder. Проверка и запись идут в одной транзакции писателя,
+        поэтому из нескольких процессов аренду получает только один.
+        """
+        now = time.time()
+        async with self.pool.writer() as db:
+            await db.execute("""
+                INSERT INTO leases (name, holder, acquired_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    acquired_at = CASE WHEN holder = excluded.holder
+                                       THEN acquired_at ELSE excluded.acquired_at END,
+                    holder = excluded.holder,
+                    expires_at = excluded.expires_at
+                WHERE holder = excluded.holder OR expires_at < excluded.acquired_at
+            """, (name, holder, now, now + ttl))
+            async with db.execute("SELECT holder FROM leases WHERE name = ?", (name,)) as cursor:
+                return (await cursor.fetchone())[0] == holder
+    
+    async def release_lease(self, name: str, holder: str):
+        """Освободить аренду, если она ещё принадлежит holder"""
+        async with self.pool.writer() as db:
+            await db.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder))
+    
+    async def get_lease(self, name: str) -> Optional[dict]:
+        async with self.pool.reader() as db:
+            async with db.execute("SELECT * FROM leases WHERE name = ?", (name,)) as cursor:
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+    
+    async def request_ingest(self):
+        """Попросить ведущий процесс запустить загрузку каналов"""
+        async with self.pool.writer() as db:
+            await db.execute("""
+                INSERT INTO change_counters (name, version) VALUES ('ingest_trigger', 1)
+                ON CONFLICT(name) DO UPDATE SET version = version + 1
+            """)
+    
+    async def get_change_versions(self) -> Dict[str, int]:
+        """Номера изменений таблиц (ведут триггеры, общие для всех процессов)"""
+        async with self.pool.reader() as db:
+            async with db.execute("SELECT name, version FROM change_counters") as cursor:
+                return {row['name']: row['version'] for row in await cursor.fetchall()}
+    
+    async def get_job_duplicates(self, job_id: int) -> List[dict]:
+        """Почти-дубликаты, привязанные к вакансии"""
+        async with self.pool.reader() as db:
+            async with db.execute("""
+                SELECT title, company, source, posted_date, distance, created_at
+                FROM job_duplicates
+                WHERE canonical_job_id = ?
+                ORDER BY created_at DESC
+            """, (job_id,)) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+    
+    async def get_telegram_peers(self) -> Dict[str, tuple]:
+        """Сохранённые InputPeer каналов: username -> (тип, id, access_hash)"""
+        async with self.pool.reader() as db:
+            async with db.execute(
+                "SELECT username, peer_type, peer_id, access_hash FROM telegram_peers"
+            ) as cursor:
+                return {
+                    row['username']: (row['peer_type'], row['peer_id'], row['access_hash'])
+                    for row in await cursor.fetchall()
+                }
+    
+    async def save_telegram_peer(
+        self, username: str, peer_type: str, peer_id: int, access_hash: int
+    ):
+        """Сохранить разрешённый InputPeer канала"""
+        async with self.pool.writer() as db:
+            await db.execute("""
+                INSERT INTO telegram_peers (username, peer_type, peer_id, access_hash, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(username) DO UPDATE SET
+                    peer_type = excluded.peer_type,
+                    peer_id = excluded.peer_id,
+                    access_hash = excluded.access_hash,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (username, peer_type, peer_id, access_hash))
+    
+    async def delete_telegram_peer(self, username: str):
+        """Удалить устаревший InputPeer канала"""
+        async with self.pool.writer() as db:
+            await db.execute("DELETE FROM telegram_peers WHERE username = ?", (username,))
+    
+    # Колонки, доступные для проекции через fields=
+    JOB_FIELDS = (
+        'id', 'title', 'company', 'location', 'experience', 'salary',
+        'description', 'tags', 'source', 'posted_date', 'contact_email',
+        'contact_telegram', 'created_at', 'experience_min', 'experience_max',
+        'salary_min', 'salary_max', 'salary_currency', 'salary_period'
+    )
+    
+    # Выбор плана для тегов и диапазонов: редкое условие выгоднее сделать
+    # ведущим — взять подходящие id по его индексу и отсортировать
+    # (~count строк с сортировкой); частое — проверять у каждой строки при
+    # обходе индекса сортировки (~limit * total / count дешёвых проб).
+    # Множитель — относительная цена строки первого плана
+    DRIVER_COST = 10
+    
+    _HAS_TAG = "EXISTS (SELECT 1 FROM job_tags WHERE job_id = jobs.id AND tag_id {})"
+    _TAGGED = "jobs.id IN (SELECT job_id FROM job_tags WHERE tag_id {})"
+    _TAG_IDS = "IN (SELECT id FROM tags WHERE name IN ({}))"
+    
+    # Диапазоны по ведущим колонкам idx_jobs_salary и idx_jobs_experience
+    _RANGES = (
+        ('salary_min', "jobs.salary_max >= ?"),
+        ('experience_max', "jobs.experience_min <= ?"),
+    )
+    
+    def _driver_cap(self, limit: Optional[int], total: int) -> int:
+        """Наибольшее число строк, при котором условие ведёт выборку"""
+        if limit is None:
+            return total // self.DRIVER_COST
+        return math.isqrt(limit * total // self.DRIVER_COST)
+    
+    async def _jobs_total(self, db) -> int:
+        async with db.execute(
+            "SELECT value FROM stat_counters WHERE metric = 'jobs_total'"
+        ) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else 0
+    
+    async def _tag_counts(self, db, names: List[str]) -> Dict[str, int]:
+        """Число вакансий по тегам (ключ — имя в нижнем регистре)"""
+        placeholders = ', '.join('?' * len(names))
+        async with db.execute(f"""
+            SELECT key, value FROM stat_counters
+            WHERE metric = 'jobs_by_tag' AND key COLLATE NOCASE IN ({placeholders})
+        """, names) as cursor:
+            return {row['key'].lower(): row['value'] for row in await cursor.fetchall()}
+    
+    async def _is_rare(self, db, condition: str, value, cap: int) -> bool:
+        """Не больше cap строк под условием; подсчёт по индексу до cap + 1"""
+        async with db.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM jobs WHERE {condition} LIMIT ?)",
+            (value, cap + 1)
+        ) as cursor:
+            return (await cursor.fetchone())[0] <= cap
+    
+    async def _filter_sql(self, db, filters: JobFilter, limit: Optional[int] = None) -> Tuple[str, list]:
+        """Условия « AND ...» по локации, позиции, диапазонам и тегам.
         
-        if filters.search:
-            query += " AND (title LIKE ? OR company LIKE ? OR description LIKE ?)"
-            search_term = f"%{filters.search}%"
-            params.extend([search_term, search_term, search_term])
+        Теги: tag_mode="all" — вакансия с каждым тегом, "any" — хотя бы
+        с одним. Диапазоны опыта (лет) и зарплаты (долларов в месяц)
+        должны пересекаться с диапазоном вакансии; вакансии без
+        разобранных чисел под них не попадают. План выбирается по
+        счётчикам тегов и пробному подсчёту по индексам диапазонов;
+        limit — размер страницы, None — нужны все подходящие строки.
+        """
+        sql, params = "", []
         
         if filters.location and filters.location != "all":
-            query += " AND location = ?"
+            sql += " AND jobs.location = ?"
             params.append(filters.location)
         
         if filters.position and filters.position != "all":
-            query += " AND title LIKE ?"
+            sql += " AND jobs.title LIKE ?"
             params.append(f"%{filters.position}%")
         
-        query += " ORDER BY created_at DESC LIMIT ?"
-        params.append(limit)
+        names = self._tag_names(filters.tags or [])
+        ranges = [(c, getattr(filters, f)) for f, c in self._RANGES if getattr(filters, f) is not None]
+        cap = self._driver_cap(limit, await self._jobs_total(db)) if names or ranges else 0
+        
+        for condition, value in ranges:
+            if await self._is_rare(db, condition, value, cap):
+                condition = f"jobs.id IN (SELECT id FROM jobs WHERE {condition})"
+            sql += f" AND {condition}"
+            params.append(value)
+        
+        if filters.salary_max is not None:
+            sql += " AND jobs.salary_min <= ?"
+            params.append(filters.salary_max)
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        if filters.experience_min is not None:
+            # experience_max IS NULL — «от N лет» без верхней границы.
+            # Условие не на experience_min: двусторонний диапазон по нему
+            # планировщик считает избирательным и бросает индекс по дате
+            sql += (" AND (jobs.experience_max >= ?"
+                    " OR (jobs.experience_max IS NULL AND jobs.experience_min IS NOT NULL))")
+            params.append(filters.experience_min)
+        
+        if not names:
+            return sql, params
+        
+        counts = await self._tag_counts(db, names)
+        if filters.tag_mode == "any":
+            ids = self._TAG_IDS.format(', '.join('?' * len(names)))
+            rare = sum(counts.get(n.lower(), 0) for n in names) <= cap
+            sql += " AND " + (self._TAGGED if rare else self._HAS_TAG).format(ids)
+            params.extend(names)
+        else:
+            # Самый редкий тег может вести выборку, остальные проверяются
+            names.sort(key=lambda n: counts.get(n.lower(), 0))
+            for i, name in enumerate(names):
+                rare = i == 0 and counts.get(name.lower(), 0) <= cap
+                sql += " AND " + (self._TAGGED if rare else self._HAS_TAG).format(self._TAG_IDS.format('?'))
+                params.append(name)
+        return sql, params
+    
+    async def get_tag_facets(self, filters: Optional[JobFilter] = None, limit: int = 50) -> List[dict]:
+        """Теги с числом вакансий, подходящих под фильтры.
+        
+        Без фильтров значения берутся из счётчиков stat_counters; с
+        фильтрами время растёт с числом подходящих вакансий.
+        """
+        filters = filters or JobFilter()
+        fts_query = build_fts_query(filters.search) if filters.search else None
+        
+        async with self.pool.reader() as db:
+            conditions, params = await self._filter_sql(db, filters)
+            if not fts_query and not conditions:
+                query = """
+                    SELECT key AS tag, value AS count FROM stat_counters
+                    WHERE metric = 'jobs_by_tag' AND value > 0
+                    ORDER BY value DESC, key LIMIT ?
+                """
+                params = []
+            else:
+                if fts_query:
+                    matching = f"""
+                        SELECT jobs.id FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid
+                        WHERE jobs_fts MATCH ? {conditions}
+                    """
+                    params.insert(0, fts_query)
+                else:
+                    matching = f"SELECT jobs.id FROM jobs WHERE 1=1 {conditions}"
+                # Группировка по одному tag_id, имена — уже к итогам
+                query = f"""
+                    SELECT tags.name AS tag, facet.count
+                    FROM (
+                        SELECT tag_id, COUNT(*) AS count FROM job_tags
+                        WHERE job_id IN ({matching})
+                        GROUP BY tag_id
+                    ) AS facet JOIN tags ON tags.id = facet.tag_id
+                    ORDER BY facet.count DESC, tags.name LIMIT ?
+                """
+            params.append(limit)
             async with db.execute(query, params) as cursor:
-                rows = await cursor.fetchall()
-                jobs = []
-                for row in rows:
-                    job_dict = dict(row)
-                    job_dict['tags'] = job_dict['tags'].split(',') if job_dict['tags'] else []
-                    jobs.append(Job(**job_dict))
-                return jobs
+                return [dict(row) for row in await cursor.fetchall()]
+    
+    # Сортировки страницы вакансий и колонки их курсоров
+    JOB_SORTS = {
+        'date': ['created_at'],
+        'salary': ['salary_max', 'salary_min'],
+    }
+    # Ключи курсора для каждого порядка; поиск по bm25 хранит смещение
+    CURSOR_KEYS = {
+        'date': ('c', 'i'),
+        'salary': ('s', 'm', 'i'),
+        'search': ('o',),
+    }
+    
+    async def get_jobs(self, filters: JobFilter, limit: int = 50) -> List[Job]:
+        """Получить вакансии с фильтрами"""
+        rows, _ = await self.get_jobs_page(filters, limit)
+        return [Job(**row) for row in rows]
+    
+    async def get_jobs_page(
+        self,
+        filters: JobFilter,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        sort: str = "date"
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Страница вакансий и курсор следующей страницы.
+        
+        Без поиска используется keyset-пагинация по (created_at, id)
+        на индексе idx_jobs_created_id. При полнотекстовом поиске порядок
+        задаёт bm25, и курсор хранит смещение. sort="salary" — сначала
+        высокие зарплаты, keyset по (salary_max, salary_min, id) на
+        idx_jobs_salary; вакансии без разобранной зарплаты не выводятся.
+        fields ограничивает набор колонок (id возвращается всегда).
+        ValueError — неизвестное поле, сортировка или повреждённый курсор.
+        """
+        if sort not in self.JOB_SORTS:
+            raise ValueError(f"Неизвестная сортировка: {sort}")
+        if fields:
+            unknown = set(fields) - set(self.JOB_FIELDS)
+            if unknown:
+                raise ValueError(f"Неизвестные поля: {', '.join(sorted(unknown))}")
+            output = ['id'] + [f for f in self.JOB_FIELDS if f in fields and f != 'id']
+        else:
+            output = list(self.JOB_FIELDS)
+        # Ключи сортировки нужны для курсора, даже если клиент их не запросил
+        columns = ', '.join(
+            f"jobs.{f}" for f in dict.fromkeys(output + self.JOB_SORTS[sort])
+        )
+        
+        fts_query = build_fts_query(filters.search) if filters.search else None
+        # Поиск с sort=salary упорядочен по зарплате, а не по bm25
+        order = 'search' if fts_query and sort != 'salary' else sort
+        state = self._decode_page_cursor(cursor, order) if cursor else {}
+        params = []
+        
+        if fts_query:
+            # Ранжирование bm25: веса колонок title, company, description, tags
+            query = f"""
+                SELECT {columns},
+                       snippet(jobs_fts, -1, char(2), char(3), '…', 16) AS snippet
+                FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid
+                WHERE jobs_fts MATCH ?
+            """
+            params.append(fts_query)
+            output.append('snippet')
+        else:
+            query = f"SELECT {columns} FROM jobs WHERE 1=1"
+        
+        async with self.pool.reader() as db:
+            conditions, condition_params = await self._filter_sql(db, filters, limit)
+            query += conditions
+            params.extend(condition_params)
+            
+            if sort == "salary":
+                query += " AND jobs.salary_max IS NOT NULL"
+                if state:
+                    query += " AND (jobs.salary_max, jobs.salary_min, jobs.id) < (?, ?, ?)"
+                    params.extend([state.get('s'), state.get('m'), state.get('i')])
+                query += " ORDER BY jobs.salary_max DESC, jobs.salary_min DESC, jobs.id DESC LIMIT ?"
+                params.append(limit + 1)
+            elif fts_query:
+                offset = state.get('o', 0)
+                query += " ORDER BY bm25(jobs_fts, 10.0, 5.0, 1.0, 3.0) LIMIT ? OFFSET ?"
+                params.extend([limit + 1, offset])
+            else:
+                if state:
+                    query += " AND (jobs.created_at, jobs.id) < (?, ?)"
+                    params.extend([state.get('c'), state.get('i')])
+                query += " ORDER BY jobs.created_at DESC, jobs.id DESC LIMIT ?"
+                params.append(limit + 1)
+            
+            async with db.execute(query, params) as db_cursor:
+                rows = await db_cursor.fetchall()
+        
+        # Лишняя строка показывает, есть ли следующая страница
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            if sort == "salary":
+                next_cursor = encode_cursor({
+                    'k': order, 's': last['salary_max'], 'm': last['salary_min'], 'i': last['id']
+                })
+            elif fts_query:
+                next_cursor = encode_cursor({'k': order, 'o': offset + limit})
+            else:
+                next_cursor = encode_cursor({'k': order, 'c': last['created_at'], 'i': last['id']})
+        
+        items = []
+        for row in rows:
+            item = {f: row[f] for f in output}
+            if 'tags' in item:
+                item['tags'] = item['tags'].split(',') if item['tags'] else []
+            if 'snippet' in item:
+                item['snippet'] = render_snippet(item['snippet'])
+            items.append(item)
+        return items, next_cursor
+    
+    def _decode_page_cursor(self, cursor: str, order: str) -> dict:
+        """Курсор страницы для порядка order; ValueError — чужой или неполный курсор"""
+        state = decode_cursor(cursor)
+        if state.get('k') != order:
+            raise ValueError("Курсор выдан для другой сортировки")
+        keys = self.CURSOR_KEYS[order]
+        if any(key not in state for key in keys):
+            raise ValueError("Некорректный курсор")
+        if order == 'search':
+            offset = state['o']
+            if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+                raise ValueError("Некорректный курсор")
+        elif not isinstance(state['i'], int) or isinstance(state['i'], bool):
+            raise ValueError("Некорректный курсор")
+        return state
+    
+    async def _iter_rows(self, query: str, params: list, batch_size: int) -> AsyncIterator[List[dict]]:
+        """Строки запроса пачками через fetchmany.
+        
+        Читает через отдельное соединение, а не читателя пула: генератор
+        живёт, пока клиент скачивает выгрузку.
+        """
+        async with self.pool.dedicated_reader() as db:
+            async with db.execute(query, params) as cursor:
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield [dict(row) for row in rows]
+    
+    async def iter_jobs(
+        self,
+        filters: Optional[JobFilter] = None,
+        since: Optional[str] = None,
+        batch_size: int = None
+    ) -> AsyncIterator[List[dict]]:
+        """Все вакансии по фильтрам пачками по batch_size, в порядке id.
+        
+        Для выгрузки: в памяти одновременно только одна пачка.
+        since — нижняя граница created_at ('2024-01-01').
+        """
+        filters = filters or JobFilter()
+        columns = ', '.join(f"jobs.{f}" for f in self.JOB_FIELDS)
+        fts_query = build_fts_query(filters.search) if filters.search else None
+        params = []
+        
+        if fts_query:
+            query = f"""
+                SELECT {columns} FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid
+                WHERE jobs_fts MATCH ?
+            """
+            params.append(fts_query)
+        else:
+            query = f"SELECT {columns} FROM jobs WHERE 1=1"
+        
+        async with self.pool.reader() as db:
+            conditions, condition_params = await self._filter_sql(db, filters)
+        query += conditions
+        params.extend(condition_params)
+        
+        if since:
+            query += " AND jobs.created_at >= ?"
+            params.append(since)
+        
+        query += " ORDER BY jobs.id"
+        
+        async for rows in self._iter_rows(query, params, batch_size or settings.EXPORT_BATCH_SIZE):
+            for row in rows:
+                row['tags'] = row['tags'].split(',') if row['tags'] else []
+            yield rows
+    
+    APPLICATION_FIELDS = (
+        'id', 'job_id', 'name', 'email', 'phone', 'message', 'resume_path',
+        'resume_sha256', 'status', 'applied_date'
+    )
+    
+    async def iter_applications(
+        self,
+        user_email: Optional[str] = None,
+        status: Optional[str] = None,
+        batch_size: int = None
+    ) -> AsyncIterator[List[dict]]:
+        """Все отклики по фильтрам пачками по batch_size, в порядке id"""
+        query = f"SELECT {', '.join(self.APPLICATION_FIELDS)} FROM applications WHERE 1=1"
+        params = []
+        
+        if user_email:
+            query += " AND email = ?"
+            params.append(user_email)
+        
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        
+        query += " ORDER BY id"
+        
+        async for rows in self._iter_rows(query, params, batch_size or settings.EXPORT_BATCH_SIZE):
+            yield rows
     
     async def get_job_by_id(self, job_id: int) -> Optional[Job]:
         """Получить вакансию по ID"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.reader() as db:
             async with db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)) as cursor:
                 row = await cursor.fetchone()
                 if row:
@@ -119,24 +1008,48 @@ class Database:
                     return Job(**job_dict)
                 return None
     
-    async def add_application(self, application: Application) -> Optional[int]:
-        """Добавить отклик"""
+    async def add_application(
+        self,
+        application: Application,
+        emails: List[str] = None,
+        resume: Optional[StoredUpload] = None
+    ) -> Optional[int]:
+        """Добавить отклик.
+        
+        emails — виды писем, которые ставятся в очередь той же транзакцией:
+        отклик не теряет письмо, даже если процесс упадёт сразу после ответа.
+        resume — блоб из BlobStore; его запись создаётся при первом
+        использовании, а счётчик ссылок увеличивает триггер. Сборщик
+        мусора удаляет файлы в транзакции записи, поэтому проверка файла
+        здесь и ссылка на него не разделены удалением.
+        """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.writer() as db:
+                if resume:
+                    if not await asyncio.to_thread(os.path.exists, resume.path):
+                        raise FileNotFoundError(f"Блоб резюме удалён: {resume.sha256}")
+                    await db.execute("""
+                        INSERT INTO resume_blobs (sha256, path, size) VALUES (?, ?, ?)
+                        ON CONFLICT(sha256) DO NOTHING
+                    """, (resume.sha256, resume.path, resume.size))
                 cursor = await db.execute("""
                     INSERT INTO applications 
-                    (job_id, name, email, phone, message, resume_path, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    (job_id, name, email, phone, message, resume_path, resume_sha256, status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     application.job_id, application.name, application.email,
                     application.phone, application.message, application.resume_path,
+                    resume.sha256 if resume else application.resume_sha256,
                     application.status
                 ))
-                await db.commit()
-                return cursor.lastrowid
+                application_id = cursor.lastrowid
+                for kind in emails or []:
+                    await self._enqueue_email(db, kind, application_id)
         except Exception as e:
-            print(f"❌ Ошибка добавления отклика: {e}")
+            log.error("Ошибка добавления отклика", job_id=application.job_id, error=e)
             return None
+        self._notify_write("applications")
+        return application_id
     
     async def get_applications(self, user_email: Optional[str] = None) -> List[Application]:
         """Получить список откликов"""
@@ -149,16 +1062,14 @@ class Database:
         
         query += " ORDER BY applied_date DESC"
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.reader() as db:
             async with db.execute(query, params) as cursor:
                 rows = await cursor.fetchall()
                 return [Application(**dict(row)) for row in rows]
     
     async def get_application_by_id(self, application_id: int) -> Optional[Application]:
         """Получить отклик по ID"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.reader() as db:
             async with db.execute(
                 "SELECT * FROM applications WHERE id = ?", 
                 (application_id,)
@@ -166,50 +1077,206 @@ class Database:
                 row = await cursor.fetchone()
                 return Application(**dict(row)) if row else None
     
-    async def update_application_status(self, application_id: int, status: str) -> bool:
-        """Обновить статус отклика"""
+    async def update_application_status(
+        self,
+        application_id: int,
+        status: str,
+        notify: bool = False
+    ) -> bool:
+        """Обновить статус отклика.
+        
+        notify — поставить письмо кандидату о новом статусе в очередь той
+        же транзакцией. False — отклик не найден или ошибка записи.
+        """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute(
+            async with self.pool.writer() as db:
+                cursor = await db.execute(
                     "UPDATE applications SET status = ? WHERE id = ?",
                     (status, application_id)
                 )
-                await db.commit()
-                return True
+                if not cursor.rowcount:
+                    return False
+                if notify:
+                    await self._enqueue_email(db, 'status', application_id, {"status": status})
         except Exception as e:
-            print(f"❌ Ошибка обновления статуса: {e}")
+            log.error("Ошибка обновления статуса", application_id=application_id, status=status, error=e)
             return False
+        self._notify_write("applications")
+        return True
     
-    async def get_stats(self) -> dict:
-        """Получить статистику"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Количество вакансий
-            async with db.execute("SELECT COUNT(*) FROM jobs") as cursor:
-                total_jobs = (await cursor.fetchone())[0]
-            
-            # Количество откликов
-            async with db.execute("SELECT COUNT(*) FROM applications") as cursor:
-                total_applications = (await cursor.fetchone())[0]
-            
-            # Вакансии по локациям
+    async def get_unreferenced_blobs(self) -> List[dict]:
+        """Блобы резюме, на которые не ссылается ни один отклик"""
+        async with self.pool.reader() as db:
+            async with db.execute(
+                "SELECT sha256, path, size FROM resume_blobs WHERE refcount <= 0"
+            ) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+    
+    async def get_blob_hashes(self) -> set:
+        async with self.pool.reader() as db:
+            async with db.execute("SELECT sha256 FROM resume_blobs") as cursor:
+                return {row['sha256'] for row in await cursor.fetchall()}
+    
+    async def delete_unreferenced_blobs(
+        self,
+        hashes: List[str],
+        remove: Callable[[str], Awaitable[bool]] = None,
+        orphans: List[str] = (),
+    ) -> List[str]:
+        """Удалить записи блобов, если ссылок на них по-прежнему нет.
+        
+        remove(path) удаляет файл внутри той же транзакции записи, что и
+        add_application, и возвращает False, если файл трогать нельзя —
+        тогда запись остаётся. orphans — файлы без записи: удаляются там
+        же, если запись так и не появилась.
+        """
+        deleted = []
+        async with self.pool.writer() as db:
+            for sha256 in hashes:
+                async with db.execute(
+                    "SELECT path FROM resume_blobs WHERE sha256 = ? AND refcount <= 0", (sha256,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+                if row is None or (remove and not await remove(row['path'])):
+                    continue
+                await db.execute("DELETE FROM resume_blobs WHERE sha256 = ?", (sha256,))
+                deleted.append(sha256)
+            for path in orphans:
+                sha256 = os.path.basename(path).rsplit('.', 1)[0]
+                async with db.execute(
+                    "SELECT 1 FROM resume_blobs WHERE sha256 = ?", (sha256,)
+                ) as cursor:
+                    if await cursor.fetchone() is None and remove:
+                        await remove(path)
+        return deleted
+    
+    async def _enqueue_email(
+        self,
+        db,
+        kind: str,
+        application_id: int,
+        params: dict = None
+    ) -> int:
+        cursor = await db.execute("""
+            INSERT INTO email_outbox (kind, application_id, params, next_attempt_at)
+            VALUES (?, ?, ?, ?)
+        """, (kind, application_id, json.dumps(params) if params else None, time.time()))
+        return cursor.lastrowid
+    
+    async def enqueue_email(
+        self,
+        kind: str,
+        application_id: int,
+        params: dict = None
+    ) -> Optional[int]:
+        """Поставить письмо в очередь на отправку"""
+        try:
+            async with self.pool.writer() as db:
+                return await self._enqueue_email(db, kind, application_id, params)
+        except Exception as e:
+            log.error("Ошибка постановки письма в очередь", kind=kind, application_id=application_id, error=e)
+            return None
+    
+    async def get_due_emails(self, limit: int) -> List[dict]:
+        """Письма, которые пора отправить (новые и отложенные повторы)"""
+        async with self.pool.reader() as db:
             async with db.execute("""
-                SELECT location, COUNT(*) as count 
-                FROM jobs 
-                GROUP BY location
-            """) as cursor:
-                locations = await cursor.fetchall()
-            
-            # Статусы откликов
+                SELECT id, kind, application_id, params, attempts
+                FROM email_outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at, id
+                LIMIT ?
+            """, (time.time(), limit)) as cursor:
+                rows = await cursor.fetchall()
+        return [
+            {**dict(row), "params": json.loads(row['params']) if row['params'] else {}}
+            for row in rows
+        ]
+    
+    async def mark_email_sent(self, email_id: int):
+        async with self.pool.writer() as db:
+            await db.execute("""
+                UPDATE email_outbox
+                SET status = 'sent', attempts = attempts + 1,
+                    last_error = NULL, sent_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (email_id,))
+    
+    async def mark_email_failed(
+        self,
+        email_id: int,
+        error: str,
+        retry_at: Optional[float] = None
+    ):
+        """Записать неудачную попытку: повтор в retry_at или окончательный отказ"""
+        async with self.pool.writer() as db:
+            await db.execute("""
+                UPDATE email_outbox
+                SET status = ?, attempts = attempts + 1,
+                    last_error = ?, next_attempt_at = COALESCE(?, next_attempt_at)
+                WHERE id = ?
+            """, ('pending' if retry_at else 'failed', error[:500], retry_at, email_id))
+    
+    async def postpone_email(self, email_id: int, error: str, retry_at: float):
+        """Отложить письмо до retry_at, не засчитывая попытку"""
+        async with self.pool.writer() as db:
+            await db.execute(
+                "UPDATE email_outbox SET last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (error[:500], retry_at, email_id)
+            )
+    
+    async def get_outbox_stats(self) -> dict:
+        """Количество писем в очереди по статусам"""
+        async with self.pool.reader() as db:
+            async with db.execute(
+                "SELECT status, COUNT(*) AS count FROM email_outbox GROUP BY status"
+            ) as cursor:
+                counts = {row['status']: row['count'] for row in await cursor.fetchall()}
+        return {status: counts.get(status, 0) for status in ('pending', 'sent', 'failed')}
+    
+    async def get_stats(self) -> dict:
+        """Получить статистику из счётчиков stat_counters.
+        
+        Счётчики обновляют триггеры на jobs и applications, поэтому
+        запрос читает по строке на итог, локацию и статус вместо полного
+        прохода по таблицам. Счётчики тегов (jobs_by_tag) сюда не
+        попадают: их тысячи, и читает их get_tag_facets.
+        """
+        async with self.pool.reader() as db:
             async with db.execute("""
-                SELECT status, COUNT(*) as count 
-                FROM applications 
-                GROUP BY status
+                SELECT metric, key, value FROM stat_counters
+                WHERE metric IN ('jobs_total', 'applications_total',
+                                 'jobs_by_location', 'applications_by_status')
             """) as cursor:
-                statuses = await cursor.fetchall()
-            
-            return {
-                "total_jobs": total_jobs,
-                "total_applications": total_applications,
-                "jobs_by_location": dict(locations),
-                "applications_by_status": dict(statuses)
-            }
\ No newline at end of file
+                rows = await cursor.fetchall()
+        
+        counters = {}
+        for metric, key, value in rows:
+            counters.setdefault(metric, {})[key] = value
+        
+        return {
+            "total_jobs": counters.get("jobs_total", {}).get("", 0),
+            "total_applications": counters.get("applications_total", {}).get("", 0),
+            "jobs_by_location": {
+                k: v for k, v in counters.get("jobs_by_location", {}).items() if v
+            },
+            "applications_by_status": {
+                k: v for k, v in counters.get("applications_by_status", {}).items() if v
+            }
+        }
+    
+    async def get_jobs_daily(self, days: int = 30, source: Optional[str] = None) -> List[dict]:
+        """Сколько вакансий добавлено по дням и источникам за последние days дней"""
+        query = """
+            SELECT day, source, count FROM jobs_daily
+            WHERE day >= date('now', ?) AND count > 0
+        """
+        params = [f"-{days} days"]
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        query += " ORDER BY day, source"
+        
+        async with self.pool.reader() as db:
+            async with db.execute(query, params) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
\ No newline at end of file
@@ -0,0 +1,468 @@
+import asyncio
+import sys
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import aiosqlite
+
+from logs import get_logger
+from metrics import DB_SLOW_QUERIES
+
+log = get_logger(__name__)
+
+
+class PoolMetrics:
+    """Метрики пула соединений"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def record_checkout(self, waited: float):
+        self.checkouts += 1
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+
+    def record_release(self):
+        self.in_use -= 1
+
+    def as_dict(self) -> dict:
+        avg_wait = self.wait_time_total / self.checkouts if self.checkouts else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+            "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+            "wait_time_avg_ms": round(avg_wait * 1000, 3),
+            "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+        }
+
+
+def params_shape(parameters, many: bool = False) -> str:
+    """Типы параметров без значений: «(int, str, null)», «500×(str, int)».
+
+    Значения в журнал не попадают — в них бывают email и тексты откликов.
+    """
+    if many:
+        rows = parameters or []
+        return f"{len(rows)}×{params_shape(rows[0]) if rows else '()'}"
+    if parameters is None:
+        return '()'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f"{k}: {_type_name(v)}" for k, v in parameters.items()) + '}'
+    values = list(parameters)
+    if len(values) > 8:
+        types = sorted({_type_name(v) for v in values})
+        return f"({len(values)} values: {', '.join(types)})"
+    return '(' + ', '.join(_type_name(v) for v in values) + ')'
+
+
+def _type_name(value) -> str:
+    return 'null' if value is None else type(value).__name__
+
+
+def _caller() -> str:
+    """Метод, выполнивший запрос: «get_jobs_page._filter_sql»"""
+    # 0 — _caller, 1 — _TimedStatement, 2 — execute соединения
+    frame = sys._getframe(3)
+    names = []
+    # Вверх по цепочке await до первого публичного метода
+    while frame is not None and len(names) < 4:
+        names.append(frame.f_code.co_name)
+        if not names[-1].startswith('_'):
+            break
+        frame = frame.f_back
+    return '.'.join(reversed(names))
+
+
+class SlowQueryLog:
+    """Журнал запросов дольше threshold_ms: SQL, форма параметров и время.
+
+    Последние size записей доступны через recent(), каждая также
+    пишется в лог и в счётчик db_slow_queries.
+    """
+
+    def __init__(self, threshold_ms: float, size: int = 100):
+        self.threshold_ms = threshold_ms
+        self.threshold = threshold_ms / 1000
+        self.total = 0
+        self._entries = deque(maxlen=size)
+
+    def record(self, caller: str, sql: str, shape: str, duration: float, rows: int):
+        entry = {
+            "method": caller,
+            "sql": ' '.join(sql.split())[:1000],
+            "params": shape,
+            "duration_ms": round(duration * 1000, 3),
+            "rows": rows,
+            "at": time.time(),
+        }
+        self.total += 1
+        self._entries.append(entry)
+        DB_SLOW_QUERIES.labels(caller.split('.', 1)[0]).inc()
+        log.warning("Медленный запрос", **entry)
+
+    def recent(self) -> List[dict]:
+        """Записи от новых к старым"""
+        return list(reversed(self._entries))
+
+    def metrics(self) -> dict:
+        return {"threshold_ms": self.threshold_ms, "total": self.total, "kept": len(self._entries)}
+
+
+class _TimedCursor:
+    """Курсор, считающий время execute и всех fetch*.
+
+    Паузы между fetch не учитываются: потоковая выгрузка к медленному
+    клиенту не делает запрос медленным.
+    """
+
+    __slots__ = ('_cursor', '_statement', 'elapsed', 'rows', '_reported')
+
+    def __init__(self, cursor: aiosqlite.Cursor, statement: '_TimedStatement', elapsed: float):
+        self._cursor = cursor
+        self._statement = statement
+        self.elapsed = elapsed
+        self.rows = 0
+        self._reported = False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    async def fetchone(self):
+        started = time.perf_counter()
+        row = await self._cursor.fetchone()
+        self.elapsed += time.perf_counter() - started
+        if row is not None:
+            self.rows += 1
+        return row
+
+    async def fetchmany(self, size: int = None):
+        started = time.perf_counter()
+        rows = await self._cursor.fetchmany(size)
+        self.elapsed += time.perf_counter() - started
+        self.rows += len(rows)
+        return rows
+
+    async def fetchall(self):
+        started = time.perf_counter()
+        rows = await self._cursor.fetchall()
+        self.elapsed += time.perf_counter() - started
+        self.rows += len(rows)
+        return rows
+
+    async def __aiter__(self):
+        while True:
+            rows = await self.fetchmany(self._cursor.arraysize)
+            if not rows:
+                return
+            for row in rows:
+                yield row
+
+    def report(self):
+        if self._reported:
+            return
+        self._reported = True
+        statement = self._statement
+        if self.elapsed >= statement.log.threshold:
+            rows = self.rows or max(self._cursor.rowcount, 0)
+            statement.log.record(
+                statement.caller, statement.sql,
+                params_shape(statement.parameters, statement.many), self.elapsed, rows,
+            )
+
+    async def close(self):
+        self.report()
+        await self._cursor.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class _TimedStatement:
+    """Результат execute/executemany, как aiosqlite Result.
+
+    await — курсор остаётся открытым, время пишется сразу после execute
+    (так выполняются записи); async with — время execute и fetch*
+    пишется при закрытии курсора.
+    """
+
+    __slots__ = ('log', 'caller', 'sql', 'parameters', 'many', '_method', '_cursor')
+
+    def __init__(self, log: SlowQueryLog, method, sql: str, parameters, many: bool):
+        self.log = log
+        self.caller = _caller()
+        self.sql = sql
+        self.parameters = parameters
+        self.many = many
+        self._method = method
+        self._cursor: Optional[_TimedCursor] = None
+
+    async def _open(self) -> _TimedCursor:
+        started = time.perf_counter()
+        cursor = await self._method(self.sql, self.parameters)
+        return _TimedCursor(cursor, self, time.perf_counter() - started)
+
+    async def _run(self) -> _TimedCursor:
+        cursor = await self._open()
+        cursor.report()
+        return cursor
+
+    def __await__(self):
+        return self._run().__await__()
+
+    async def __aenter__(self) -> _TimedCursor:
+        self._cursor = await self._open()
+        return self._cursor
+
+    async def __aexit__(self, *exc):
+        await self._cursor.close()
+
+
+class _TimedConnection:
+    """Соединение aiosqlite, замеряющее execute и executemany для SlowQueryLog.
+
+    Остальные атрибуты и методы (commit, rollback, close) — как у
+    исходного соединения. Пул оборачивает соединения только при
+    включённом журнале, без него запросы идут напрямую.
+    """
+
+    __slots__ = ('_conn', '_log')
+
+    def __init__(self, conn: aiosqlite.Connection, log: SlowQueryLog):
+        self._conn = conn
+        self._log = log
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def execute(self, sql: str, parameters=None) -> _TimedStatement:
+        return _TimedStatement(self._log, self._conn.execute, sql, parameters, many=False)
+
+    def executemany(self, sql: str, parameters) -> _TimedStatement:
+        # Генератор параметров понадобится дважды: для запроса и для журнала
+        if not isinstance(parameters, (list, tuple)):
+            parameters = list(parameters)
+        return _TimedStatement(self._log, self._conn.executemany, sql, parameters, many=True)
+
+
+class PoolClosedError(Exception):
+    """Пул закрыт: соединения больше не выдаются"""
+
+
+class ConnectionPool:
+    """Пул долгоживущих соединений SQLite: один писатель и N читателей.
+
+    До первого open() пул открывается при первом обращении. После
+    close() новые обращения получают PoolClosedError, пока пул не
+    открыт заново явным open().
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = 4,
+        cache_size_kb: int = 16384,
+        mmap_size: int = 256 * 1024 * 1024,
+        busy_timeout_ms: int = 5000,
+        slow_query_ms: float = 0,
+    ):
+        self.db_path = db_path
+        self.readers_count = max(1, readers)
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._open_lock = asyncio.Lock()
+        self._closed = False
+        # Читатели, выданные или ожидающие в очереди: close() ждёт их возврата
+        self._readers_in_use = 0
+        self._readers_returned = asyncio.Event()
+        # Отдельное соединение для PRAGMA data_version: значение сравнимо
+        # только между вызовами на одном и том же соединении
+        self._watcher: Optional[aiosqlite.Connection] = None
+
+        self.reader_metrics = PoolMetrics()
+        self.writer_metrics = PoolMetrics()
+        # Журнал медленных запросов; None — выключен и ничего не стоит
+        self.slow_queries = SlowQueryLog(slow_query_ms) if slow_query_ms > 0 else None
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def _ensure_open(self):
+        """Открыть пул при первом обращении; после close() — PoolClosedError"""
+        while not self.is_open:
+            if self._closed:
+                raise PoolClosedError("Пул соединений закрыт")
+            await self.open()
+        if self._closed:
+            raise PoolClosedError("Пул соединений закрыт")
+
+    async def _connect(self, readonly: bool = False) -> aiosqlite.Connection:
+        """Открыть соединение и применить PRAGMA"""
+        conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        await conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        # Отрицательное значение — размер кэша в KiB, а не в страницах
+        await conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        await conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        await conn.execute("PRAGMA temp_store = MEMORY")
+        await conn.execute("PRAGMA foreign_keys = ON")
+        if readonly:
+            await conn.execute("PRAGMA query_only = ON")
+        if self.slow_queries is not None:
+            return _TimedConnection(conn, self.slow_queries)
+        return conn
+
+    async def open(self):
+        """Открыть соединения пула (идемпотентно)"""
+        async with self._open_lock:
+            self._closed = False
+            if self.is_open:
+                return
+
+            writer = await self._connect()
+            # WAL сохраняется в файле БД, достаточно включить один раз
+            await writer.execute("PRAGMA journal_mode = WAL")
+            await writer.commit()
+
+            self._idle = asyncio.Queue()
+            for _ in range(self.readers_count):
+                reader = await self._connect(readonly=True)
+                self._readers.append(reader)
+                self._idle.put_nowait(reader)
+
+            self._writer = writer
+
+    async def close(self):
+        """Закрыть все соединения пула.
+
+        Новые обращения сразу получают PoolClosedError; закрытие ждёт
+        возврата выданных читателей и конца начатой транзакции записи.
+        """
+        async with self._open_lock:
+            self._closed = True
+            if not self.is_open:
+                return
+
+            while self._readers_in_use:
+                self._readers_returned.clear()
+                await self._readers_returned.wait()
+
+            async with self._writer_lock:
+                if self._watcher is not None:
+                    await self._watcher.close()
+                    self._watcher = None
+                for reader in self._readers:
+                    await reader.close()
+                self._readers.clear()
+                self._idle = None
+
+                # Переносим WAL в основной файл перед закрытием
+                try:
+                    await self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                except aiosqlite.Error:
+                    pass
+                await self._writer.close()
+                self._writer = None
+
+    @asynccontextmanager
+    async def reader(self):
+        """Взять соединение для чтения"""
+        await self._ensure_open()
+
+        self._readers_in_use += 1
+        try:
+            started = time.perf_counter()
+            conn = await self._idle.get()
+            self.reader_metrics.record_checkout(time.perf_counter() - started)
+            try:
+                yield conn
+            finally:
+                self.reader_metrics.record_release()
+                self._idle.put_nowait(conn)
+        finally:
+            self._readers_in_use -= 1
+            if not self._readers_in_use:
+                self._readers_returned.set()
+
+    @asynccontextmanager
+    async def dedicated_reader(self):
+        """Отдельное соединение для долгого чтения вне пула.
+
+        Для выгрузок: поток ответа может идти минутами, и читатель пула
+        на это время был бы потерян для обычных запросов. Соединение
+        закрывается на выходе; close() пула ждёт его так же, как читателей.
+        """
+        await self._ensure_open()
+
+        self._readers_in_use += 1
+        try:
+            conn = await self._connect(readonly=True)
+            try:
+                yield conn
+            finally:
+                await conn.close()
+        finally:
+            self._readers_in_use -= 1
+            if not self._readers_in_use:
+                self._readers_returned.set()
+
+    @asynccontextmanager
+    async def writer(self):
+        """Взять единственное соединение для записи.
+
+        Блок выполняется в одной транзакции: commit при успехе,
+        rollback при исключении.
+        """
+        await self._ensure_open()
+
+        started = time.perf_counter()
+        async with self._writer_lock:
+            if self._writer is None:
+                # Пул закрылся, пока транзакция ждала своей очереди
+                raise PoolClosedError("Пул соединений закрыт")
+            self.writer_metrics.record_checkout(time.perf_counter() - started)
+            try:
+                yield self._writer
+                await self._writer.commit()
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            finally:
+                self.writer_metrics.record_release()
+
+    async def data_version(self) -> int:
+        """PRAGMA data_version: меняется после коммита любого другого
+        соединения с файлом, в том числе из других процессов"""
+        await self._ensure_open()
+        if self._watcher is None:
+            self._watcher = await self._connect(readonly=True)
+        async with self._watcher.execute("PRAGMA data_version") as cursor:
+            return (await cursor.fetchone())[0]
+
+    def metrics(self) -> dict:
+        """Метрики пула"""
+        return {
+            "readers": self.readers_count,
+            "reader": self.reader_metrics.as_dict(),
+            "writer": self.writer_metrics.as_dict(),
+            "slow_queries": self.slow_queries.metrics() if self.slow_queries else None,
+        }
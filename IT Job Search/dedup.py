@@ -0,0 +1,90 @@
+"""SimHash-отпечатки описаний вакансий для поиска почти-дубликатов.
+
+64-битный SimHash строится по словам нормализованного описания: на
+коротких постах биграммы слишком чувствительны к правке одного слова.
+Для поиска кандидатов отпечаток режется на BLOCKS блоков по 8 бит, и
+каждая пара блоков даёт 16-битный ключ полосы (перестановочные таблицы,
+как у Manku и др.): BANDS = 28 полос. Отпечатки на расстоянии Хэмминга
+до BLOCKS - 2 гарантированно совпадают хотя бы в одной полосе, на
+расстоянии MAX_DISTANCE — примерно в 90% случаев. Проверяются только
+вакансии из тех же корзин: при 16-битных ключах это около
+BANDS / 65536 таблицы, а не 1/2048 на каждую из полос по 11 бит.
+"""
+import hashlib
+import re
+from itertools import combinations
+from typing import List, Optional
+
+BITS = 64
+BLOCKS = 8
+MAX_DISTANCE = 8
+# Из каждой корзины берутся только самые свежие вакансии: на шаблонных
+# постах корзины перекошены, а перепост обычно идёт вскоре за оригиналом
+MAX_BUCKET_CANDIDATES = 64
+SHINGLE_SIZE = 1
+# Короткие описания («No description available») не дают надёжного отпечатка
+MIN_TOKENS = 8
+
+_URL_RE = re.compile(r'https?://\S+|www\.\S+|t\.me/\S+')
+_CONTACT_RE = re.compile(r'@\w+|\S+@\S+')
+_TOKEN_RE = re.compile(r'[^\W\d_]+')
+
+
+def normalize(text: str) -> List[str]:
+    """Слова описания без ссылок, контактов, цифр и регистра"""
+    text = _URL_RE.sub(' ', text.lower())
+    text = _CONTACT_RE.sub(' ', text)
+    return _TOKEN_RE.findall(text)
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big'
+    )
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-битный SimHash описания или None, если текст слишком короткий"""
+    tokens = normalize(text or '')
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    # Признак — SHINGLE_SIZE подряд идущих слов.
+    # Бит отпечатка равен 1, если он установлен у большинства признаков.
+    # Подсчёт по столбцам битовых строк идёт в C (zip + tuple.count),
+    # а не в цикле Python по 64 битам каждого признака.
+    rows = [
+        format(_feature_hash(' '.join(tokens[i:i + SHINGLE_SIZE])), '064b')
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    ]
+    half = len(rows) / 2
+    signature = 0
+    for column in zip(*rows):
+        signature = (signature << 1) | (column.count('1') > half)
+    return signature
+
+
+_BLOCK_WIDTH = BITS // BLOCKS
+_BLOCK_PAIRS = list(combinations(range(BLOCKS), 2))
+BANDS = len(_BLOCK_PAIRS)
+
+
+def bands(signature: int) -> List[int]:
+    """Значения полос LSH: индекс полосы в списке, значение — корзина"""
+    mask = (1 << _BLOCK_WIDTH) - 1
+    blocks = [(signature >> (i * _BLOCK_WIDTH)) & mask for i in range(BLOCKS)]
+    return [(blocks[i] << _BLOCK_WIDTH) | blocks[j] for i, j in _BLOCK_PAIRS]
+
+
+def distance(a: int, b: int) -> int:
+    """Расстояние Хэмминга между отпечатками"""
+    return bin((a ^ b) & ((1 << BITS) - 1)).count('1')
+
+
+def to_sqlite(signature: int) -> int:
+    """Беззнаковый 64-битный отпечаток в знаковый INTEGER SQLite"""
+    return signature - (1 << BITS) if signature >= 1 << (BITS - 1) else signature
+
+
+def from_sqlite(value: int) -> int:
+    return value + (1 << BITS) if value < 0 else value
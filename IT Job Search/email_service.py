@@ -1,10 +1,176 @@
+import asyncio
+import time
+from collections import OrderedDict
 import aiosmtplib
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 import os
-from typing import Optional
+from typing import List, Optional, Tuple
 from models import Job, Application
+from email_templates import EmailTemplates
+from confiq import settings
+from logs import get_logger
+from metrics import SMTP_FAILURES, SMTP_SEND_SECONDS
+
+log = get_logger(__name__)
+
+_SEND = SMTP_SEND_SECONDS.labels()
+
+STATUS_MESSAGES = {
+    'viewed': 'Ваше резюме просмотрено работодателем',
+    'accepted': '🎉 Поздравляем! Ваша кандидатура заинтересовала работодателя',
+    'rejected': 'К сожалению, работодатель выбрал другого кандидата'
+}
+
+
+def load_resume_attachment(resume_path: str) -> Optional[MIMEApplication]:
+    """Вложение с резюме, закодированное в base64; None, если файла нет"""
+    try:
+        with open(resume_path, 'rb') as f:
+            attachment = MIMEApplication(f.read(), _subtype='pdf')
+    except FileNotFoundError:
+        return None
+    filename = os.path.basename(resume_path)
+    if resume_path.startswith(settings.RESUME_BLOB_DIR):
+        filename = 'resume.pdf'
+    attachment.add_header('Content-Disposition', 'attachment', filename=filename)
+    return attachment
+
+
+class ResumePartCache:
+    """Закодированные вложения резюме, ограниченные суммарным размером.
+    
+    Блоб резюме неизменен (путь задаётся хэшем содержимого), поэтому
+    одна и та же часть письма переиспользуется во всех откликах
+    кандидата. Размер считается по base64-тексту; при превышении
+    max_bytes вытесняются давно не использованные вложения. Файл
+    читается и кодируется в потоке, не блокируя event loop.
+    """
+    
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = settings.RESUME_PART_CACHE_BYTES if max_bytes is None else max_bytes
+        self._parts: "OrderedDict[str, Tuple[MIMEApplication, int]]" = OrderedDict()
+        self.size = 0
+    
+    async def get(self, resume_path: str) -> Optional[MIMEApplication]:
+        cached = self._parts.get(resume_path)
+        if cached is not None:
+            self._parts.move_to_end(resume_path)
+            return cached[0]
+        attachment = await asyncio.to_thread(load_resume_attachment, resume_path)
+        if attachment is not None:
+            self._put(resume_path, attachment)
+        return attachment
+    
+    def _put(self, resume_path: str, attachment: MIMEApplication):
+        size = len(attachment.get_payload())
+        if size > self.max_bytes or resume_path in self._parts:
+            return
+        self._parts[resume_path] = (attachment, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._parts.popitem(last=False)
+            self.size -= evicted
+    
+    def clear(self):
+        self._parts.clear()
+        self.size = 0
+
+
+class SMTPConnection:
+    """Постоянное авторизованное соединение с SMTP-сервером.
+    
+    Подключение, STARTTLS и AUTH выполняются один раз, дальше письма идут
+    по тому же соединению. Если соединение простаивало дольше
+    idle_timeout (серверы закрывают такие сами) или было разорвано,
+    перед отправкой оно открывается заново.
+    """
+    
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        timeout: float = None,
+        idle_timeout: float = None,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.timeout = settings.SMTP_TIMEOUT if timeout is None else timeout
+        self.idle_timeout = settings.SMTP_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = asyncio.Lock()
+        self.connects = 0
+    
+    async def _connect(self):
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        try:
+            await smtp.connect()
+            if self.username and self.password:
+                await smtp.login(self.username, self.password)
+        except BaseException:
+            # Неудачный вход не должен оставить полуоткрытое соединение в _smtp
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self.connects += 1
+    
+    async def _disconnect(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is None or not smtp.is_connected:
+            return
+        try:
+            await smtp.quit()
+        except aiosmtplib.SMTPException:
+            smtp.close()
+    
+    async def send(self, message: Message):
+        """Отправить письмо, при необходимости переподключившись"""
+        started = time.perf_counter()
+        try:
+            await self._send(message)
+        except Exception as e:
+            SMTP_FAILURES.labels(type(e).__name__).inc()
+            raise
+        finally:
+            _SEND.observe(time.perf_counter() - started)
+    
+    async def _send(self, message: Message):
+        async with self._lock:
+            idle = time.monotonic() - self._last_used
+            if self._smtp is not None and (not self._smtp.is_connected or idle > self.idle_timeout):
+                await self._disconnect()
+            
+            for attempt in range(2):
+                if self._smtp is None:
+                    await self._connect()
+                try:
+                    await self._smtp.send_message(message)
+                    break
+                except aiosmtplib.SMTPServerDisconnected:
+                    # Сервер закрыл соединение раньше idle_timeout — одна попытка заново
+                    self._smtp = None
+                    if attempt:
+                        raise
+            self._last_used = time.monotonic()
+    
+    async def close(self):
+        async with self._lock:
+            await self._disconnect()
+
 
 class EmailService:
     def __init__(self):
@@ -14,6 +180,44 @@ class EmailService:
         self.smtp_user = os.getenv('SMTP_USER')
         self.smtp_password = os.getenv('SMTP_PASSWORD')
         self.from_email = os.getenv('FROM_EMAIL', self.smtp_user)
+        self.connection = SMTPConnection(
+            self.smtp_host,
+            self.smtp_port,
+            self.smtp_user,
+            self.smtp_password,
+            start_tls=settings.SMTP_START_TLS,
+        )
+        self.templates = EmailTemplates()
+        self.resume_parts = ResumePartCache()
+    
+    async def send(self, message: Message):
+        """Отправить готовое письмо через постоянное соединение"""
+        await self.connection.send(message)
+    
+    async def close(self):
+        await self.connection.close()
+    
+    async def build_application_email(
+        self,
+        job: Job,
+        application: Application,
+        resume_path: str
+    ) -> MIMEMultipart:
+        """Письмо работодателю с откликом и резюме"""
+        message = MIMEMultipart()
+        message['From'] = self.from_email
+        message['To'] = job.contact_email
+        message['Subject'] = f"Отклик на вакансию: {job.title} - {application.name}"
+        
+        # Тело письма
+        body = self._create_email_body(job, application)
+        message.attach(MIMEText(body, 'html'))
+        
+        # Прикрепляем резюме
+        attachment = await self.resume_parts.get(resume_path)
+        if attachment is not None:
+            message.attach(attachment)
+        return message
     
     async def send_application_email(
         self, 
@@ -23,187 +227,78 @@ class EmailService:
     ) -> bool:
         """Отправить отклик на вакансию работодателю"""
         try:
-            # Создаём multipart сообщение
-            message = MIMEMultipart()
-            message['From'] = self.from_email
-            message['To'] = job.contact_email
-            message['Subject'] = f"Отклик на вакансию: {job.title} - {application.name}"
-            
-            # Тело письма
-            body = self._create_email_body(job, application)
-            message.attach(MIMEText(body, 'html'))
-            
-            # Прикрепляем резюме
-            if os.path.exists(resume_path):
-                with open(resume_path, 'rb') as f:
-                    resume_attachment = MIMEApplication(f.read(), _subtype='pdf')
-                    resume_attachment.add_header(
-                        'Content-Disposition', 
-                        'attachment', 
-                        filename=os.path.basename(resume_path)
-                    )
-                    message.attach(resume_attachment)
-            
-            # Отправляем письмо
-            await aiosmtplib.send(
-                message,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                start_tls=True,
-                username=self.smtp_user,
-                password=self.smtp_password
-            )
-            
-            print(f"✅ Отклик отправлен на {job.contact_email}")
+            await self.send(await self.build_application_email(job, application, resume_path))
+            log.info("Отклик отправлен", to=job.contact_email, job_id=job.id)
             return True
             
         except Exception as e:
-            print(f"❌ Ошибка отправки email: {e}")
+            log.error("Ошибка отправки отклика", to=job.contact_email, job_id=job.id, error=e)
             return False
     
     def _create_email_body(self, job: Job, application: Application) -> str:
         """Создать HTML тело письма"""
-        return f"""
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                }}
-                .container {{
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background-color: #4F46E5;
-                    color: white;
-                    padding: 20px;
-                    border-radius: 8px 8px 0 0;
-                }}
-                .content {{
-                    background-color: #f9fafb;
-                    padding: 20px;
-                    border-radius: 0 0 8px 8px;
-                }}
-                .info-block {{
-                    background-color: white;
-                    padding: 15px;
-                    margin: 10px 0;
-                    border-radius: 6px;
-                    border-left: 4px solid #4F46E5;
-                }}
-                .label {{
-                    font-weight: bold;
-                    color: #4F46E5;
-                }}
-                .message-box {{
-                    background-color: white;
-                    padding: 15px;
-                    margin: 15px 0;
-                    border-radius: 6px;
-                    border: 1px solid #e5e7eb;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h2>🎯 Новый отклик на вакансию</h2>
-                    <p>{job.title} в {job.company}</p>
-                </div>
-                
-                <div class="content">
-                    <div class="info-block">
-                        <p><span class="label">👤 Имя кандидата:</span> {application.name}</p>
-                        <p><span class="label">📧 Email:</span> <a href="mailto:{application.email}">{application.email}</a></p>
-                        {f'<p><span class="label">📱 Телефон:</span> {application.phone}</p>' if application.phone else ''}
-                    </div>
-                    
-                    <div class="info-block">
-                        <p><span class="label">💼 Вакансия:</span> {job.title}</p>
-                        <p><span class="label">🏢 Компания:</span> {job.company}</p>
-                        <p><span class="label">📍 Локация:</span> {job.location}</p>
-                        <p><span class="label">📅 Дата публикации:</span> {job.posted_date}</p>
-                    </div>
-                    
-                    <div class="message-box">
-                        <p class="label">💬 Сопроводительное письмо:</p>
-                        <p style="white-space: pre-wrap;">{application.message}</p>
-                    </div>
-                    
-                    <p style="margin-top: 20px; color: #6b7280; font-size: 14px;">
-                        📎 Резюме кандидата прикреплено к этому письму в формате PDF.
-                    </p>
-                    
-                    <hr style="margin: 20px 0; border: none; border-top: 1px solid #e5e7eb;">
-                    
-                    <p style="color: #6b7280; font-size: 12px; text-align: center;">
-                        Это письмо отправлено автоматически из системы поиска вакансий<br>
-                        Источник вакансии: {job.source}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return self.templates.render('application.html', job=job, application=application)
+    
+    def build_confirmation_email(self, application: Application, job: Job) -> MIMEMultipart:
+        """Письмо кандидату о том, что отклик отправлен"""
+        message = MIMEMultipart()
+        message['From'] = self.from_email
+        message['To'] = application.email
+        message['Subject'] = f"Ваш отклик на вакансию {job.title} отправлен"
+        
+        body = self.templates.render('confirmation.html', application=application, job=job)
+        message.attach(MIMEText(body, 'html'))
+        return message
     
     async def send_confirmation_email(self, application: Application, job: Job) -> bool:
         """Отправить подтверждение кандидату"""
         try:
-            message = MIMEMultipart()
-            message['From'] = self.from_email
-            message['To'] = application.email
-            message['Subject'] = f"Ваш отклик на вакансию {job.title} отправлен"
-            
-            body = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h2 style="color: #4F46E5;">✅ Ваш отклик успешно отправлен!</h2>
-                    
-                    <p>Здравствуйте, {application.name}!</p>
-                    
-                    <p>Ваш отклик на вакансию <strong>{job.title}</strong> в компании 
-                    <strong>{job.company}</strong> успешно отправлен работодателю.</p>
-                    
-                    <div style="background-color: #f3f4f6; padding: 15px; border-radius: 6px; margin: 20px 0;">
-                        <p><strong>📧 Email работодателя:</strong> {job.contact_email}</p>
-                        <p><strong>💬 Telegram:</strong> {job.contact_telegram}</p>
-                    </div>
-                    
-                    <p>Работодатель свяжется с вами в ближайшее время, если ваша кандидатура 
-                    будет интересна.</p>
-                    
-                    <p style="color: #6b7280; font-size: 14px; margin-top: 30px;">
-                        Удачи в поиске работы!<br>
-                        Команда системы поиска вакансий
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            message.attach(MIMEText(body, 'html'))
-            
-            await aiosmtplib.send(
-                message,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                start_tls=True,
-                username=self.smtp_user,
-                password=self.smtp_password
-            )
-            
-            print(f"✅ Подтверждение отправлено на {application.email}")
+            await self.send(self.build_confirmation_email(application, job))
+            log.info("Подтверждение отправлено", to=application.email, application_id=application.id)
             return True
             
         except Exception as e:
-            print(f"❌ Ошибка отправки подтверждения: {e}")
+            log.error("Ошибка отправки подтверждения", to=application.email, application_id=application.id, error=e)
             return False
     
+    def _status_message(
+        self,
+        application: Application,
+        job: Job,
+        body: str
+    ) -> MIMEMultipart:
+        message = MIMEMultipart()
+        message['From'] = self.from_email
+        message['To'] = application.email
+        message['Subject'] = f"Обновление статуса отклика на {job.title}"
+        message.attach(MIMEText(body, 'html'))
+        return message
+    
+    def build_status_update_email(
+        self,
+        application: Application,
+        job: Job,
+        new_status: str
+    ) -> MIMEMultipart:
+        """Письмо кандидату об изменении статуса отклика"""
+        return self.build_status_update_emails([(application, job)], new_status)[0]
+    
+    def build_status_update_emails(
+        self,
+        recipients: List[Tuple[Application, Job]],
+        new_status: str
+    ) -> List[MIMEMultipart]:
+        """Письма об изменении статуса для многих кандидатов сразу"""
+        status_text = STATUS_MESSAGES.get(new_status, new_status)
+        bodies = self.templates.render_many('status_update.html', (
+            {"application": application, "job": job, "status_text": status_text}
+            for application, job in recipients
+        ))
+        return [
+            self._status_message(application, job, body)
+            for (application, job), body in zip(recipients, bodies)
+        ]
+    
     async def send_status_update(
         self, 
         application: Application, 
@@ -212,51 +307,10 @@ class EmailService:
     ) -> bool:
         """Уведомить кандидата об изменении статуса"""
         try:
-            status_messages = {
-                'viewed': 'Ваше резюме просмотрено работодателем',
-                'accepted': '🎉 Поздравляем! Ваша кандидатура заинтересовала работодателя',
-                'rejected': 'К сожалению, работодатель выбрал другого кандидата'
-            }
-            
-            message = MIMEMultipart()
-            message['From'] = self.from_email
-            message['To'] = application.email
-            message['Subject'] = f"Обновление статуса отклика на {job.title}"
-            
-            body = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h2 style="color: #4F46E5;">Обновление статуса вашего отклика</h2>
-                    
-                    <p>Здравствуйте, {application.name}!</p>
-                    
-                    <div style="background-color: #f3f4f6; padding: 15px; border-radius: 6px; margin: 20px 0;">
-                        <p><strong>Вакансия:</strong> {job.title}</p>
-                        <p><strong>Компания:</strong> {job.company}</p>
-                        <p><strong>Статус:</strong> {status_messages.get(new_status, new_status)}</p>
-                    </div>
-                    
-                    <p>Спасибо за использование нашего сервиса!</p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            message.attach(MIMEText(body, 'html'))
-            
-            await aiosmtplib.send(
-                message,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                start_tls=True,
-                username=self.smtp_user,
-                password=self.smtp_password
-            )
-            
-            print(f"✅ Уведомление о статусе отправлено на {application.email}")
+            await self.send(self.build_status_update_email(application, job, new_status))
+            log.info("Уведомление о статусе отправлено", to=application.email, application_id=application.id, status=new_status)
             return True
             
         except Exception as e:
-            print(f"❌ Ошибка отправки уведомления: {e}")
-            return False
\ No newline at end of file
+            log.error("Ошибка отправки уведомления", to=application.email, application_id=application.id, error=e)
+            return False
@@ -0,0 +1,42 @@
+import os
+from typing import Iterable, List
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+from markupsafe import Markup
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email')
+
+# Неизменяемые фрагменты: рендерятся один раз и подставляются как готовый HTML
+STATIC_PARTIALS = {
+    'styles': 'partials/styles.html',
+}
+
+
+class EmailTemplates:
+    """Шаблоны писем на Jinja2.
+
+    Каждый шаблон компилируется один раз при первом обращении и дальше
+    берётся из кэша окружения (auto_reload выключен — файлы не
+    перечитываются). Все подстановки экранируются: HTML из сопроводительного
+    письма или названия вакансии не попадает в разметку письма.
+    """
+
+    def __init__(self, directory: str = TEMPLATES_DIR):
+        self.env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(['html']),
+            auto_reload=False,
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        for name, path in STATIC_PARTIALS.items():
+            self.env.globals[name] = Markup(self.env.get_template(path).render())
+
+    def render(self, name: str, **context) -> str:
+        return self.env.get_template(name).render(**context)
+
+    def render_many(self, name: str, contexts: Iterable[dict]) -> List[str]:
+        """Рендер одного шаблона для многих получателей (массовые уведомления)"""
+        template = self.env.get_template(name)
+        return [template.render(**context) for context in contexts]
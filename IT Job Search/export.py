@@ -0,0 +1,214 @@
+"""Потоковая выгрузка вакансий и откликов в NDJSON, CSV и Parquet.
+
+Строки читаются из SQLite пачками (Database.iter_jobs/iter_applications),
+каждая пачка кодируется в потоке и сразу отдаётся дальше, поэтому память
+не растёт с размером таблицы. Parquet требует pyarrow (pip install pyarrow);
+каждая пачка становится отдельной row group.
+
+Запуск из командной строки:
+    python export.py jobs --format csv --output jobs.csv --location Dubai
+    python export.py applications --format ndjson > applications.ndjson
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import sys
+from typing import AsyncIterator, Callable, List, Sequence
+from logs import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Колонки с нестроковыми типами; остальные в Parquet — строки
+INTEGER_COLUMNS = {'id', 'job_id', 'experience_min', 'experience_max', 'salary_min', 'salary_max'}
+LIST_COLUMNS = {'tags'}
+
+
+class _ChunkSink:
+    """Файлоподобный приёмник для ParquetWriter: копит байты до выдачи"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+        self._position = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _ndjson_encoder(columns: Sequence[str]) -> Callable[[List[dict]], bytes]:
+    def encode(rows: List[dict]) -> bytes:
+        return ''.join(
+            json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in rows
+        ).encode('utf-8')
+    return encode
+
+
+def _csv_encoder(columns: Sequence[str]) -> Callable[[List[dict]], bytes]:
+    header_written = False
+
+    def encode(rows: List[dict]) -> bytes:
+        nonlocal header_written
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        for row in rows:
+            writer.writerow([
+                ','.join(row[c]) if c in LIST_COLUMNS else row[c] for c in columns
+            ])
+        return buffer.getvalue().encode('utf-8')
+
+    def finish() -> bytes:
+        # Пустая выгрузка — всё равно с заголовком
+        return b'' if header_written else encode([])
+
+    encode.finish = finish
+    return encode
+
+
+def _parquet_encoder(columns: Sequence[str]):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Для выгрузки в Parquet установите pyarrow")
+
+    schema = pa.schema([
+        (c, pa.int64() if c in INTEGER_COLUMNS
+         else pa.list_(pa.string()) if c in LIST_COLUMNS
+         else pa.string())
+        for c in columns
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+
+    def encode(rows: List[dict]) -> bytes:
+        table = pa.Table.from_pylist(
+            [{c: (None if row[c] is None else row[c] if c in INTEGER_COLUMNS | LIST_COLUMNS
+                  else str(row[c])) for c in columns} for row in rows],
+            schema=schema,
+        )
+        writer.write_table(table)
+        return sink.drain()
+
+    def finish() -> bytes:
+        writer.close()
+        return sink.drain()
+
+    encode.finish = finish
+    return encode
+
+
+_ENCODERS = {
+    'ndjson': _ndjson_encoder,
+    'csv': _csv_encoder,
+    'parquet': _parquet_encoder,
+}
+
+
+def encoder_for(fmt: str, columns: Sequence[str]):
+    """Кодировщик пачек строк; ValueError — неизвестный или недоступный формат"""
+    if fmt not in _ENCODERS:
+        raise ValueError(f"Неизвестный формат: {fmt}. Доступны: {', '.join(FORMATS)}")
+    return _ENCODERS[fmt](columns)
+
+
+async def stream_export(
+    batches: AsyncIterator[List[dict]],
+    encode: Callable[[List[dict]], bytes],
+) -> AsyncIterator[bytes]:
+    """Байты выгрузки по мере чтения пачек.
+
+    Кодирование идёт в потоке, чтобы большая пачка не занимала event loop.
+    """
+    async for rows in batches:
+        chunk = await asyncio.to_thread(encode, rows)
+        if chunk:
+            yield chunk
+    finish = getattr(encode, 'finish', None)
+    if finish:
+        chunk = await asyncio.to_thread(finish)
+        if chunk:
+            yield chunk
+
+
+async def _main(args, stdout):
+    from database import Database
+    from models import JobFilter
+
+    db = Database(args.db)
+    await db.init_db()
+    if args.table == 'jobs':
+        columns = Database.JOB_FIELDS
+        batches = db.iter_jobs(
+            JobFilter(search=args.search, location=args.location, position=args.position),
+            since=args.since,
+        )
+    else:
+        columns = Database.APPLICATION_FIELDS
+        batches = db.iter_applications(user_email=args.email, status=args.status)
+
+    output = open(args.output, 'wb') if args.output else stdout
+    rows = 0
+    try:
+        encode = encoder_for(args.format, columns)
+
+        async def counted():
+            nonlocal rows
+            async for batch in batches:
+                rows += len(batch)
+                yield batch
+
+        async for chunk in stream_export(counted(), encode):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+        await db.close()
+    log.info("Выгрузка завершена", rows=rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Выгрузка вакансий и откликов")
+    parser.add_argument('table', choices=['jobs', 'applications'])
+    parser.add_argument('--format', choices=list(FORMATS), default='ndjson')
+    parser.add_argument('--output', help='Файл (по умолчанию stdout)')
+    parser.add_argument('--db', default='jobs.db', help='Путь к базе данных')
+    parser.add_argument('--search')
+    parser.add_argument('--location')
+    parser.add_argument('--position')
+    parser.add_argument('--since', help='Вакансии с created_at не раньше даты')
+    parser.add_argument('--email', help='Отклики кандидата')
+    parser.add_argument('--status', help='Отклики в статусе')
+    args = parser.parse_args()
+    setup_logging()
+    # Служебные сообщения — в stderr, чтобы не смешивать их с данными в stdout
+    stdout = sys.stdout.buffer
+    with contextlib.redirect_stdout(sys.stderr):
+        asyncio.run(_main(args, stdout))
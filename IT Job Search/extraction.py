@@ -0,0 +1,213 @@
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models import Job
+
+# Ключевые слова, по которым сообщение считается вакансией
+JOB_KEYWORDS = [
+    'ml engineer', 'machine learning', 'data scientist',
+    'ai developer', 'artificial intelligence', 'deep learning'
+]
+
+PRIORITY_LOCATIONS = ['dubai', 'canada', 'ireland', 'serbia']
+
+# Список популярных технологий (порядок задаёт порядок тегов)
+TECH_KEYWORDS = [
+    'python', 'pytorch', 'tensorflow', 'keras', 'scikit-learn',
+    'r', 'sql', 'nosql', 'docker', 'kubernetes', 'aws', 'azure',
+    'gcp', 'spark', 'hadoop', 'nlp', 'computer vision', 'mlops',
+    'git', 'linux', 'tableau', 'power bi', 'airflow'
+]
+
+DEFAULT_TAGS = ['Python', 'Machine Learning']
+MAX_TAGS = 6
+
+POSITION_KEYWORDS = ['engineer', 'developer', 'scientist', 'analyst']
+
+
+def _trie_pattern(terms: List[str]) -> str:
+    """Регулярное выражение-префиксное дерево для набора терминов.
+    
+    «python|pytorch» превращается в «pyt(?:hon|orch)»: движок re проверяет
+    общий префикс один раз вместо перебора всех альтернатив, а более
+    длинный термин выигрывает у своего префикса.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class JobExtractor:
+    """Извлечение полей вакансии из текста сообщения.
+
+    Все регулярные выражения компилируются один раз при создании.
+    Ключевые слова, локации и теги ищутся одним проходом finditer по
+    тексту в нижнем регистре через общее выражение с именованными
+    группами. Теги совпадают только целыми словами, поэтому «git» не
+    находится в «github», «sql» — в «nosql», а «r» — в каждом слове.
+    """
+
+    def __init__(
+        self,
+        keywords: List[str] = None,
+        priority_locations: List[str] = None,
+        tech_keywords: List[str] = None,
+    ):
+        self.keywords = [k.lower() for k in (keywords or JOB_KEYWORDS)]
+        self.priority_locations = [l.lower() for l in (priority_locations or PRIORITY_LOCATIONS)]
+        self.tech_keywords = [t.lower() for t in (tech_keywords or TECH_KEYWORDS)]
+        self._tag_order: Dict[str, int] = {t: i for i, t in enumerate(self.tech_keywords)}
+        self._location_order: Dict[str, int] = {l: i for i, l in enumerate(self.priority_locations)}
+
+        # Однобуквенный «R» — язык, но не «R&D» и не «R's»
+        tags = [t for t in self.tech_keywords if t != 'r']
+        tag_pattern = rf"(?:{_trie_pattern(tags)})\b"
+        if 'r' in self.tech_keywords:
+            tag_pattern += r"|r\b(?![&'’])"
+
+        # Общая граница слова слева позволяет движку сразу пропускать
+        # середины слов. Ключевые слова и локации справа не ограничены,
+        # как подстроки раньше: «ml engineers» тоже подходит.
+        self._vocabulary_re = re.compile(
+            rf"\b(?:(?P<keyword>{_trie_pattern(self.keywords)})"
+            rf"|(?P<tag>{tag_pattern})"
+            rf"|(?P<location>{_trie_pattern(self.priority_locations)}))"
+        )
+
+        self._position_re = re.compile(_trie_pattern(POSITION_KEYWORDS), re.IGNORECASE)
+        self._title_clean_re = re.compile(r'[^\w\s-]')
+        self._company_res = [
+            re.compile(r'[Cc]ompany[:\s]+([A-Z][A-Za-z0-9\s&]+)'),
+            re.compile(r'[Кк]омпания[:\s]+([А-ЯA-Z][А-Яа-яA-Za-z0-9\s&]+)'),
+            re.compile(r'@([A-Za-z0-9_]+)'),  # Telegram username
+        ]
+        self._location_res = [
+            re.compile(r'[Ll]ocation[:\s]+([A-Za-z\s,]+)'),
+            re.compile(r'[Лл]окация[:\s]+([А-Яа-яA-Za-z\s,]+)'),
+            re.compile(r'🌍\s*([A-Za-z\s,]+)'),
+        ]
+        self._experience_res = [
+            re.compile(r'(\d+[-–]\d+)\s*(?:years?|лет)', re.IGNORECASE),
+            re.compile(r'(?:experience|опыт)[:\s]+(\d+[-–]\d+)', re.IGNORECASE),
+            re.compile(r'(\d+\+)\s*(?:years?|лет)', re.IGNORECASE),
+        ]
+        self._salary_res = [
+            re.compile(r'([\$€£]\d+[kK]?[-–]\d+[kK]?)'),
+            re.compile(r'(\d+[kK]?[-–]\d+[kK]?\s*(?:USD|EUR|GBP|CAD))'),
+            re.compile(r'[Ss]alary[:\s]+([\$€£]\d+[kK]?[-–]\d+[kK]?)'),
+        ]
+        self._email_re = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+        self._telegram_re = re.compile(r'@([a-zA-Z0-9_]{5,32})')
+
+    def scan(self, text: str) -> dict:
+        """Один проход по тексту: найденные ключевые слова, теги и локации"""
+        keywords, tags, locations = set(), set(), set()
+        for match in self._vocabulary_re.finditer(text.lower()):
+            kind = match.lastgroup
+            if kind == 'keyword':
+                keywords.add(match.group())
+            elif kind == 'tag':
+                tags.add(match.group())
+            else:
+                locations.add(match.group())
+        return {"keywords": keywords, "tags": tags, "locations": locations}
+
+    def is_job(self, text: str) -> bool:
+        """Есть ли в сообщении ключевые слова вакансии"""
+        return bool(text) and bool(self.scan(text)["keywords"])
+
+    def extract(self, text: str, source: str, date: datetime, scan: dict = None) -> Optional[Job]:
+        """Распарсить вакансию; scan — готовый результат scan(), если уже есть"""
+        scan = scan or self.scan(text)
+        lines = text.split('\n')
+
+        title = self.extract_title(lines)
+        company = self._first_group(self._company_res, text, "Unknown Company", 100)
+        location = self._extract_location(text, scan["locations"])
+        experience = self._extract_experience(text)
+        salary = self._first_group(self._salary_res, text, None)
+        description = self.extract_description(lines)
+        tags = self._extract_tags(scan["tags"])
+        contact_email = self._extract_email(text)
+        contact_telegram = self._extract_telegram(text)
+
+        if not title or not company:
+            return None
+
+        return Job(
+            title=title,
+            company=company,
+            location=location or "Remote",
+            experience=experience or "2-3 years",
+            experience_is_default=experience is None,
+            salary=salary or "Competitive",
+            description=description,
+            tags=tags,
+            source=f"t.me/{source}",
+            posted_date=date.strftime('%Y-%m-%d'),
+            contact_email=contact_email or f"jobs@{company.lower().replace(' ', '')}.com",
+            contact_telegram=contact_telegram or f"@{source}"
+        )
+
+    def extract_title(self, lines: List[str]) -> str:
+        """Название должности: первая из 5 строк с названием позиции"""
+        for line in lines[:5]:
+            if self._position_re.search(line):
+                # Очищаем от эмодзи и лишних символов
+                clean_line = self._title_clean_re.sub('', line).strip()
+                if len(clean_line) > 5:
+                    return clean_line[:100]
+
+        return lines[0][:100] if lines else "Unknown Position"
+
+    @staticmethod
+    def extract_description(lines: List[str]) -> str:
+        """Описание: строки со 2-й по 6-ю длиннее 20 символов"""
+        description_lines = [line for line in lines[1:6] if len(line) > 20]
+        description = ' '.join(description_lines)
+        return description[:500] if description else "No description available"
+
+    @staticmethod
+    def _first_group(patterns: List[re.Pattern], text: str, default, max_len: int = None):
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                value = match.group(1)
+                return value.strip()[:max_len] if max_len else value
+        return default
+
+    def _extract_location(self, text: str, found: set) -> Optional[str]:
+        if found:
+            location = min(found, key=self._location_order.__getitem__)
+            return location.capitalize()
+        return self._first_group(self._location_res, text, None, 50)
+
+    def _extract_experience(self, text: str) -> Optional[str]:
+        value = self._first_group(self._experience_res, text, None)
+        return value + " years" if value else None
+
+    def _extract_tags(self, found: set) -> List[str]:
+        tags = [t.title() for t in sorted(found, key=self._tag_order.__getitem__)]
+        # Ограничиваем до 6 тегов
+        return tags[:MAX_TAGS] if tags else list(DEFAULT_TAGS)
+
+    def _extract_email(self, text: str) -> Optional[str]:
+        match = self._email_re.search(text)
+        return match.group(0) if match else None
+
+    def _extract_telegram(self, text: str) -> Optional[str]:
+        match = self._telegram_re.search(text)
+        return f"@{match.group(1)}" if match else None
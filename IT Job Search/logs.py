@@ -0,0 +1,103 @@
+"""Структурированные логи: сообщение плюс поля с теми же метками, что и в metrics.
+
+    log = get_logger(__name__)
+    log.info("Канал обработан", channel="datasciencejobs", inserted=3)
+
+Формат вывода — logfmt (по умолчанию) или JSON по строке на запись,
+выбирается LOG_FORMAT; уровень — LOG_LEVEL.
+"""
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+from confiq import settings
+
+
+class StructuredLogger:
+    """Обёртка над logging.Logger, принимающая поля как именованные аргументы"""
+
+    __slots__ = ('_logger',)
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(name)
+
+    def _log(self, level: int, message: str, fields: dict, exc_info=None):
+        # Проверка уровня до сборки записи: отключённые уровни почти бесплатны
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, message, extra={'fields': fields}, exc_info=exc_info, stacklevel=3)
+
+    def debug(self, message: str, **fields):
+        self._log(logging.DEBUG, message, fields)
+
+    def info(self, message: str, **fields):
+        self._log(logging.INFO, message, fields)
+
+    def warning(self, message: str, **fields):
+        self._log(logging.WARNING, message, fields)
+
+    def error(self, message: str, **fields):
+        self._log(logging.ERROR, message, fields)
+
+    def exception(self, message: str, **fields):
+        self._log(logging.ERROR, message, fields, exc_info=True)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(name)
+
+
+def _timestamp(record: logging.LogRecord) -> str:
+    return datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds')
+
+
+class LogfmtFormatter(logging.Formatter):
+    """time=... level=info logger=scheduler msg="..." channel=x inserted=3"""
+
+    @staticmethod
+    def _value(value) -> str:
+        text = str(value)
+        if not text or any(c in text for c in ' ="\n\\'):
+            return '"' + text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        return text
+
+    def format(self, record: logging.LogRecord) -> str:
+        pairs = {
+            'time': _timestamp(record),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+        line = ' '.join(f"{key}={self._value(value)}" for key, value in pairs.items())
+        if record.exc_info:
+            line += ' exc=' + self._value(self.formatException(record.exc_info))
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': _timestamp(record),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def setup_logging(level: str = None, fmt: str = None):
+    """Настроить корневой логгер (идемпотентно)"""
+    handler = logging.StreamHandler(sys.stderr)
+    fmt = (fmt or settings.LOG_FORMAT).lower()
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else LogfmtFormatter())
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if getattr(existing, '_structured', False):
+            root.removeHandler(existing)
+    handler._structured = True
+    root.addHandler(handler)
+    root.setLevel((level or settings.LOG_LEVEL).upper())
@@ -1,15 +1,37 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import Depends, FastAPI, Header, HTTPException, UploadFile, File, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.datastructures import Headers
 from typing import List, Optional
 import uvicorn
-from datetime import datetime
 import asyncio
+import hmac
+import os
+import time
+from datetime import datetime
 
 from database import Database
 from telegram_parser import TelegramParser
 from email_service import EmailService
+from outbox import EmailOutbox
+from uploads import UploadError
+from response_cache import ResponseCache, filter_key
+from export import FORMATS, encoder_for, stream_export
+from blob_store import BlobStore
+from crawler import ChannelCrawler
+from scheduler import IngestScheduler
+from coordination import ChangeWatcher, LeaderElection
+from peer_cache import PeerCache
+from parse_pool import ParsingPool
+from extraction import JOB_KEYWORDS, PRIORITY_LOCATIONS
+from confiq import settings
 from models import Job, Application, JobFilter
+from logs import get_logger, setup_logging
+from profiling import RequestProfile, SamplingProfiler
+import metrics
+
+setup_logging()
+log = get_logger(__name__)
 
 app = FastAPI(title="Job Search System API")
 
@@ -20,79 +42,293 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Запас на остальные поля формы и границы multipart
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+def is_admin(token: Optional[str]) -> bool:
+    """Токен администратора; без ADMIN_TOKEN диагностика выключена"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Нужен заголовок X-Admin-Token")
+
+# Профайлеры ставятся на весь процесс — одновременно только один
+profiling_lock = asyncio.Lock()
+
+def profiling_busy() -> JSONResponse:
+    return JSONResponse(status_code=409, content={"detail": "Профилирование уже идёт"})
+
+class RequestMiddleware:
+    """Обёртка всех HTTP-запросов одним ASGI-слоем.
+    
+    Вместо цепочки @app.middleware("http"), где каждый слой гоняет
+    запрос и ответ через свою задачу и поток тела, здесь за один проход:
+    время запроса по шаблону маршрута (до начала отправки тела), отказ
+    слишком большой загрузки до разбора multipart и, если задан
+    ADMIN_TOKEN, профилирование по заголовку X-Profile.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        observed = False
+        
+        def observe(status: int):
+            nonlocal observed
+            observed = True
+            route = scope.get("route")
+            metrics.http_series(
+                scope["method"], route.path if route else "unmatched", status
+            ).observe(time.perf_counter() - started)
+        
+        async def send_observed(message):
+            if message["type"] == "http.response.start":
+                observe(message["status"])
+            await send(message)
+        
+        try:
+            await self.handle(scope, receive, send_observed)
+        except Exception:
+            if not observed:
+                observe(500)
+            raise
+    
+    async def handle(self, scope, receive, send):
+        if scope["method"] == "POST" and scope["path"] == "/api/applications":
+            # Иначе Starlette сначала примет всё тело во временный файл
+            # и только потом передаст его в эндпоинт
+            content_length = Headers(scope=scope).get("content-length")
+            if content_length and content_length.isdigit() and (
+                int(content_length) > settings.MAX_UPLOAD_SIZE + UPLOAD_FORM_OVERHEAD
+            ):
+                response = JSONResponse(status_code=413, content={"detail": "Файл слишком большой"})
+                await response(scope, receive, send)
+                return
+        
+        if settings.ADMIN_TOKEN:
+            headers = Headers(scope=scope)
+            mode = headers.get("x-profile")
+            if mode and is_admin(headers.get("x-admin-token")):
+                await self.profile(scope, receive, send, mode)
+                return
+        
+        await self.app(scope, receive, send)
+    
+    async def profile(self, scope, receive, send, mode: str):
+        """X-Profile: cumulative | tottime | calls | pstats — вместо ответа отчёт cProfile.
+        
+        Исходный статус ответа — в заголовке X-Profiled-Status.
+        """
+        if profiling_lock.locked():
+            await profiling_busy()(scope, receive, send)
+            return
+        status = 500
+        
+        async def discard(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+        
+        async with profiling_lock:
+            # Тело отправляется под профайлером: сериализация и выгрузки тоже в отчёте
+            with RequestProfile() as profile:
+                await self.app(scope, receive, discard)
+        headers = {
+            "X-Profiled-Status": str(status),
+            "X-Profile-Seconds": f"{profile.elapsed:.6f}",
+            "X-Process-Id": str(os.getpid()),
+        }
+        if mode == "pstats":
+            headers["Content-Disposition"] = 'attachment; filename="request.pstats"'
+            response = Response(profile.dump(), media_type="application/octet-stream", headers=headers)
+        else:
+            response = Response(profile.report(mode), media_type="text/plain", headers=headers)
+        await response(scope, receive, send)
+
+app.add_middleware(RequestMiddleware)
+
 # Инициализация сервисов
 db = Database()
-telegram_parser = TelegramParser()
+parse_pool = ParsingPool(JOB_KEYWORDS, PRIORITY_LOCATIONS)
+telegram_parser = TelegramParser(peer_cache=PeerCache(db), parse_pool=parse_pool)
 email_service = EmailService()
+blob_store = BlobStore()
+response_cache = ResponseCache()
 
-# Фоновая задача для парсинга
-async def parse_telegram_channels():
-    """Парсинг Telegram каналов каждые 10 минут"""
-    # Проверяем, настроены ли Telegram credentials
-    if not telegram_parser.api_id or not telegram_parser.api_hash or not telegram_parser.phone:
-        print("⚠️ Telegram credentials не настроены. Парсинг отключен.")
-        print("   Для включения парсинга настройте TELEGRAM_API_ID, TELEGRAM_API_HASH и TELEGRAM_PHONE в .env")
-        return
-    
-    while True:
-        try:
-            print("🔍 Начинаю парсинг Telegram каналов...")
-            channels = [
-                "revacancy_global",
-                "datasciencejobs"
-            ]
-            
-            for channel in channels:
-                jobs = await telegram_parser.parse_channel(channel)
-                for job in jobs:
-                    await db.add_job(job)
-                print(f"✅ Канал {channel}: найдено {len(jobs)} новых вакансий")
-            
-            await asyncio.sleep(600)  # 10 минут
-        except Exception as e:
-            print(f"❌ Ошибка парсинга: {e}")
-            await asyncio.sleep(60)
+def invalidate_response_cache(tables):
+    """Новые вакансии и отклики меняют и статистику"""
+    response_cache.invalidate(*tables, "stats")
+
+db.add_write_listener(invalidate_response_cache)
+outbox = EmailOutbox(db, email_service)
+
+crawler = ChannelCrawler(telegram_parser, settings.TELEGRAM_CHANNELS, db=db)
+ingest = IngestScheduler(db, crawler, telegram_parser)
+
+async def start_background():
+    """Фоновые задачи ведущего процесса: загрузка каналов и очередь писем"""
+    outbox.start()
+    if ingest.enabled:
+        ingest.start()
+    else:
+        log.warning(
+            "Telegram credentials не настроены, парсинг отключен",
+            hint="настройте TELEGRAM_API_ID, TELEGRAM_API_HASH и TELEGRAM_PHONE в .env",
+        )
+
+async def stop_background():
+    # Клиент Telethon закрывается до того, как сессию откроет новый ведущий
+    await ingest.close()
+    await outbox.close()
+
+# С несколькими воркерами фоновые задачи работают только в одном процессе
+leader = LeaderElection(db, start_background, stop_background)
+
+def on_external_change(tables):
+    """Записи других процессов: сброс кэша и запросы ручной загрузки"""
+    if "ingest_trigger" in tables and leader.is_leader and ingest.enabled:
+        ingest.trigger()
+    data_tables = tuple(t for t in tables if t != "ingest_trigger")
+    if data_tables:
+        invalidate_response_cache(data_tables)
+
+changes = ChangeWatcher(db, on_external_change)
+loop_lag = metrics.LoopLagMonitor()
 
 @app.on_event("startup")
 async def startup_event():
     """Запуск при старте приложения"""
     await db.init_db()
-    # Запускаем фоновую задачу парсинга
-    asyncio.create_task(parse_telegram_channels())
-    print("🚀 Сервер запущен")
+    loop_lag.start()
+    if settings.ROLE != "api":
+        leader.start()
+    changes.start()
+    log.info("Сервер запущен", role=settings.ROLE)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Остановка приложения"""
+    await changes.close()
+    await leader.close()
+    await loop_lag.close()
+    parse_pool.close()
+    await db.close()
+    log.info("Сервер остановлен")
 
 @app.get("/")
 async def root():
     return {"message": "Job Search System API", "status": "running"}
 
-@app.get("/api/jobs", response_model=List[Job])
-async def get_jobs(
+def comma_list(value: Optional[str]) -> Optional[List[str]]:
+    """Параметр запроса «a,b,c» в список без пустых элементов"""
+    items = [item.strip() for item in value.split(',') if item.strip()] if value else []
+    return items or None
+
+def job_filter(
     search: Optional[str] = None,
     location: Optional[str] = None,
     position: Optional[str] = None,
-    limit: int = 50
+    tags: Optional[str] = None,
+    tag_mode: str = Query("all", pattern="^(all|any)$"),
+    experience_min: Optional[int] = Query(None, ge=0),
+    experience_max: Optional[int] = Query(None, ge=0),
+    salary_min: Optional[int] = Query(None, ge=0),
+    salary_max: Optional[int] = Query(None, ge=0)
+) -> JobFilter:
+    """Общие фильтры списка, фасетов и выгрузки вакансий.
+    
+    tags — теги через запятую; tag_mode=all требует все теги, any — любой.
+    Диапазоны опыта (лет) и зарплаты (долларов в месяц) должны
+    пересекаться с диапазоном вакансии.
+    """
+    return JobFilter(
+        search=search,
+        location=location,
+        position=position,
+        tags=comma_list(tags),
+        tag_mode=tag_mode,
+        experience_min=experience_min,
+        experience_max=experience_max,
+        salary_min=salary_min,
+        salary_max=salary_max
+    )
+
+@app.get("/api/jobs")
+async def get_jobs(
+    request: Request,
+    filters: JobFilter = Depends(job_filter),
+    sort: str = Query("date", pattern="^(date|salary)$"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
 ):
-    """Получить список вакансий с фильтрами"""
+    """Получить список вакансий с фильтрами.
+    
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor;
+    fields — список колонок через запятую (например, fields=title,company).
+    sort=salary — сначала высокие зарплаты (только вакансии с зарплатой).
+    """
     try:
-        filters = JobFilter(
-            search=search,
-            location=location,
-            position=position
+        field_list = comma_list(fields)
+        
+        async def load():
+            jobs, next_cursor = await db.get_jobs_page(filters, limit, cursor, field_list, sort)
+            return jobs, {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        
+        key = filter_key(
+            filters, sort=sort, limit=limit, cursor=cursor,
+            fields=",".join(sorted(field_list)) if field_list else None
         )
-        jobs = await db.get_jobs(filters, limit)
-        return jobs
+        return await response_cache.respond(request, "jobs", key, load)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/tags")
+async def get_tag_facets(
+    request: Request,
+    filters: JobFilter = Depends(job_filter),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Теги с числом вакансий под текущими фильтрами (фасеты)"""
+    async def load():
+        return await db.get_tag_facets(filters, limit), {}
+    
+    try:
+        return await response_cache.respond(request, "jobs", "tags:" + filter_key(filters, limit=limit), load)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/api/jobs/{job_id}", response_model=Job)
-async def get_job(job_id: int):
+async def get_job(job_id: int, request: Request):
     """Получить конкретную вакансию"""
-    job = await db.get_job_by_id(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="Вакансия не найдена")
-    return job
+    async def load():
+        job = await db.get_job_by_id(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Вакансия не найдена")
+        return job, {}
+    
+    return await response_cache.respond(request, "jobs", f"id:{job_id}", load)
+
+@app.get("/api/jobs/{job_id}/duplicates")
+async def get_job_duplicates(job_id: int):
+    """Почти-дубликаты вакансии из других каналов"""
+    return await db.get_job_duplicates(job_id)
 
 @app.post("/api/applications")
 async def create_application(
@@ -111,15 +347,15 @@ async def create_application(
             raise HTTPException(status_code=404, detail="Вакансия не найдена")
         
         # Проверяем тип файла
-        if not resume.filename.endswith('.pdf'):
+        if not (resume.filename or '').lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Только PDF файлы")
         
-        # Сохраняем резюме
-        resume_content = await resume.read()
-        resume_path = f"uploads/resumes/{job_id}_{datetime.now().timestamp()}_{resume.filename}"
-        
-        with open(resume_path, "wb") as f:
-            f.write(resume_content)
+        # Сохраняем резюме потоково, с проверкой размера и сигнатуры PDF.
+        # Одинаковые файлы хранятся один раз — путь задаётся SHA-256.
+        try:
+            stored = await blob_store.put_upload(resume)
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
         
         # Создаём отклик
         application = Application(
@@ -128,26 +364,28 @@ async def create_application(
             email=email,
             phone=phone,
             message=message,
-            resume_path=resume_path,
+            resume_path=stored.path,
             status="sent",
             applied_date=datetime.now()
         )
         
-        application_id = await db.add_application(application)
-        
-        # Отправляем email работодателю
-        await email_service.send_application_email(
-            job=job,
-            application=application,
-            resume_path=resume_path
+        # Письмо работодателю уходит из очереди в фоне
+        application_id = await db.add_application(
+            application, emails=["application"], resume=stored
         )
+        if application_id is None:
+            raise HTTPException(status_code=500, detail="Не удалось сохранить отклик")
+        outbox.wake()
         
         return {
             "status": "success",
             "application_id": application_id,
-            "message": "Отклик успешно отправлен"
+            "resume_sha256": stored.sha256,
+            "message": "Отклик принят и будет отправлен работодателю"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -173,32 +411,150 @@ async def update_application_status(
     application_id: int,
     status: str
 ):
-    """Обновить статус отклика"""
+    """Обновить статус отклика и уведомить кандидата письмом"""
+    success = await db.update_application_status(application_id, status, notify=True)
+    if not success:
+        raise HTTPException(status_code=404, detail="Отклик не найден")
+    outbox.wake()
+    return {"status": "success", "message": "Статус обновлён"}
+
+def export_response(name: str, fmt: str, columns, batches) -> StreamingResponse:
+    """Потоковый ответ с выгрузкой; ValueError — неизвестный формат"""
+    encode = encoder_for(fmt, columns)
+    media_type, extension = FORMATS[fmt]
+    return StreamingResponse(
+        stream_export(batches, encode),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'}
+    )
+
+@app.get("/api/export/jobs", dependencies=[Depends(require_admin)])
+async def export_jobs(
+    format: str = "ndjson",
+    filters: JobFilter = Depends(job_filter),
+    since: Optional[str] = None
+):
+    """Выгрузить вакансии целиком (ndjson, csv, parquet)"""
     try:
-        success = await db.update_application_status(application_id, status)
-        if not success:
-            raise HTTPException(status_code=404, detail="Отклик не найден")
-        return {"status": "success", "message": "Статус обновлён"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        return export_response("jobs", format, db.JOB_FIELDS, db.iter_jobs(filters, since))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/export/applications", dependencies=[Depends(require_admin)])
+async def export_applications(
+    format: str = "ndjson",
+    user_email: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """Выгрузить отклики целиком (ndjson, csv, parquet)"""
+    try:
+        return export_response(
+            "applications", format, db.APPLICATION_FIELDS,
+            db.iter_applications(user_email, status)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/api/parse/trigger")
 async def trigger_parse():
-    """Запустить парсинг вручную"""
-    try:
-        asyncio.create_task(parse_telegram_channels())
-        return {"status": "success", "message": "Парсинг запущен"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    """Запустить парсинг вручную.
+    
+    Если цикл уже идёт, после него выполняется ещё один; повторные
+    запросы до его начала с ним сливаются.
+    """
+    if not leader.is_leader:
+        # Загрузка идёт в другом процессе: он увидит запрос через ChangeWatcher
+        await db.request_ingest()
+        return {"status": "success", "state": "requested", "message": "Запрос передан ведущему процессу"}
+    if not ingest.enabled:
+        raise HTTPException(status_code=503, detail="Telegram credentials не настроены")
+    state = ingest.trigger()
+    messages = {
+        'started': "Парсинг запущен",
+        'queued': "Парсинг запустится после текущего цикла",
+        'coalesced': "Дополнительный цикл уже запланирован",
+    }
+    return {"status": "success", "state": state, "message": messages[state]}
+
+@app.get("/api/parse/runs")
+async def get_parse_runs(limit: int = Query(20, ge=1, le=200)):
+    """История циклов загрузки с итогами по каналам"""
+    return {
+        "scheduler": ingest.metrics(),
+        "leader": {**leader.metrics(), "lease": await db.get_lease(leader.name)},
+        "runs": await db.get_ingest_runs(limit),
+    }
 
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(request: Request):
     """Получить статистику"""
+    async def load():
+        return await db.get_stats(), {}
+    
     try:
-        stats = await db.get_stats()
-        return stats
+        return await response_cache.respond(request, "stats", "all", load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/email/outbox")
+async def get_email_outbox():
+    """Состояние очереди исходящих писем"""
+    return {**await db.get_outbox_stats(), "worker": outbox.metrics()}
+
+@app.get("/api/stats/daily")
+async def get_jobs_daily(
+    request: Request,
+    days: int = Query(30, ge=1, le=365),
+    source: Optional[str] = None
+):
+    """Вакансии по дням и источникам для графиков"""
+    async def load():
+        return await db.get_jobs_daily(days, source), {}
+    
+    return await response_cache.respond(request, "stats", f"daily:{days}:{source}", load)
+
+@app.get("/api/cache")
+async def get_cache_metrics():
+    """Попадания и промахи кэша ответов"""
+    return {**response_cache.metrics(), "sync": changes.metrics()}
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Метрики процесса в текстовом формате Prometheus"""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/db/pool")
+async def get_db_pool_metrics():
+    """Метрики пула соединений с базой данных"""
+    return db.pool_metrics()
+
+@app.get("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def profile_process(
+    seconds: float = Query(10, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    interval: float = Query(0.01, ge=0.001, le=1),
+):
+    """Сэмплирующий профиль процесса за seconds секунд.
+    
+    Свёрнутые стеки для flamegraph.pl / speedscope. При нескольких
+    воркерах профилируется тот процесс, что принял запрос (X-Process-Id).
+    """
+    if profiling_lock.locked():
+        return profiling_busy()
+    async with profiling_lock:
+        counts = await asyncio.to_thread(SamplingProfiler(interval).sample, seconds)
+    pid = os.getpid()
+    return Response(SamplingProfiler.collapse(counts), media_type="text/plain", headers={
+        "Content-Disposition": f'attachment; filename="profile-{pid}-{int(time.time())}.folded"',
+        "X-Process-Id": str(pid),
+    })
+
+@app.get("/api/admin/slow-queries", dependencies=[Depends(require_admin)])
+async def get_slow_queries():
+    """Последние запросы SQL дольше SLOW_QUERY_MS"""
+    slow_queries = db.pool.slow_queries
+    if slow_queries is None:
+        return {"enabled": False, "threshold_ms": None, "total": 0, "queries": []}
+    return {"enabled": True, **slow_queries.metrics(), "queries": slow_queries.recent()}
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
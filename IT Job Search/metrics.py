@@ -0,0 +1,269 @@
+"""Метрики в формате Prometheus без внешних зависимостей.
+
+Гистограммы и счётчики хранят значения в заранее выделенных списках:
+observe() — это bisect по границам и пара сложений. Дочерние серии с
+метками создаются один раз: горячий код берёт их заранее
+(HISTOGRAM.labels(...) при импорте или декорировании) и дальше только
+вызывает observe()/inc(). Значения живут в памяти процесса — при
+нескольких воркерах каждый отдаёт свои, а Prometheus суммирует их.
+"""
+import asyncio
+import functools
+import inspect
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence, Tuple
+
+from logs import get_logger
+
+log = get_logger(__name__)
+
+# Секунды: от 0.1 мс (запрос к SQLite по индексу) до минут (цикл загрузки)
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _HistogramSeries:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # Последняя ячейка — +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _CounterSeries:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class _Metric(ABC):
+    kind = ''
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.register(self)
+
+    @abstractmethod
+    def _new_series(self):
+        ...
+
+    def labels(self, *values: str):
+        """Серия с данными значениями меток (создаётся при первом обращении)"""
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: ожидались метки {self.labelnames}")
+            series = self._series[values] = self._new_series()
+        return series
+
+    @abstractmethod
+    def render(self) -> str:
+        ...
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        """Для гистограммы без меток"""
+        self.labels().observe(value)
+
+    def render(self) -> str:
+        lines = []
+        for values, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                labels = _format_labels(self.labelnames, values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {series.sum}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def render(self) -> str:
+        return '\n'.join(
+            f"{self.name}_total{_format_labels(self.labelnames, values)} {series.value}"
+            for values, series in list(self._series.items())
+        )
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Текстовый формат экспозиции Prometheus 0.0.4"""
+        blocks = []
+        for metric in self._metrics.values():
+            body = metric.render()
+            if not body:
+                continue
+            blocks.append(f"# HELP {metric.name} {metric.help}\n# TYPE {metric.name} {metric.kind}\n{body}")
+        return '\n'.join(blocks) + '\n'
+
+
+REGISTRY = Registry()
+# Response сам добавит charset=utf-8
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса",
+    ("method", "route", "status"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Время метода Database, включая ожидание соединения",
+    ("method",),
+)
+DB_ERRORS = Counter(
+    "db_query_errors", "Исключения из методов Database", ("method",),
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries", "Запросы SQL дольше SLOW_QUERY_MS по методу Database", ("method",),
+)
+PARSER_STAGE_SECONDS = Histogram(
+    "parser_stage_duration_seconds", "Этапы TelegramParser: fetch, filter, extract (на канал)",
+    ("stage",),
+)
+PARSER_MESSAGES = Counter(
+    "parser_messages", "Сообщения по этапам: fetched, matched, jobs", ("stage",),
+)
+SMTP_SEND_SECONDS = Histogram(
+    "smtp_send_duration_seconds", "Отправка письма, включая переподключение",
+)
+SMTP_FAILURES = Counter(
+    "smtp_send_failures", "Неудачные отправки писем по типу ошибки", ("error",),
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds", "Опоздание пробуждения event loop относительно таймера",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+_http_series: Dict[str, Dict[str, Dict[int, _HistogramSeries]]] = {}
+
+
+def http_series(method: str, route: str, status: int) -> _HistogramSeries:
+    """Серия HTTP_REQUEST_SECONDS через вложенные словари — без кортежа на запрос"""
+    by_route = _http_series.get(method)
+    if by_route is None:
+        by_route = _http_series[method] = {}
+    by_status = by_route.get(route)
+    if by_status is None:
+        by_status = by_route[route] = {}
+    series = by_status.get(status)
+    if series is None:
+        series = by_status[status] = HTTP_REQUEST_SECONDS.labels(method, route, str(status))
+    return series
+
+
+def instrument_methods(cls, histogram: Histogram = DB_QUERY_SECONDS, errors: Counter = DB_ERRORS):
+    """Декоратор класса: время каждого публичного async-метода.
+
+    Серии меток берутся при декорировании, обёртка только замеряет время.
+    Асинхронные генераторы (потоковая выгрузка) не оборачиваются: их
+    время — это время клиента, а не базы.
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _timed(method, histogram.labels(name), errors.labels(name)))
+    return cls
+
+
+def _timed(method, series: _HistogramSeries, failures: _CounterSeries):
+    observe, perf_counter = series.observe, time.perf_counter
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        started = perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        except Exception:
+            failures.inc()
+            raise
+        finally:
+            observe(perf_counter() - started)
+    return wrapper
+
+
+class LoopLagMonitor:
+    """Замер задержки event loop: насколько позже заказанного просыпается sleep"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        observe, monotonic, interval = EVENT_LOOP_LAG_SECONDS.labels().observe, time.monotonic, self.interval
+        while True:
+            started = monotonic()
+            await asyncio.sleep(interval)
+            lag = monotonic() - started - interval
+            observe(lag if lag > 0 else 0.0)
+            if lag > 1.0:
+                log.warning("Event loop заблокирован", lag_sec=round(lag, 3))
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
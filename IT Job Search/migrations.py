@@ -0,0 +1,562 @@
+"""Миграции схемы базы данных.
+
+Версия схемы хранится в PRAGMA user_version. Каждая миграция — корутина,
+принимающая соединение; они применяются по порядку внутри транзакции писателя.
+
+Ручной запуск для существующего файла:
+    python migrations.py jobs.db
+"""
+import asyncio
+import sys
+
+import aiosqlite
+
+import compensation
+import dedup
+from logs import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+
+async def _fts_search(db: aiosqlite.Connection):
+    """Полнотекстовый индекс FTS5 по вакансиям"""
+    await db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, company, description, tags,
+            content='jobs',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+
+    # Триггеры синхронизируют индекс с таблицей jobs
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts(rowid, title, company, description, tags)
+            VALUES (new.id, new.title, new.company, new.description, new.tags);
+        END
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, tags)
+            VALUES ('delete', old.id, old.title, old.company, old.description, old.tags);
+        END
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_au
+        AFTER UPDATE OF title, company, description, tags ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, tags)
+            VALUES ('delete', old.id, old.title, old.company, old.description, old.tags);
+            INSERT INTO jobs_fts(rowid, title, company, description, tags)
+            VALUES (new.id, new.title, new.company, new.description, new.tags);
+        END
+    """)
+
+    # Индексируем уже существующие вакансии
+    await db.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+
+async def _listing_indexes(db: aiosqlite.Connection):
+    """Составные индексы для keyset-пагинации по (created_at, id)"""
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_created_id ON jobs(created_at DESC, id DESC)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_location_created_id "
+        "ON jobs(location, created_at DESC, id DESC)"
+    )
+
+
+async def _channel_state(db: aiosqlite.Connection):
+    """Последний обработанный message.id по каналам"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS channel_state (
+            channel TEXT PRIMARY KEY,
+            last_message_id INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+async def _telegram_peers(db: aiosqlite.Connection):
+    """Кэш разрешённых каналов Telegram (access_hash)"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS telegram_peers (
+            username TEXT PRIMARY KEY,
+            peer_type TEXT NOT NULL,
+            peer_id INTEGER NOT NULL,
+            access_hash INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+async def _near_duplicates(db: aiosqlite.Connection):
+    """SimHash-отпечатки описаний и LSH-индекс почти-дубликатов"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS job_fingerprints (
+            job_id INTEGER PRIMARY KEY REFERENCES jobs (id) ON DELETE CASCADE,
+            simhash INTEGER NOT NULL
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS job_lsh (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            job_id INTEGER NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+            PRIMARY KEY (band, bucket, job_id)
+        ) WITHOUT ROWID
+    """)
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_job_lsh_job ON job_lsh(job_id)")
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS job_duplicates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            canonical_job_id INTEGER NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+            title TEXT NOT NULL,
+            company TEXT NOT NULL,
+            source TEXT,
+            posted_date TEXT,
+            distance INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(title, company, posted_date)
+        )
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_job_duplicates_canonical ON job_duplicates(canonical_job_id)"
+    )
+
+    # Отпечатки уже сохранённых вакансий
+    async with db.execute("SELECT id, description FROM jobs") as cursor:
+        while True:
+            rows = await cursor.fetchmany(1000)
+            if not rows:
+                break
+            fingerprints, lsh = [], []
+            for job_id, description in rows:
+                signature = dedup.simhash(description)
+                if signature is None:
+                    continue
+                fingerprints.append((job_id, dedup.to_sqlite(signature)))
+                lsh.extend(
+                    (band, bucket, job_id)
+                    for band, bucket in enumerate(dedup.bands(signature))
+                )
+            await db.executemany(
+                "INSERT OR IGNORE INTO job_fingerprints (job_id, simhash) VALUES (?, ?)",
+                fingerprints
+            )
+            await db.executemany(
+                "INSERT OR IGNORE INTO job_lsh (band, bucket, job_id) VALUES (?, ?, ?)", lsh
+            )
+
+
+async def _email_outbox(db: aiosqlite.Connection):
+    """Очередь исходящих писем"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            application_id INTEGER NOT NULL REFERENCES applications (id),
+            params TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(status, next_attempt_at)"
+    )
+
+
+async def _resume_blobs(db: aiosqlite.Connection):
+    """Резюме по SHA-256 содержимого со счётчиком ссылок"""
+    await db.execute("ALTER TABLE applications ADD COLUMN resume_sha256 TEXT")
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS resume_blobs (
+            sha256 TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_resume_blobs_refcount ON resume_blobs(refcount)"
+    )
+
+    # Счётчик ссылок ведут триггеры на applications
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS applications_blob_ai AFTER INSERT ON applications
+        WHEN new.resume_sha256 IS NOT NULL BEGIN
+            UPDATE resume_blobs SET refcount = refcount + 1 WHERE sha256 = new.resume_sha256;
+        END
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS applications_blob_ad AFTER DELETE ON applications
+        WHEN old.resume_sha256 IS NOT NULL BEGIN
+            UPDATE resume_blobs SET refcount = refcount - 1 WHERE sha256 = old.resume_sha256;
+        END
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS applications_blob_au
+        AFTER UPDATE OF resume_sha256 ON applications BEGIN
+            UPDATE resume_blobs SET refcount = refcount - 1 WHERE sha256 = old.resume_sha256;
+            UPDATE resume_blobs SET refcount = refcount + 1 WHERE sha256 = new.resume_sha256;
+        END
+    """)
+
+
+def _bump(metric: str, key: str, delta: str) -> str:
+    """Тело триггера: прибавить delta к счётчику (metric, key)"""
+    return f"""
+            INSERT INTO stat_counters (metric, key, value)
+            VALUES ('{metric}', COALESCE({key}, ''), {delta})
+            ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;"""
+
+
+def _bump_daily(row: str, delta: str) -> str:
+    return f"""
+            INSERT INTO jobs_daily (day, source, count)
+            VALUES (date({row}.created_at), COALESCE({row}.source, ''), {delta})
+            ON CONFLICT(day, source) DO UPDATE SET count = count + excluded.count;"""
+
+
+async def _stats_counters(db: aiosqlite.Connection):
+    """Счётчики статистики, которые ведут триггеры"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS stat_counters (
+            metric TEXT NOT NULL,
+            key TEXT NOT NULL DEFAULT '',
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (metric, key)
+        ) WITHOUT ROWID
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS jobs_daily (
+            day TEXT NOT NULL,
+            source TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, source)
+        ) WITHOUT ROWID
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status)"
+    )
+
+    triggers = {
+        "stats_jobs_ai AFTER INSERT ON jobs": (
+            _bump('jobs_total', "''", '1')
+            + _bump('jobs_by_location', 'new.location', '1')
+            + _bump_daily('new', '1')
+        ),
+        "stats_jobs_ad AFTER DELETE ON jobs": (
+            _bump('jobs_total', "''", '-1')
+            + _bump('jobs_by_location', 'old.location', '-1')
+            + _bump_daily('old', '-1')
+        ),
+        "stats_jobs_au AFTER UPDATE OF location, source, created_at ON jobs": (
+            _bump('jobs_by_location', 'old.location', '-1')
+            + _bump('jobs_by_location', 'new.location', '1')
+            + _bump_daily('old', '-1')
+            + _bump_daily('new', '1')
+        ),
+        "stats_applications_ai AFTER INSERT ON applications": (
+            _bump('applications_total', "''", '1')
+            + _bump('applications_by_status', 'new.status', '1')
+        ),
+        "stats_applications_ad AFTER DELETE ON applications": (
+            _bump('applications_total', "''", '-1')
+            + _bump('applications_by_status', 'old.status', '-1')
+        ),
+        "stats_applications_au AFTER UPDATE OF status ON applications": (
+            _bump('applications_by_status', 'old.status', '-1')
+            + _bump('applications_by_status', 'new.status', '1')
+        ),
+    }
+    for head, body in triggers.items():
+        await db.execute(f"CREATE TRIGGER IF NOT EXISTS {head} BEGIN{body}\n        END")
+
+    # Начальные значения по уже сохранённым данным
+    await db.execute("DELETE FROM stat_counters")
+    await db.execute("DELETE FROM jobs_daily")
+    await db.execute("""
+        INSERT INTO stat_counters (metric, key, value)
+        SELECT 'jobs_total', '', COUNT(*) FROM jobs
+        UNION ALL
+        SELECT 'jobs_by_location', COALESCE(location, ''), COUNT(*) FROM jobs GROUP BY 2
+        UNION ALL
+        SELECT 'applications_total', '', COUNT(*) FROM applications
+        UNION ALL
+        SELECT 'applications_by_status', COALESCE(status, ''), COUNT(*) FROM applications GROUP BY 2
+    """)
+    await db.execute("""
+        INSERT INTO jobs_daily (day, source, count)
+        SELECT date(created_at), COALESCE(source, ''), COUNT(*) FROM jobs GROUP BY 1, 2
+    """)
+
+
+async def _import_checkpoints(db: aiosqlite.Connection):
+    """Контрольные точки импорта экспортов Telegram"""
+    # Ключ — путь к файлу экспорта; размер и mtime проверяют, что файл
+    # не подменили между запусками, иначе byte_offset указывает не туда
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source_file TEXT PRIMARY KEY,
+            channel TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            file_mtime REAL NOT NULL,
+            byte_offset INTEGER NOT NULL DEFAULT 0,
+            last_message_id INTEGER NOT NULL DEFAULT 0,
+            messages_read INTEGER NOT NULL DEFAULT 0,
+            jobs_inserted INTEGER NOT NULL DEFAULT 0,
+            duplicates INTEGER NOT NULL DEFAULT 0,
+            finished INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+async def _job_tags(db: aiosqlite.Connection):
+    """Справочник тегов и связи вакансий с тегами"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    """)
+    # Первичный ключ (tag_id, job_id) — выборка вакансий по тегу,
+    # индекс (job_id, tag_id) — проверка тега у конкретной вакансии
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS job_tags (
+            tag_id INTEGER NOT NULL REFERENCES tags(id),
+            job_id INTEGER NOT NULL,
+            PRIMARY KEY (tag_id, job_id)
+        ) WITHOUT ROWID
+    """)
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_job_tags_job ON job_tags(job_id, tag_id)")
+
+    # Перенос из колонки jobs.tags («Python,Sql»). Колонка остаётся:
+    # по ней строится FTS-индекс, и из неё читается список тегов вакансии
+    await db.execute("""
+        CREATE TEMP TABLE _job_tag_names AS
+        WITH RECURSIVE split(job_id, name, rest) AS (
+            SELECT id, '', tags || ',' FROM jobs WHERE tags IS NOT NULL AND tags != ''
+            UNION ALL
+            SELECT job_id, trim(substr(rest, 1, instr(rest, ',') - 1)),
+                   substr(rest, instr(rest, ',') + 1)
+            FROM split WHERE rest != ''
+        )
+        SELECT job_id, name FROM split WHERE name != ''
+    """)
+    await db.execute("INSERT OR IGNORE INTO tags (name) SELECT DISTINCT name FROM _job_tag_names")
+    await db.execute("""
+        INSERT OR IGNORE INTO job_tags (tag_id, job_id)
+        SELECT tags.id, _job_tag_names.job_id
+        FROM _job_tag_names JOIN tags ON tags.name = _job_tag_names.name
+    """)
+    await db.execute("DROP TABLE _job_tag_names")
+
+    # Счётчики для фасетов без фильтров; начальные значения — одним
+    # запросом, триггеры создаются после переноса
+    await db.execute("DELETE FROM stat_counters WHERE metric = 'jobs_by_tag'")
+    await db.execute("""
+        INSERT INTO stat_counters (metric, key, value)
+        SELECT 'jobs_by_tag', tags.name, COUNT(*)
+        FROM job_tags JOIN tags ON tags.id = job_tags.tag_id
+        GROUP BY job_tags.tag_id
+    """)
+    tag_name = "(SELECT name FROM tags WHERE id = {}.tag_id)"
+    triggers = {
+        "job_tags_ai AFTER INSERT ON job_tags": _bump('jobs_by_tag', tag_name.format('new'), '1'),
+        "job_tags_ad AFTER DELETE ON job_tags": _bump('jobs_by_tag', tag_name.format('old'), '-1'),
+        "jobs_tags_ad AFTER DELETE ON jobs": """
+            DELETE FROM job_tags WHERE job_id = old.id;""",
+    }
+    for head, body in triggers.items():
+        await db.execute(f"CREATE TRIGGER IF NOT EXISTS {head} BEGIN{body}\n        END")
+
+
+async def _compensation_ranges(db: aiosqlite.Connection):
+    """Числовые диапазоны опыта и зарплаты вакансий"""
+    for column in ('experience_min', 'experience_max', 'salary_min', 'salary_max'):
+        await db.execute(f"ALTER TABLE jobs ADD COLUMN {column} INTEGER")
+    await db.execute("ALTER TABLE jobs ADD COLUMN salary_currency TEXT")
+    await db.execute("ALTER TABLE jobs ADD COLUMN salary_period TEXT")
+
+    # Различных строк мало: каждая разбирается один раз, а таблица
+    # обновляется одним проходом через UPDATE ... FROM
+    async with db.execute("SELECT DISTINCT experience FROM jobs WHERE experience IS NOT NULL") as cursor:
+        experience = [
+            (text, *compensation.parse_experience(text)) for (text,) in await cursor.fetchall()
+        ]
+    async with db.execute("SELECT DISTINCT salary FROM jobs WHERE salary IS NOT NULL") as cursor:
+        salaries = [
+            (text, *salary) for (text,) in await cursor.fetchall()
+            if (salary := compensation.parse_salary(text))
+        ]
+
+    await db.execute("CREATE TEMP TABLE _experience_ranges (text TEXT PRIMARY KEY, low, high)")
+    await db.executemany("INSERT INTO _experience_ranges VALUES (?, ?, ?)", experience)
+    await db.execute("""
+        UPDATE jobs SET experience_min = r.low, experience_max = r.high
+        FROM _experience_ranges AS r WHERE r.text = jobs.experience
+    """)
+    await db.execute("DROP TABLE _experience_ranges")
+
+    await db.execute(
+        "CREATE TEMP TABLE _salary_ranges (text TEXT PRIMARY KEY, low, high, currency, period)"
+    )
+    await db.executemany("INSERT INTO _salary_ranges VALUES (?, ?, ?, ?, ?)", salaries)
+    await db.execute("""
+        UPDATE jobs SET salary_min = r.low, salary_max = r.high,
+                        salary_currency = r.currency, salary_period = r.period
+        FROM _salary_ranges AS r WHERE r.text = jobs.salary
+    """)
+    await db.execute("DROP TABLE _salary_ranges")
+
+    # (salary_max, salary_min) — фильтр «от» и сортировка по зарплате,
+    # (experience_min, experience_max) — пересечение с диапазоном опыта
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_salary ON jobs(salary_max, salary_min)")
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_experience ON jobs(experience_min, experience_max)"
+    )
+
+
+async def _ingest_runs(db: aiosqlite.Connection):
+    """История циклов загрузки каналов"""
+    # status: running, ok, partial (ошибки в части каналов), failed,
+    # cancelled (остановка сервера), interrupted (процесс завершился во время
+    # цикла); trigger: schedule или manual
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            trigger TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP,
+            duration REAL,
+            error TEXT
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_run_channels (
+            run_id INTEGER NOT NULL REFERENCES ingest_runs(id) ON DELETE CASCADE,
+            channel TEXT NOT NULL,
+            duration REAL NOT NULL,
+            messages_fetched INTEGER NOT NULL DEFAULT 0,
+            jobs_parsed INTEGER NOT NULL DEFAULT 0,
+            jobs_inserted INTEGER NOT NULL DEFAULT 0,
+            duplicates INTEGER NOT NULL DEFAULT 0,
+            flood_waits INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            PRIMARY KEY (run_id, channel)
+        ) WITHOUT ROWID
+    """)
+
+
+async def _leader_leases(db: aiosqlite.Connection):
+    """Аренды ролей для выбора ведущего процесса"""
+    # expires_at — unix-время; истёкшую аренду может занять другой процесс
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            acquired_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+
+async def _change_counters(db: aiosqlite.Connection):
+    """Счётчики изменений таблиц для сброса кэшей в других процессах"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS change_counters (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    for table in ('jobs', 'applications'):
+        await db.execute(
+            "INSERT OR IGNORE INTO change_counters (name) VALUES (?)", (table,)
+        )
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            await db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS changes_{table}_{event[0].lower()}
+                AFTER {event} ON {table} BEGIN
+                    UPDATE change_counters SET version = version + 1 WHERE name = '{table}';
+                END
+            """)
+
+
+async def _lsh_block_pairs(db: aiosqlite.Connection):
+    """LSH-полосы из пар 8-битных блоков вместо шести полос по 10-11 бит"""
+    await db.execute("DELETE FROM job_lsh")
+    async with db.execute("SELECT job_id, simhash FROM job_fingerprints") as cursor:
+        while True:
+            rows = await cursor.fetchmany(1000)
+            if not rows:
+                break
+            await db.executemany(
+                "INSERT INTO job_lsh (band, bucket, job_id) VALUES (?, ?, ?)",
+                [
+                    (band, bucket, job_id)
+                    for job_id, simhash in rows
+                    for band, bucket in enumerate(dedup.bands(dedup.from_sqlite(simhash)))
+                ]
+            )
+
+
+MIGRATIONS = [
+    _fts_search,
+    _listing_indexes,
+    _channel_state,
+    _telegram_peers,
+    _near_duplicates,
+    _email_outbox,
+    _resume_blobs,
+    _stats_counters,
+    _import_checkpoints,
+    _job_tags,
+    _compensation_ranges,
+    _ingest_runs,
+    _leader_leases,
+    _change_counters,
+    _lsh_block_pairs,
+]
+
+
+async def get_version(db: aiosqlite.Connection) -> int:
+    """Текущая версия схемы"""
+    async with db.execute("PRAGMA user_version") as cursor:
+        return (await cursor.fetchone())[0]
+
+
+async def migrate(db: aiosqlite.Connection) -> int:
+    """Применить недостающие миграции, вернуть итоговую версию схемы"""
+    version = await get_version(db)
+    for target, migration in enumerate(MIGRATIONS, start=1):
+        if version < target:
+            await migration(db)
+            await db.execute(f"PRAGMA user_version = {target}")
+            version = target
+            log.info("Схема БД обновлена", version=target, migration=migration.__doc__)
+    return version
+
+
+async def _main(db_path: str):
+    from database import Database
+
+    db = Database(db_path)
+    await db.init_db()
+    await db.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Использование: python migrations.py <путь к jobs.db>")
+        sys.exit(1)
+    setup_logging()
+    asyncio.run(_main(sys.argv[1]))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -16,6 +16,16 @@ class Job(BaseModel):
     contact_email: str
     contact_telegram: str
     created_at: Optional[datetime] = None
+    # Разобранные experience и salary: годы и доллары в месяц
+    experience_min: Optional[int] = None
+    experience_max: Optional[int] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    salary_currency: Optional[str] = None
+    salary_period: Optional[str] = None  # hour, month, year — период исходной суммы
+    # experience подставлен парсером по умолчанию: диапазон опыта не сохраняется
+    experience_is_default: bool = Field(False, exclude=True)
+    snippet: Optional[str] = None  # HTML-фрагмент при полнотекстовом поиске: текст экранирован, совпадения в <mark>
     
     class Config:
         from_attributes = True
@@ -28,6 +38,7 @@ class Application(BaseModel):
     phone: Optional[str] = None
     message: str
     resume_path: str
+    resume_sha256: Optional[str] = None  # блоб в хранилище резюме
     status: str = "sent"  # sent, viewed, rejected, accepted
     applied_date: datetime
     
@@ -38,8 +49,12 @@ class JobFilter(BaseModel):
     search: Optional[str] = None
     location: Optional[str] = None
     position: Optional[str] = None
+    tags: Optional[List[str]] = None
+    tag_mode: str = "all"  # all — все теги сразу, any — хотя бы один
     experience_min: Optional[int] = None
     experience_max: Optional[int] = None
+    salary_min: Optional[int] = None  # долларов в месяц
+    salary_max: Optional[int] = None
 
 class TelegramMessage(BaseModel):
     """Модель сообщения из Telegram"""
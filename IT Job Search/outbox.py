@@ -0,0 +1,225 @@
+import asyncio
+import time
+from email.message import Message
+from typing import Dict, List, Optional
+
+import aiosmtplib
+
+from database import Database
+from email_service import EmailService
+from confiq import settings
+from logs import get_logger
+
+log = get_logger(__name__)
+
+
+class PermanentEmailError(Exception):
+    """Ошибка, при которой повторять отправку бессмысленно"""
+
+
+# Сервер недоступен или отверг сессию целиком: письмо тут ни при чём
+CONNECTION_ERRORS = (
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    aiosmtplib.SMTPAuthenticationError,
+    aiosmtplib.SMTPHeloError,
+    aiosmtplib.SMTPNotSupported,
+)
+
+
+class EmailOutbox:
+    """Фоновая доставка писем из таблицы email_outbox.
+
+    Эндпоинты только ставят письмо в очередь (Database.add_application,
+    Database.update_application_status, enqueue) и будят воркер через
+    wake(). Письма о статусе из одной пачки собираются одной отрисовкой
+    шаблона (EmailService.build_status_update_emails). Воркер забирает
+    пачки готовых к отправке писем и шлёт их через постоянное соединение
+    EmailService. Временная ошибка откладывает письмо на
+    retry_base_delay * 2^(попытка-1) секунд, но не дольше retry_max_delay;
+    после max_attempts попыток или при отказе 5xx по получателю или
+    содержимому письмо помечается как failed. Ошибки подключения и
+    авторизации останавливают пачку и откладывают письмо, не расходуя
+    попытку. Очередь хранится в БД и переживает перезапуск.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        email_service: EmailService,
+        batch_size: int = None,
+        max_attempts: int = None,
+        retry_base_delay: float = None,
+        retry_max_delay: float = None,
+        poll_interval: float = None,
+    ):
+        self.db = db
+        self.email_service = email_service
+        self.batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.EMAIL_MAX_ATTEMPTS
+        self.retry_base_delay = (
+            settings.EMAIL_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+        )
+        self.retry_max_delay = retry_max_delay or settings.EMAIL_RETRY_MAX_DELAY
+        self.poll_interval = poll_interval or settings.EMAIL_POLL_INTERVAL
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self):
+        """Запустить воркер доставки в текущем event loop"""
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self.run())
+
+    def wake(self):
+        """Сообщить воркеру о новом письме, не дожидаясь опроса"""
+        self._wakeup.set()
+
+    async def enqueue(self, kind: str, application_id: int, params: dict = None) -> Optional[int]:
+        """Поставить письмо в очередь вне транзакции и разбудить воркер"""
+        email_id = await self.db.enqueue_email(kind, application_id, params)
+        self.wake()
+        return email_id
+
+    async def run(self):
+        while not self._closing:
+            # Сбрасываем до выборки, чтобы не потерять wake() во время отправки
+            self._wakeup.clear()
+            try:
+                processed = await self.deliver_due()
+            except Exception as e:
+                log.error("Ошибка очереди писем", error=e)
+                processed = 0
+            if processed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def deliver_due(self) -> int:
+        """Одна пачка готовых к отправке писем; возвращает их количество"""
+        rows = await self.db.get_due_emails(self.batch_size)
+        prebuilt = await self._build_status_emails(rows)
+        for row in rows:
+            if self._closing:
+                break
+            if not await self._deliver(row, prebuilt.get(row['id'])):
+                # Сервер недоступен: остальные письма пачки ждут следующего опроса
+                return 0
+        return len(rows)
+
+    async def _deliver(self, row: dict, message=None) -> bool:
+        """Отправить письмо; False — не удалось подключиться к серверу"""
+        try:
+            if message is None:
+                message = await self._build(row)
+            await self.email_service.send(message)
+        except CONNECTION_ERRORS as e:
+            await self._postpone(row, e)
+            return False
+        except Exception as e:
+            await self._handle_failure(row, e)
+            return True
+        await self.db.mark_email_sent(row['id'])
+        self.sent += 1
+        return True
+
+    async def _build_status_emails(self, rows: List[dict]) -> Dict[int, Message]:
+        """Письма о статусе из пачки: одна отрисовка шаблона на каждый статус.
+
+        Письма, которые не удалось собрать здесь, строит _build и
+        обрабатывает как обычную ошибку отправки.
+        """
+        groups: Dict[str, list] = {}
+        for row in rows:
+            if row['kind'] != 'status':
+                continue
+            application = await self.db.get_application_by_id(row['application_id'])
+            job = await self.db.get_job_by_id(application.job_id) if application else None
+            if application and job:
+                status = row['params'].get('status', application.status)
+                groups.setdefault(status, []).append((row['id'], application, job))
+
+        messages = {}
+        for status, group in groups.items():
+            try:
+                built = self.email_service.build_status_update_emails(
+                    [(application, job) for _, application, job in group], status
+                )
+            except Exception as e:
+                log.warning("Не удалось собрать письма о статусе", status=status, error=e)
+                continue
+            messages.update(zip((email_id for email_id, _, _ in group), built))
+        return messages
+
+    async def _build(self, row: dict):
+        application = await self.db.get_application_by_id(row['application_id'])
+        job = await self.db.get_job_by_id(application.job_id) if application else None
+        if not application or not job:
+            raise PermanentEmailError("Отклик или вакансия не найдены")
+
+        kind = row['kind']
+        if kind == 'application':
+            return await self.email_service.build_application_email(
+                job, application, application.resume_path
+            )
+        if kind == 'confirmation':
+            return self.email_service.build_confirmation_email(application, job)
+        if kind == 'status':
+            return self.email_service.build_status_update_email(
+                application, job, row['params'].get('status', application.status)
+            )
+        raise PermanentEmailError(f"Неизвестный вид письма: {kind}")
+
+    @staticmethod
+    def _is_permanent(error: Exception) -> bool:
+        if isinstance(error, (PermanentEmailError, aiosmtplib.SMTPRecipientsRefused)):
+            return True
+        # 5xx на RCPT или DATA относится к самому письму, а не к серверу
+        return (
+            isinstance(error, (aiosmtplib.SMTPRecipientRefused, aiosmtplib.SMTPDataError))
+            and 500 <= error.code < 600
+        )
+
+    async def _postpone(self, row: dict, error: Exception):
+        await self.db.postpone_email(row['id'], str(error), retry_at=time.time() + self.retry_base_delay)
+        self.retried += 1
+        log.warning("SMTP-сервер недоступен, письмо отложено", email_id=row['id'], kind=row['kind'], retry_in_sec=round(self.retry_base_delay), error=error)
+
+    async def _handle_failure(self, row: dict, error: Exception):
+        attempt = row['attempts'] + 1
+        if self._is_permanent(error) or attempt >= self.max_attempts:
+            await self.db.mark_email_failed(row['id'], str(error))
+            self.failed += 1
+            log.error("Письмо не доставлено", email_id=row['id'], kind=row['kind'], attempts=attempt, error=error)
+            return
+
+        delay = min(self.retry_base_delay * 2 ** (attempt - 1), self.retry_max_delay)
+        await self.db.mark_email_failed(row['id'], str(error), retry_at=time.time() + delay)
+        self.retried += 1
+        log.warning("Ошибка отправки письма, повтор", email_id=row['id'], kind=row['kind'], attempts=attempt, retry_in_sec=round(delay), error=error)
+
+    def metrics(self) -> dict:
+        return {
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "smtp_connects": self.email_service.connection.connects,
+        }
+
+    async def close(self):
+        """Дождаться текущего письма, остановить воркер и закрыть SMTP"""
+        self._closing = True
+        self.wake()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=settings.SMTP_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            self._task = None
+        await self.email_service.close()
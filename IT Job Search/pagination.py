@@ -0,0 +1,21 @@
+"""Непрозрачные курсоры для keyset-пагинации"""
+import base64
+import json
+
+
+def encode_cursor(state: dict) -> str:
+    """Закодировать состояние курсора в URL-безопасную строку"""
+    raw = json.dumps(state, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Раскодировать курсор; ValueError, если он повреждён"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Некорректный курсор") from e
+    if not isinstance(state, dict):
+        raise ValueError("Некорректный курсор")
+    return state
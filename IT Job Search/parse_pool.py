@@ -0,0 +1,119 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from extraction import JobExtractor
+from models import Job
+from confiq import settings
+from logs import get_logger
+
+log = get_logger(__name__)
+
+# (текст, канал, дата) — всё, что нужно воркеру, без объектов Telethon
+ParseItem = Tuple[str, str, datetime]
+
+# Экземпляр в каждом процессе-воркере, создаётся в _init_worker
+_extractor: Optional[JobExtractor] = None
+
+
+def _init_worker(keywords: List[str], priority_locations: List[str]):
+    global _extractor
+    _extractor = JobExtractor(keywords, priority_locations)
+
+
+def _parse_with(extractor: JobExtractor, items: List[ParseItem]) -> List[Job]:
+    """Отбор сообщений с вакансиями и их парсинг"""
+    jobs = []
+    for text, source, date in items:
+        scan = extractor.scan(text)
+        if not scan["keywords"]:
+            continue
+        try:
+            job = extractor.extract(text, source, date, scan)
+        except Exception as e:
+            log.error("Ошибка парсинга текста", channel=source, error=e)
+            continue
+        if job:
+            jobs.append(job)
+    return jobs
+
+
+def _parse_batch(items: List[ParseItem]) -> List[dict]:
+    """Выполняется в процессе-воркере.
+    
+    Возвращает словари: они сериализуются между процессами заметно
+    быстрее моделей pydantic. experience_is_default исключён из
+    model_dump, поэтому передаётся отдельно.
+    """
+    return [
+        {**job.model_dump(), 'experience_is_default': job.experience_is_default}
+        for job in _parse_with(_extractor, items)
+    ]
+
+
+class ParsingPool:
+    """Парсинг сообщений в пуле процессов.
+
+    Регулярные выражения выполняются вне event loop, поэтому большой
+    бэкфилл не задерживает запросы к API. Сообщения уходят пачками по
+    batch_size. Одновременно в пуле не больше max_pending пачек —
+    остальные ждут на семафоре (backpressure). При workers=0 парсинг
+    идёт в текущем процессе.
+    """
+
+    def __init__(
+        self,
+        keywords: List[str],
+        priority_locations: List[str],
+        workers: int = None,
+        batch_size: int = None,
+        max_pending: int = None,
+    ):
+        self.keywords = keywords
+        self.priority_locations = priority_locations
+        self.workers = settings.PARSE_WORKERS if workers is None else workers
+        self.batch_size = batch_size or settings.PARSE_BATCH_SIZE
+        self.max_pending = max_pending or settings.PARSE_MAX_PENDING_BATCHES
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(self.max_pending)
+        self._inline = JobExtractor(keywords, priority_locations) if self.workers <= 0 else None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: дочерние процессы не наследуют потоки aiosqlite и Telethon
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.keywords, self.priority_locations),
+            )
+        return self._executor
+
+    async def _run_batch(self, batch: List[ParseItem]) -> List[Job]:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            rows = await loop.run_in_executor(self._get_executor(), _parse_batch, batch)
+        # Поля уже проверены в воркере, повторная валидация не нужна
+        return [Job.model_construct(**row) for row in rows]
+
+    async def parse(self, items: List[ParseItem]) -> List[Job]:
+        """Распарсить сообщения, сохранив их порядок"""
+        if not items:
+            return []
+
+        if self._inline:
+            return _parse_with(self._inline, items)
+
+        batches = [
+            items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)
+        ]
+        results = await asyncio.gather(*(self._run_batch(b) for b in batches))
+        return [job for batch_jobs in results for job in batch_jobs]
+
+    def close(self):
+        """Остановить процессы-воркеры"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
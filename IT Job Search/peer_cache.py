@@ -0,0 +1,88 @@
+import asyncio
+from typing import Dict, Optional
+
+from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser
+
+from database import Database
+
+
+class PeerCache:
+    """Кэш разрешённых каналов Telegram (InputPeer с access_hash).
+
+    Записи хранятся в памяти и в таблице telegram_peers, поэтому после
+    перезапуска get_entity не вызывается повторно. Запись обновляется
+    только когда Telegram сообщает, что peer недействителен.
+    """
+
+    def __init__(self, db: Database = None):
+        self.db = db
+        self._peers: Dict[str, object] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(username: str) -> str:
+        # Username в Telegram регистронезависим
+        return username.lstrip('@').lower()
+
+    @staticmethod
+    def _to_row(peer) -> Optional[tuple]:
+        if isinstance(peer, InputPeerChannel):
+            return 'channel', peer.channel_id, peer.access_hash
+        if isinstance(peer, InputPeerUser):
+            return 'user', peer.user_id, peer.access_hash
+        if isinstance(peer, InputPeerChat):
+            return 'chat', peer.chat_id, 0
+        return None
+
+    @staticmethod
+    def _from_row(peer_type: str, peer_id: int, access_hash: int):
+        if peer_type == 'channel':
+            return InputPeerChannel(channel_id=peer_id, access_hash=access_hash)
+        if peer_type == 'user':
+            return InputPeerUser(user_id=peer_id, access_hash=access_hash)
+        return InputPeerChat(chat_id=peer_id)
+
+    async def _load(self):
+        # Каналы обходятся параллельно — таблица читается один раз
+        async with self._load_lock:
+            if self._loaded:
+                return
+            if self.db:
+                for username, (peer_type, peer_id, access_hash) in (
+                    await self.db.get_telegram_peers()
+                ).items():
+                    self._peers.setdefault(
+                        username, self._from_row(peer_type, peer_id, access_hash)
+                    )
+            self._loaded = True
+
+    async def get(self, username: str):
+        """InputPeer из кэша или None"""
+        await self._load()
+        peer = self._peers.get(self._key(username))
+        if peer is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return peer
+
+    async def put(self, username: str, peer):
+        """Сохранить InputPeer"""
+        key = self._key(username)
+        self._peers[key] = peer
+        row = self._to_row(peer)
+        if self.db and row:
+            await self.db.save_telegram_peer(key, *row)
+
+    async def invalidate(self, username: str):
+        """Удалить устаревшую запись"""
+        key = self._key(username)
+        self._peers.pop(key, None)
+        if self.db:
+            await self.db.delete_telegram_peer(key)
+
+    def metrics(self) -> dict:
+        return {"size": len(self._peers), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,111 @@
+"""Профилирование работающего процесса по запросу администратора.
+
+SamplingProfiler несколько секунд снимает стеки всех потоков и отдаёт
+их в свёрнутом формате (collapsed stacks) — его понимают flamegraph.pl,
+speedscope и inferno. RequestProfile — cProfile вокруг одного запроса.
+Пока профилирование не запрошено, ничего из этого не работает.
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Ключи сортировки отчёта cProfile для заголовка X-Profile
+SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+
+def _frame_label(code) -> str:
+    """«get_jobs_page (database.py:750)»; вне проекта — два последних компонента пути"""
+    filename = code.co_filename
+    if filename.startswith(PROJECT_DIR):
+        filename = os.path.relpath(filename, PROJECT_DIR)
+    else:
+        filename = '/'.join(filename.replace('\\', '/').rsplit('/', 2)[-2:])
+    # «;» разделяет кадры в свёрнутом формате
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ',')
+
+
+class SamplingProfiler:
+    """Сэмплирующий профайлер: раз в interval секунд — стеки всех потоков.
+
+    Запускается в отдельном потоке (asyncio.to_thread), поэтому видит
+    и event loop, и пул парсинга, и потоки aiosqlite. Стеки
+    агрегируются по функциям; корень стека — имя потока.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._labels: Dict[object, str] = {}
+
+    def _stack(self, frame) -> tuple:
+        labels = self._labels
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = _frame_label(code)
+            stack.append(label)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def sample(self, seconds: float) -> Counter:
+        """Снимать стеки seconds секунд; возвращает {(поток, кадры...): число}"""
+        counts = Counter()
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    counts[(names.get(ident, str(ident)),) + self._stack(frame)] += 1
+            time.sleep(self.interval)
+        return counts
+
+    @staticmethod
+    def collapse(counts: Counter) -> str:
+        """Свёрнутый формат: «поток;кадр;кадр число» по строке на стек"""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in counts.most_common())
+
+
+class RequestProfile:
+    """cProfile вокруг обработки одного запроса.
+
+    Профайлер ставится на поток event loop, поэтому в отчёт попадают и
+    конкурентные запросы, выполнявшиеся в то же время: для чистого
+    профиля запрос лучше повторить на ненагруженном процессе.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        self.elapsed = time.perf_counter() - self.started
+
+    def report(self, sort: str = 'cumulative', limit: int = 60) -> str:
+        """Текстовый отчёт pstats: limit самых дорогих функций"""
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=stream)
+        stats.strip_dirs().sort_stats(sort if sort in SORT_KEYS else 'cumulative').print_stats(limit)
+        return stream.getvalue()
+
+    def dump(self) -> bytes:
+        """Статистика в формате файла pstats (для snakeviz, pstats.Stats(path))"""
+        self.profiler.create_stats()
+        return marshal.dumps(self.profiler.stats)
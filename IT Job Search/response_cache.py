@@ -0,0 +1,193 @@
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from models import JobFilter
+from confiq import settings
+
+
+def _ascii_lower(value: str) -> str:
+    """Как COLLATE NOCASE в SQLite: регистр складывается только у ASCII"""
+    return ''.join(c.lower() if c.isascii() else c for c in value)
+
+
+def filter_key(filters: JobFilter, **extra) -> str:
+    """Ключ кэша для фильтра.
+    
+    Нормализуются только поля, которые база и так сравнивает без учёта
+    регистра: поиск (FTS5 разбивает запрос на слова и складывает регистр)
+    и теги (tags.name COLLATE NOCASE). location и position сравниваются
+    в SQL как есть и попадают в ключ без изменений.
+    """
+    values = filters.model_dump()
+    if values.get("search"):
+        values["search"] = " ".join(values["search"].lower().split())
+    if values.get("tags"):
+        values["tags"] = sorted({_ascii_lower(t.strip()) for t in values["tags"] if t.strip()}) or None
+    values = {name: value for name, value in {**values, **extra}.items() if value not in (None, "")}
+    return json.dumps(values, sort_keys=True, ensure_ascii=False)
+
+
+class CachedResponse:
+    """Готовое тело ответа JSON с ETag и дополнительными заголовками"""
+
+    def __init__(self, body: bytes, headers: Dict[str, str] = None):
+        self.body = body
+        self.headers = headers or {}
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class CacheBackend(ABC):
+    """Хранилище записей кэша.
+
+    Интерфейс асинхронный, чтобы вместо памяти процесса можно было
+    подключить внешнее хранилище (например, Redis: get/set с EX).
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: CachedResponse, ttl: float):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+    def size(self) -> int:
+        return 0
+
+
+class MemoryBackend(CacheBackend):
+    """TTL + LRU в памяти процесса"""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: CachedResponse, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self):
+        self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """Кэш ответов GET-эндпоинтов с инвалидацией по поколениям.
+
+    Записи группируются по пространствам имён (jobs, stats...). Номер
+    поколения пространства входит в ключ, поэтому invalidate() только
+    увеличивает счётчик: старые записи становятся недостижимыми и
+    вытесняются по LRU/TTL. Клиент с совпадающим If-None-Match получает
+    304 без тела.
+    """
+
+    def __init__(self, backend: CacheBackend = None, ttl: float = None, enabled: bool = None):
+        self.backend = backend or MemoryBackend()
+        self.ttl = settings.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.enabled = settings.RESPONSE_CACHE_ENABLED if enabled is None else enabled
+        self._generations: Dict[str, int] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def invalidate(self, *namespaces: str):
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        self.invalidations += 1
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{namespace}:{self._generations.get(namespace, 0)}:{key}"
+
+    async def respond(
+        self,
+        request: Request,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Awaitable[Tuple[object, Dict[str, str]]]],
+    ) -> Response:
+        """Ответ из кэша или вычисленный compute() и сохранённый.
+
+        compute возвращает (данные, заголовки); данные сериализуются в
+        JSON так же, как это сделал бы FastAPI.
+        """
+        if not self.enabled:
+            payload, headers = await compute()
+            return self._response(request, self._encode(payload, headers))
+
+        # Поколение фиксируется до запроса к БД: если запись случится во
+        # время compute(), результат ляжет под уже устаревший ключ
+        cache_key = self._key(namespace, key)
+        cached = await self.backend.get(cache_key)
+        if cached is not None:
+            self.hits[namespace] = self.hits.get(namespace, 0) + 1
+        else:
+            self.misses[namespace] = self.misses.get(namespace, 0) + 1
+            payload, headers = await compute()
+            cached = self._encode(payload, headers)
+            await self.backend.set(cache_key, cached, self.ttl)
+        return self._response(request, cached)
+
+    @staticmethod
+    def _encode(payload, headers: Dict[str, str]) -> CachedResponse:
+        body = json.dumps(
+            jsonable_encoder(payload), ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+        return CachedResponse(body, headers)
+
+    def _response(self, request: Request, cached: CachedResponse) -> Response:
+        headers = {**cached.headers, "ETag": cached.etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if cached.etag in (tag.strip() for tag in if_none_match.split(',')):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    def metrics(self) -> dict:
+        namespaces = sorted(set(self.hits) | set(self.misses))
+        return {
+            "enabled": self.enabled,
+            "entries": self.backend.size(),
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "generations": dict(self._generations),
+            "namespaces": {
+                namespace: {
+                    "hits": self.hits.get(namespace, 0),
+                    "misses": self.misses.get(namespace, 0),
+                    "hit_ratio": round(
+                        self.hits.get(namespace, 0)
+                        / max(1, self.hits.get(namespace, 0) + self.misses.get(namespace, 0)), 3
+                    ),
+                }
+                for namespace in namespaces
+            },
+        }
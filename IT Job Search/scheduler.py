@@ -0,0 +1,181 @@
+import asyncio
+import functools
+import time
+from typing import Optional
+
+from crawler import ChannelCrawler, ChannelResult
+from database import Database
+from telegram_parser import TelegramParser
+from confiq import settings
+from logs import get_logger
+
+log = get_logger(__name__)
+
+
+class IngestScheduler:
+    """Периодическая загрузка каналов Telegram, не больше одного цикла за раз.
+
+    Цикл запускается при старте, затем через interval секунд
+    (PARSE_INTERVAL_MINUTES) после окончания предыдущего или по trigger().
+    trigger() во время цикла ставит в очередь ровно один дополнительный
+    цикл; повторные вызовы сливаются с ним. Каждый цикл и итог по каждому
+    каналу записываются в ingest_runs / ingest_run_channels.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        crawler: ChannelCrawler,
+        parser: TelegramParser,
+        interval: float = None,
+    ):
+        self.db = db
+        self.crawler = crawler
+        self.parser = parser
+        self.interval = interval or settings.PARSE_INTERVAL_MINUTES * 60
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        # Источник запуска следующего цикла, если он уже запрошен
+        self._pending: Optional[str] = None
+        self.cycles = 0
+        self.failed = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Загрузка возможна только с настроенными credentials Telegram"""
+        return bool(self.parser.api_id and self.parser.api_hash and self.parser.phone)
+
+    def start(self):
+        """Запустить планировщик в текущем event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    def trigger(self) -> str:
+        """Запросить внеочередной цикл.
+
+        'started' — цикл начнётся сразу, 'queued' — после текущего,
+        'coalesced' — дополнительный цикл уже запрошен.
+        """
+        if self._pending:
+            self.coalesced += 1
+            return 'coalesced'
+        self._pending = 'manual'
+        self._wakeup.set()
+        return 'queued' if self._running else 'started'
+
+    async def run(self):
+        # Циклы со статусом running остались от прошлого процесса
+        try:
+            interrupted = await self.db.interrupt_ingest_runs()
+            if interrupted:
+                log.warning("Прерванные циклы загрузки", runs=interrupted)
+        except Exception as e:
+            log.error("Не удалось закрыть прерванные циклы загрузки", error=e)
+
+        trigger = 'schedule'
+        while True:
+            # Ошибка одного цикла не должна молча останавливать планировщик
+            try:
+                await self.run_cycle(trigger)
+            except Exception as e:
+                log.error("Ошибка цикла загрузки", trigger=trigger, error=e)
+            if self._pending:
+                trigger = self._pending
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            trigger = self._pending or 'schedule'
+
+    async def run_cycle(self, trigger: str = 'manual') -> str:
+        """Один обход всех каналов; возвращает статус цикла.
+
+        'already_running' — другой цикл ещё идёт, новый не начинается.
+        """
+        if self._running:
+            return 'already_running'
+        self._pending = None
+        self._running = True
+        started = time.monotonic()
+        status, error = 'failed', None
+        run_id = None
+        try:
+            run_id = await self.db.start_ingest_run(trigger)
+            log.info("Начинаю парсинг Telegram каналов", run_id=run_id, trigger=trigger)
+            results = await self.crawler.crawl(on_result=functools.partial(self._store, run_id))
+            failed = [r.channel for r in results if not r.ok]
+            if not failed:
+                status = 'ok'
+            elif len(failed) < len(results):
+                status, error = 'partial', f"Ошибки в каналах: {', '.join(failed)}"
+            else:
+                error = "Ошибки во всех каналах"
+        except asyncio.CancelledError:
+            status = 'cancelled'
+            raise
+        except Exception as e:
+            error = str(e)
+            log.error("Ошибка парсинга", run_id=run_id, error=e)
+        finally:
+            self._running = False
+            self.cycles += 1
+            if status in ('failed', 'partial'):
+                self.failed += 1
+            if run_id is not None:
+                try:
+                    await self.db.finish_ingest_run(run_id, status, time.monotonic() - started, error)
+                except Exception as e:
+                    log.error("Не удалось записать итог цикла", run_id=run_id, status=status, error=e)
+        return status
+
+    async def _store(self, run_id: int, result: ChannelResult):
+        """Сохранить вакансии канала, как только он обработан"""
+        stored = None
+        if result.ok:
+            stored = await self.db.save_channel_jobs(
+                result.channel, result.jobs, result.last_message_id
+            )
+            if stored is None:
+                result.error = "Не удалось сохранить вакансии"
+            else:
+                log.info(
+                    "Канал обработан", run_id=run_id, channel=result.channel,
+                    inserted=stored['inserted'], duplicates=stored['duplicates'],
+                    near_duplicates=stored['near_duplicates'],
+                )
+        await self.db.save_ingest_channel(run_id, {
+            'channel': result.channel,
+            'duration': round(result.duration, 3),
+            'messages_fetched': result.messages_fetched,
+            'jobs_parsed': len(result.jobs),
+            'jobs_inserted': stored['inserted'] if stored else 0,
+            'duplicates': stored['duplicates'] + stored['near_duplicates'] if stored else 0,
+            'flood_waits': result.flood_waits,
+            'error': result.error,
+        })
+
+    def metrics(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self._running,
+            "pending": self._pending,
+            "interval_sec": self.interval,
+            "cycles": self.cycles,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+        }
+
+    async def close(self):
+        """Отменить текущий цикл и отключиться от Telegram"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.parser.close()
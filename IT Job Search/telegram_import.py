@@ -0,0 +1,333 @@
+"""Офлайн-импорт истории каналов из экспорта Telegram Desktop.
+
+Telegram Desktop («Экспорт истории чата», формат JSON) сохраняет канал в
+result.json: заголовок с названием и массив messages. Файл читается
+потоково — объекты сообщений по одному вырезаются из буфера, поэтому
+память не зависит от размера экспорта. Текст проходит ту же экстракцию,
+что и сообщения Telethon (ParsingPool), а вакансии пишутся пачками через
+Database.save_import_batch в одной транзакции с контрольной точкой.
+Повторный запуск продолжает с сохранённого смещения в файле.
+
+Сеть и учётные данные Telethon не нужны:
+    python telegram_import.py result.json --channel datasciencejobs
+    python telegram_import.py result.json --channel datasciencejobs --restart
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+
+from confiq import settings
+from parse_pool import ParseItem
+from logs import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+# Развёрнутый цикл: без альтернативы на каждый символ строки
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+# Строки целиком (внутри них скобки не считаются) и фигурные скобки
+_TOKEN_RE = re.compile(_STRING + rb'|[{}]')
+_SEPARATOR_RE = re.compile(rb'[\s,]*')
+_MESSAGES_RE = re.compile(rb'"messages"\s*:\s*\[')
+_HEADER_FIELD_RE = re.compile(rb'"(name|type|id)"\s*:\s*(' + _STRING + rb'|-?\d+)')
+
+CHUNK_SIZE = 1024 * 1024
+# Заголовок экспорта канала — несколько полей перед messages
+MAX_HEADER_SIZE = 64 * 1024
+# Поля контрольной точки, которые переносятся в продолжение импорта
+RESUME_FIELDS = ('byte_offset', 'last_message_id', 'messages_read', 'jobs_inserted', 'duplicates')
+
+
+class ExportFormatError(ValueError):
+    """Файл не похож на JSON-экспорт канала из Telegram Desktop"""
+
+
+def message_text(message: dict) -> str:
+    """Текст сообщения: в экспорте это строка или список строк и сущностей"""
+    text = message.get('text') or ''
+    if isinstance(text, list):
+        return ''.join(part if isinstance(part, str) else part.get('text', '') for part in text)
+    return text
+
+
+def message_date(message: dict) -> datetime:
+    """Дата сообщения в UTC, как у Telethon"""
+    unixtime = message.get('date_unixtime')
+    if unixtime:
+        return datetime.fromtimestamp(int(unixtime), tz=timezone.utc)
+    # Старые экспорты: локальное время без зоны
+    return datetime.fromisoformat(message['date'])
+
+
+class TelegramExportReader:
+    """Потоковое чтение сообщений из result.json.
+
+    Итерация выдаёт пары (сообщение, смещение в байтах сразу после него).
+    С этого смещения можно начать новый читатель — так работает
+    продолжение импорта. В памяти держится только текущий кусок файла.
+    """
+
+    def __init__(self, path: str, offset: int = 0, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.offset = offset
+        self.chunk_size = chunk_size
+        self.header: dict = {}
+
+    def read_header(self) -> int:
+        """Разобрать заголовок; вернуть смещение начала массива messages"""
+        with open(self.path, 'rb') as f:
+            prefix = f.read(MAX_HEADER_SIZE)
+        if b'"chats"' in prefix:
+            raise ExportFormatError(
+                "экспорт всего аккаунта не поддерживается, экспортируйте канал отдельно"
+            )
+        match = _MESSAGES_RE.search(prefix)
+        if not match:
+            raise ExportFormatError("не найден массив messages")
+        self.header = {
+            key.decode(): json.loads(value)
+            for key, value in _HEADER_FIELD_RE.findall(prefix[:match.start()])
+        }
+        return match.end()
+
+    @staticmethod
+    def _object_end(buf: bytes, start: int) -> Optional[int]:
+        """Конец объекта, начинающегося в buf[start], или None, если он не дочитан"""
+        depth = 0
+        for match in _TOKEN_RE.finditer(buf, start):
+            token = match.group()
+            if token == b'{':
+                depth += 1
+            elif token == b'}':
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        return None
+
+    def __iter__(self) -> Iterator[Tuple[dict, int]]:
+        offset = self.offset or self.read_header()
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            buf, pos, eof = b'', 0, False
+
+            while True:
+                pos = _SEPARATOR_RE.match(buf, pos).end()
+                message = None
+                if pos < len(buf):
+                    if buf[pos] == ord(']'):
+                        return
+                    if buf[pos] != ord('{'):
+                        raise ExportFormatError(f"неожиданный символ на смещении {offset + pos}")
+                    end = self._object_end(buf, pos)
+                    if end is not None:
+                        try:
+                            message = json.loads(buf[pos:end])
+                        except ValueError:
+                            # Скобка внутри недочитанной строки — нужен следующий кусок
+                            if eof:
+                                raise ExportFormatError(f"битое сообщение на смещении {offset + pos}")
+
+                if message is None:
+                    if eof:
+                        raise ExportFormatError("файл обрывается внутри массива messages")
+                    chunk = f.read(self.chunk_size)
+                    eof = not chunk
+                    buf, offset, pos = buf[pos:] + chunk, offset + pos, 0
+                    continue
+
+                pos = end
+                yield message, offset + pos
+
+
+@dataclass
+class ImportBatch:
+    """Пачка сообщений экспорта для одной транзакции"""
+    items: List[ParseItem] = field(default_factory=list)
+    messages: int = 0
+    last_message_id: int = 0
+    offset: int = 0
+
+
+def read_batches(
+    reader: TelegramExportReader,
+    channel: str,
+    batch_size: int,
+    after_id: int = 0,
+    since: Optional[datetime] = None,
+) -> Iterator[ImportBatch]:
+    """Сообщения экспорта пачками по batch_size.
+
+    Служебные сообщения, пустые тексты, сообщения не новее after_id и
+    старше since считаются прочитанными, но в парсинг не попадают.
+    """
+    batch = ImportBatch()
+    for message, offset in reader:
+        batch.messages += 1
+        batch.offset = offset
+        message_id = message.get('id') or 0
+        batch.last_message_id = max(batch.last_message_id, message_id)
+
+        if message.get('type') == 'message' and message_id > after_id:
+            text = message_text(message)
+            date = message_date(message)
+            if text and (since is None or date.replace(tzinfo=None) >= since):
+                batch.items.append((text, channel, date))
+
+        if batch.messages >= batch_size:
+            yield batch
+            batch = ImportBatch()
+    if batch.messages:
+        yield batch
+
+
+class TelegramImporter:
+    """Загрузка экспорта канала в jobs с контрольными точками.
+
+    Чтение следующей пачки из файла идёт в потоке параллельно с
+    парсингом и записью текущей, в памяти одновременно не больше двух
+    пачек.
+    """
+
+    def __init__(self, db, parse_pool, batch_size: int = None, progress_interval: float = 5.0):
+        self.db = db
+        self.parse_pool = parse_pool
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.progress_interval = progress_interval
+
+    async def import_file(
+        self,
+        path: str,
+        channel: str,
+        restart: bool = False,
+        since: Optional[datetime] = None,
+        max_messages: Optional[int] = None,
+    ) -> dict:
+        """Импортировать файл, продолжив с контрольной точки.
+
+        max_messages ограничивает объём одного запуска (с точностью до
+        пачки); оставшееся догрузит следующий запуск.
+        """
+        source_file = os.path.abspath(path)
+        stat = os.stat(source_file)
+        checkpoint = {
+            "source_file": source_file, "channel": channel,
+            "file_size": stat.st_size, "file_mtime": stat.st_mtime,
+            "byte_offset": 0, "last_message_id": 0, "messages_read": 0,
+            "jobs_inserted": 0, "duplicates": 0, "finished": 0,
+        }
+
+        saved = None if restart else await self.db.get_import_checkpoint(source_file)
+        after_id = 0
+        if saved and (saved["file_size"], saved["file_mtime"]) == (stat.st_size, stat.st_mtime):
+            if saved["finished"]:
+                log.info("Файл уже импортирован", file=path, jobs_inserted=saved['jobs_inserted'])
+                return saved
+            checkpoint.update({k: saved[k] for k in RESUME_FIELDS})
+            log.info("Продолжение импорта", file=path, last_message_id=saved['last_message_id'])
+        elif saved:
+            # Файл выгружен заново: смещение недействительно, но уже
+            # загруженные сообщения можно пропустить по id
+            after_id = saved["last_message_id"]
+            log.warning("Файл изменился, уже загруженные сообщения будут пропущены", file=path, after_id=after_id)
+
+        reader = TelegramExportReader(path, checkpoint["byte_offset"])
+        batches = read_batches(reader, channel, self.batch_size, after_id, since)
+        started = time.monotonic()
+        last_report = started
+        read_this_run = 0
+
+        next_batch = asyncio.ensure_future(asyncio.to_thread(next, batches, None))
+        try:
+            while True:
+                batch = await next_batch
+                if batch is None:
+                    checkpoint["finished"] = 1
+                    await self.db.save_import_batch([], checkpoint)
+                    break
+                read_this_run += batch.messages
+                stop = max_messages is not None and read_this_run >= max_messages
+                if not stop:
+                    next_batch = asyncio.ensure_future(asyncio.to_thread(next, batches, None))
+
+                jobs = await self.parse_pool.parse(batch.items)
+                checkpoint["byte_offset"] = batch.offset
+                checkpoint["last_message_id"] = max(checkpoint["last_message_id"], batch.last_message_id)
+                checkpoint["messages_read"] += batch.messages
+                await self.db.save_import_batch(jobs, checkpoint)
+
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    self._report(path, checkpoint, read_this_run, now - started)
+                if stop:
+                    break
+        finally:
+            # Поток чтения мог ещё держать генератор — дождаться его перед закрытием
+            if not next_batch.done():
+                await asyncio.gather(next_batch, return_exceptions=True)
+            batches.close()
+
+        elapsed = time.monotonic() - started
+        self._report(path, checkpoint, read_this_run, elapsed)
+        if not checkpoint["finished"]:
+            log.info("Импорт остановлен, повторный запуск продолжит с этого места",
+                     file=path, last_message_id=checkpoint['last_message_id'])
+        return checkpoint
+
+    @staticmethod
+    def _report(path: str, checkpoint: dict, read_this_run: int, elapsed: float):
+        percent = 100 * checkpoint["byte_offset"] / max(checkpoint["file_size"], 1)
+        if checkpoint["finished"]:
+            percent = 100
+        rate = read_this_run / elapsed if elapsed else 0
+        log.info(
+            "Прогресс импорта", file=os.path.basename(path), percent=round(percent, 1),
+            messages=checkpoint['messages_read'], jobs_inserted=checkpoint['jobs_inserted'],
+            duplicates=checkpoint['duplicates'], messages_per_sec=round(rate),
+        )
+
+
+async def _main(args):
+    from database import Database
+    from extraction import JOB_KEYWORDS, PRIORITY_LOCATIONS
+    from parse_pool import ParsingPool
+
+    db = Database(args.db)
+    await db.init_db()
+    pool = ParsingPool(JOB_KEYWORDS, PRIORITY_LOCATIONS, workers=args.workers)
+    importer = TelegramImporter(db, pool, batch_size=args.batch_size)
+    since = datetime.strptime(args.since, '%Y-%m-%d') if args.since else None
+    try:
+        for path in args.files:
+            await importer.import_file(
+                path, args.channel, restart=args.restart,
+                since=since, max_messages=args.max_messages,
+            )
+    except ExportFormatError as e:
+        log.error("Неверный формат экспорта", error=e)
+        return 1
+    finally:
+        pool.close()
+        await db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Импорт экспорта Telegram Desktop (JSON)")
+    parser.add_argument('files', nargs='+', help='result.json одного канала')
+    parser.add_argument('--channel', required=True, help='username канала без @ (для поля source)')
+    parser.add_argument('--db', default='jobs.db', help='Путь к базе данных')
+    parser.add_argument('--batch-size', type=int, help='Сообщений на транзакцию')
+    parser.add_argument('--workers', type=int, help='Процессов парсинга (0 — без пула)')
+    parser.add_argument('--since', help='Пропустить сообщения старше даты YYYY-MM-DD')
+    parser.add_argument('--max-messages', type=int, help='Остановиться после N сообщений')
+    parser.add_argument('--restart', action='store_true', help='Игнорировать контрольную точку')
+    args = parser.parse_args()
+    setup_logging()
+    sys.exit(asyncio.run(_main(args)))
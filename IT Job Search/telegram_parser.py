@@ -1,253 +1,245 @@
-from telethon import TelegramClient
+from telethon import TelegramClient, utils
+from telethon.errors import ChannelInvalidError, PeerIdInvalidError
 from telethon.tl.functions.messages import GetHistoryRequest
 from typing import List
-import re
+import asyncio
 import os
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from models import Job
+from extraction import JobExtractor, JOB_KEYWORDS, PRIORITY_LOCATIONS
+from peer_cache import PeerCache
+from parse_pool import ParsingPool
+from confiq import settings
+from logs import get_logger
+from metrics import PARSER_MESSAGES, PARSER_STAGE_SECONDS
+
+log = get_logger(__name__)
+
+_FETCH = PARSER_STAGE_SECONDS.labels('fetch')
+_FILTER = PARSER_STAGE_SECONDS.labels('filter')
+_EXTRACT = PARSER_STAGE_SECONDS.labels('extract')
+_FETCHED = PARSER_MESSAGES.labels('fetched')
+_MATCHED = PARSER_MESSAGES.labels('matched')
+_JOBS = PARSER_MESSAGES.labels('jobs')
 
 class TelegramParser:
-    def __init__(self):
+    # Максимум сообщений, который Telegram отдаёт за один GetHistoryRequest
+    PAGE_SIZE = 100
+    
+    def __init__(self, peer_cache: PeerCache = None, parse_pool: ParsingPool = None):
         # Получаем credentials из переменных окружения
         self.api_id = os.getenv('TELEGRAM_API_ID')
         self.api_hash = os.getenv('TELEGRAM_API_HASH')
         self.phone = os.getenv('TELEGRAM_PHONE')
         
         self.client = None
-        self.keywords = [
-            'ml engineer', 'machine learning', 'data scientist',
-            'ai developer', 'artificial intelligence', 'deep learning'
-        ]
-        self.priority_locations = ['dubai', 'canada', 'ireland', 'serbia']
+        self._connect_lock = asyncio.Lock()
+        self.peer_cache = peer_cache or PeerCache()
+        self.keywords = list(JOB_KEYWORDS)
+        self.priority_locations = list(PRIORITY_LOCATIONS)
+        self.extractor = JobExtractor(self.keywords, self.priority_locations)
+        self.parse_pool = parse_pool
     
     async def connect(self):
         """Подключение к Telegram"""
-        if not self.client:
-            self.client = TelegramClient('session', self.api_id, self.api_hash)
-            await self.client.start(phone=self.phone)
-            print("✅ Подключено к Telegram")
+        # Каналы обходятся параллельно — клиент должен создаваться один раз
+        async with self._connect_lock:
+            if not self.client:
+                client = TelegramClient('session', self.api_id, self.api_hash)
+                await client.start(phone=self.phone)
+                self.client = client
+                log.info("Подключено к Telegram")
     
-    async def parse_channel(self, channel_username: str) -> List[Job]:
-        """Парсинг канала Telegram"""
+    async def fetch_messages(self, channel_username: str, min_id: int = 0) -> list:
+        """Загрузить сообщения канала новее min_id.
+        
+        Без min_id (первый обход) берутся последние MESSAGES_LIMIT сообщений,
+        листание прекращается на сообщениях старше DAYS_BACK дней. Иначе
+        пропуск листается от min_id к новым, не больше MAX_BACKFILL_MESSAGES
+        за цикл. Ошибки Telegram (включая FloodWaitError) пробрасываются
+        вызывающему.
+        """
         await self.connect()
         
-        jobs = []
+        started = time.perf_counter()
         try:
-            # Получаем сущность канала
+            messages = await self._fetch_history(channel_username, min_id)
+        except (ChannelInvalidError, PeerIdInvalidError):
+            # access_hash устарел — разрешаем канал заново и повторяем
+            log.info("Обновляю кэш сущности канала", channel=channel_username)
+            await self.peer_cache.invalidate(channel_username)
+            messages = await self._fetch_history(channel_username, min_id)
+        _FETCH.observe(time.perf_counter() - started)
+        _FETCHED.inc(len(messages))
+        return messages
+    
+    async def resolve_peer(self, channel_username: str):
+        """InputPeer канала: из кэша или через get_entity"""
+        peer = await self.peer_cache.get(channel_username)
+        if peer is None:
             entity = await self.client.get_entity(channel_username)
-            
-            # Получаем последние 100 сообщений за последние 7 дней
-            offset_date = datetime.now() - timedelta(days=7)
-            
-            messages = await self.client(GetHistoryRequest(
+            peer = utils.get_input_peer(entity)
+            await self.peer_cache.put(channel_username, peer)
+        return peer
+    
+    async def _fetch_history(self, channel_username: str, min_id: int) -> list:
+        """Постраничная загрузка истории канала"""
+        entity = await self.resolve_peer(channel_username)
+        if min_id:
+            return await self._fetch_since(entity, channel_username, min_id)
+        
+        max_messages = settings.MESSAGES_LIMIT
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.DAYS_BACK)
+        
+        messages = []
+        offset_id = 0
+        while len(messages) < max_messages:
+            limit = min(self.PAGE_SIZE, max_messages - len(messages))
+            history = await self.client(GetHistoryRequest(
                 peer=entity,
-                offset_id=0,
-                offset_date=offset_date,
+                offset_id=offset_id,
+                offset_date=None,
                 add_offset=0,
-                limit=100,
+                limit=limit,
                 max_id=0,
                 min_id=0,
                 hash=0
             ))
+            page = history.messages
+            messages.extend(page)
+            
+            # Короткая страница — дошли до начала канала
+            if len(page) < limit:
+                break
+            oldest = page[-1]
+            if oldest.date and oldest.date < cutoff:
+                break
+            offset_id = oldest.id
+        
+        return messages
+    
+    async def _fetch_since(self, entity, channel_username: str, min_id: int) -> list:
+        """Сообщения после min_id — от старых к новым, не больше MAX_BACKFILL_MESSAGES.
+        
+        Пропуск загружается с начала, поэтому максимальный id результата
+        всегда непрерывен от min_id: если лимит исчерпан, следующий цикл
+        продолжит с того места, где остановился этот.
+        """
+        max_messages = settings.MAX_BACKFILL_MESSAGES
+        messages = []
+        # offset_id с add_offset=-limit отдаёт limit сообщений с id >= offset_id
+        offset_id = min_id + 1
+        while len(messages) < max_messages:
+            limit = min(self.PAGE_SIZE, max_messages - len(messages))
+            history = await self.client(GetHistoryRequest(
+                peer=entity,
+                offset_id=offset_id,
+                offset_date=None,
+                add_offset=-limit,
+                limit=limit,
+                max_id=0,
+                min_id=min_id,
+                hash=0
+            ))
+            page = [m for m in history.messages if m.id >= offset_id]
+            messages.extend(page)
             
-            for message in messages.messages:
-                if not message.message:
-                    continue
-                
-                text = message.message.lower()
-                
-                # Проверяем, содержит ли сообщение ключевые слова
-                if any(keyword in text for keyword in self.keywords):
-                    job = self._parse_job_from_text(
-                        message.message, 
-                        channel_username,
-                        message.date
-                    )
-                    if job:
-                        jobs.append(job)
+            # Короткая страница — дошли до последнего сообщения
+            if len(page) < limit:
+                break
+            offset_id = max(m.id for m in page) + 1
+        else:
+            log.warning("Пропуск больше лимита сообщений, остаток загрузится в следующем цикле",
+                        channel=channel_username, limit=max_messages)
+        
+        messages.sort(key=lambda m: m.id, reverse=True)
+        return messages
+    
+    def parse_messages(self, messages: list, channel_username: str) -> List[Job]:
+        """Отобрать сообщения с вакансиями и распарсить их"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.DAYS_BACK)
+        jobs = []
+        # filter — отбор по дате и ключевым словам, extract — разбор вакансии
+        filter_time = extract_time = 0.0
+        matched = 0
+        perf_counter = time.perf_counter
+        for message in messages:
+            started = perf_counter()
+            if not message.message:
+                continue
+            if message.date and message.date < cutoff:
+                continue
             
-            print(f"📊 Канал {channel_username}: найдено {len(jobs)} вакансий")
+            # Один проход по тексту: ключевые слова, теги и локации
+            scan = self.extractor.scan(message.message)
+            scanned = perf_counter()
+            filter_time += scanned - started
+            
+            # Проверяем, содержит ли сообщение ключевые слова
+            if scan["keywords"]:
+                matched += 1
+                job = self._parse_job_from_text(
+                    message.message, 
+                    channel_username,
+                    message.date,
+                    scan
+                )
+                if job:
+                    jobs.append(job)
+                extract_time += perf_counter() - scanned
+        _FILTER.observe(filter_time)
+        _EXTRACT.observe(extract_time)
+        _MATCHED.inc(matched)
+        _JOBS.inc(len(jobs))
+        return jobs
+    
+    async def parse_messages_async(self, messages: list, channel_username: str) -> List[Job]:
+        """То же, что parse_messages, но в пуле процессов, если он задан"""
+        if not self.parse_pool:
+            return self.parse_messages(messages, channel_username)
+        
+        # В пуле отбор по ключевым словам идёт в воркерах вместе с разбором,
+        # поэтому filter — только отбор по дате, а extract — весь пул
+        started = time.perf_counter()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.DAYS_BACK)
+        items = [
+            (message.message, channel_username, message.date)
+            for message in messages
+            if message.message and not (message.date and message.date < cutoff)
+        ]
+        filtered = time.perf_counter()
+        _FILTER.observe(filtered - started)
+        jobs = await self.parse_pool.parse(items)
+        _EXTRACT.observe(time.perf_counter() - filtered)
+        _JOBS.inc(len(jobs))
+        return jobs
+    
+    async def parse_channel(self, channel_username: str) -> List[Job]:
+        """Парсинг канала Telegram"""
+        jobs = []
+        try:
+            messages = await self.fetch_messages(channel_username)
+            jobs = await self.parse_messages_async(messages, channel_username)
+            log.info("Канал распарсен", channel=channel_username, jobs=len(jobs))
             
         except Exception as e:
-            print(f"❌ Ошибка парсинга канала {channel_username}: {e}")
+            log.error("Ошибка парсинга канала", channel=channel_username, error=e)
         
         return jobs
     
-    def _parse_job_from_text(self, text: str, source: str, date: datetime) -> Job:
+    def _parse_job_from_text(self, text: str, source: str, date: datetime, scan: dict = None) -> Job:
         """Парсинг вакансии из текста сообщения"""
         try:
-            # Извлекаем заголовок (первая строка или жирный текст)
-            lines = text.split('\n')
-            title = self._extract_title(lines)
-            
-            # Извлекаем компанию
-            company = self._extract_company(text)
-            
-            # Извлекаем локацию
-            location = self._extract_location(text)
-            
-            # Извлекаем опыт работы
-            experience = self._extract_experience(text)
-            
-            # Извлекаем зарплату
-            salary = self._extract_salary(text)
-            
-            # Извлекаем описание (первые 200 символов без первых строк)
-            description = self._extract_description(lines)
-            
-            # Извлекаем теги/навыки
-            tags = self._extract_tags(text)
-            
-            # Извлекаем контакты
-            contact_email = self._extract_email(text)
-            contact_telegram = self._extract_telegram(text)
-            
-            if not title or not company:
-                return None
-            
-            return Job(
-                title=title,
-                company=company,
-                location=location or "Remote",
-                experience=experience or "2-3 years",
-                salary=salary or "Competitive",
-                description=description,
-                tags=tags,
-                source=f"t.me/{source}",
-                posted_date=date.strftime('%Y-%m-%d'),
-                contact_email=contact_email or f"jobs@{company.lower().replace(' ', '')}.com",
-                contact_telegram=contact_telegram or f"@{source}"
-            )
-            
+            return self.extractor.extract(text, source, date, scan)
         except Exception as e:
-            print(f"❌ Ошибка парсинга текста: {e}")
+            log.error("Ошибка парсинга текста", channel=source, error=e)
             return None
     
-    def _extract_title(self, lines: List[str]) -> str:
-        """Извлечь название должности"""
-        # Ищем строки с ключевыми словами позиций
-        position_keywords = ['engineer', 'developer', 'scientist', 'analyst']
-        
-        for line in lines[:5]:  # Проверяем первые 5 строк
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in position_keywords):
-                # Очищаем от эмодзи и лишних символов
-                clean_line = re.sub(r'[^\w\s-]', '', line).strip()
-                if len(clean_line) > 5:
-                    return clean_line[:100]
-        
-        return lines[0][:100] if lines else "Unknown Position"
-    
-    def _extract_company(self, text: str) -> str:
-        """Извлечь название компании"""
-        # Паттерны для поиска компании
-        patterns = [
-            r'[Cc]ompany[:\s]+([A-Z][A-Za-z0-9\s&]+)',
-            r'[Кк]омпания[:\s]+([А-ЯA-Z][А-Яа-яA-Za-z0-9\s&]+)',
-            r'@([A-Za-z0-9_]+)',  # Telegram username
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1).strip()[:100]
-        
-        return "Unknown Company"
-    
-    def _extract_location(self, text: str) -> str:
-        """Извлечь локацию"""
-        text_lower = text.lower()
-        
-        # Проверяем приоритетные локации
-        for location in self.priority_locations:
-            if location in text_lower:
-                return location.capitalize()
-        
-        # Паттерны для других локаций
-        location_patterns = [
-            r'[Ll]ocation[:\s]+([A-Za-z\s,]+)',
-            r'[Лл]окация[:\s]+([А-Яа-яA-Za-z\s,]+)',
-            r'🌍\s*([A-Za-z\s,]+)',
-        ]
-        
-        for pattern in location_patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1).strip()[:50]
-        
-        return None
-    
-    def _extract_experience(self, text: str) -> str:
-        """Извлечь требуемый опыт"""
-        patterns = [
-            r'(\d+[-–]\d+)\s*(?:years?|лет)',
-            r'(?:experience|опыт)[:\s]+(\d+[-–]\d+)',
-            r'(\d+\+)\s*(?:years?|лет)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1) + " years"
-        
-        return None
-    
-    def _extract_salary(self, text: str) -> str:
-        """Извлечь зарплату"""
-        patterns = [
-            r'([\$€£]\d+[kK]?[-–]\d+[kK]?)',
-            r'(\d+[kK]?[-–]\d+[kK]?\s*(?:USD|EUR|GBP|CAD))',
-            r'[Ss]alary[:\s]+([\$€£]\d+[kK]?[-–]\d+[kK]?)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1)
-        
-        return None
-    
-    def _extract_description(self, lines: List[str]) -> str:
-        """Извлечь описание"""
-        # Берём строки со 2-й по 5-ю, объединяем
-        description_lines = [line for line in lines[1:6] if len(line) > 20]
-        description = ' '.join(description_lines)
-        return description[:500] if description else "No description available"
-    
-    def _extract_tags(self, text: str) -> List[str]:
-        """Извлечь технологии/навыки"""
-        # Список популярных технологий
-        tech_keywords = [
-            'python', 'pytorch', 'tensorflow', 'keras', 'scikit-learn',
-            'r', 'sql', 'nosql', 'docker', 'kubernetes', 'aws', 'azure',
-            'gcp', 'spark', 'hadoop', 'nlp', 'computer vision', 'mlops',
-            'git', 'linux', 'tableau', 'power bi', 'airflow'
-        ]
-        
-        text_lower = text.lower()
-        found_tags = []
-        
-        for keyword in tech_keywords:
-            if keyword in text_lower:
-                found_tags.append(keyword.title())
-        
-        # Ограничиваем до 6 тегов
-        return found_tags[:6] if found_tags else ['Python', 'Machine Learning']
-    
-    def _extract_email(self, text: str) -> str:
-        """Извлечь email"""
-        pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        match = re.search(pattern, text)
-        return match.group(0) if match else None
-    
-    def _extract_telegram(self, text: str) -> str:
-        """Извлечь Telegram username"""
-        pattern = r'@([a-zA-Z0-9_]{5,32})'
-        matches = re.findall(pattern, text)
-        return f"@{matches[0]}" if matches else None
-    
     async def close(self):
         """Закрыть соединение"""
         if self.client:
-            await self.client.disconnect()
-            print("👋 Отключено от Telegram")
\ No newline at end of file
+            # Сбрасываем клиента: после повторного выбора ведущим connect() создаст новый
+            client, self.client = self.client, None
+            await client.disconnect()
+            log.info("Отключено от Telegram")
\ No newline at end of file
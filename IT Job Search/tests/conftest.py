@@ -0,0 +1,80 @@
+"""Общие фикстуры тестов.
+
+Тесты запускаются из каталога проекта: python -m pytest tests
+Асинхронный код выполняется через asyncio.run внутри теста — без
+плагинов pytest.
+"""
+import os
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+# До импорта confiq: .env разработчика не должен включать Telegram,
+# диагностику и журнал медленных запросов
+os.environ.update({
+    'TELEGRAM_API_ID': '',
+    'ADMIN_TOKEN': '',
+    'SLOW_QUERY_MS': '0',
+    'LOG_LEVEL': 'WARNING',
+})
+# confiq создаёт UPLOAD_DIR относительно текущего каталога
+os.chdir(tempfile.mkdtemp(prefix='jobsearch-tests-'))
+
+from models import Job  # noqa: E402
+
+
+@pytest.fixture
+def make_job():
+    """Фабрика вакансий с уникальным ключом (title, company, posted_date)"""
+    def make(i: int = 0, **fields) -> Job:
+        values = dict(
+            title='ML Engineer',
+            company=f"Acme {i}",
+            location='Dubai',
+            experience='2-3 years',
+            salary='$5k-7k',
+            description=f"Building recommendation models, vacancy number {i}",
+            tags=['Python', 'Docker'],
+            source='t.me/tests',
+            posted_date='2024-01-01',
+            contact_email='jobs@example.com',
+            contact_telegram='@tests',
+        )
+        values.update(fields)
+        return Job(**values)
+    return make
+
+
+@pytest.fixture
+def api(tmp_path):
+    """Асинхронный контекст: клиент httpx к main.app на пустой базе в tmp_path"""
+    import httpx
+    import main
+    from blob_store import BlobStore
+    from database import Database
+    from response_cache import ResponseCache
+
+    @asynccontextmanager
+    async def client():
+        original = main.db, main.response_cache, main.blob_store, main.outbox.db
+        main.db = Database(str(tmp_path / 'test.db'))
+        await main.db.init_db()
+        main.db.add_write_listener(main.invalidate_response_cache)
+        main.response_cache = ResponseCache(enabled=True)
+        main.blob_store = BlobStore(str(tmp_path / 'blobs'))
+        main.outbox.db = main.db
+        transport = httpx.ASGITransport(app=main.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as http:
+                yield http
+        finally:
+            await main.db.close()
+            main.db, main.response_cache, main.blob_store, main.outbox.db = original
+
+    return client
@@ -0,0 +1,106 @@
+"""Имитация клиента Telethon для тестов и бенчмарков без сети"""
+import asyncio
+import random
+from datetime import datetime, timezone
+
+from telethon.errors import ChannelInvalidError, FloodWaitError
+from telethon.tl.types import InputPeerChannel
+
+SAMPLE_POST = (
+    "🚀 Senior ML Engineer\n"
+    "Company: Acme AI\n"
+    "Location: Dubai, relocation provided\n"
+    "We are building large-scale recommendation systems for retail clients.\n"
+    "Experience: 3-5 years with Python, PyTorch, SQL and Docker\n"
+    "Salary: $6k-8k\n"
+    "Contact: @acme_hr or jobs@acme.ai"
+)
+
+
+class FakeMessage:
+    def __init__(self, message_id: int, text: str, date: datetime):
+        self.id = message_id
+        self.message = text
+        self.date = date
+
+
+class FakeHistory:
+    def __init__(self, messages):
+        self.messages = messages
+
+
+class FakeTelegramClient:
+    """Отвечает с задержкой latency и иногда выбрасывает FloodWaitError.
+
+    flood_waits — словарь {канал: секунды}: первый запрос к каналу
+    завершится FloodWaitError с этим временем ожидания.
+    """
+
+    def __init__(self, latency: float = 0.2, messages_per_channel: int = 100,
+                 flood_waits: dict = None, seed: int = 42):
+        self.latency = latency
+        self.messages_per_channel = messages_per_channel
+        self.flood_waits = dict(flood_waits or {})
+        self.rnd = random.Random(seed)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.messages_served = 0
+        self.entity_calls = 0
+        self.last_ids = {}
+        self._peers = {}
+        self._names = {}
+
+    def rotate_access_hash(self, channel: str):
+        """Сделать сохранённый access_hash канала недействительным"""
+        peer = self._peer(channel)
+        self._peers[channel] = InputPeerChannel(peer.channel_id, peer.access_hash + 1)
+
+    def _peer(self, channel: str) -> InputPeerChannel:
+        if channel not in self._peers:
+            channel_id = len(self._peers) + 1000
+            self._peers[channel] = InputPeerChannel(channel_id, self.rnd.getrandbits(62))
+            self._names[channel_id] = channel
+        return self._peers[channel]
+
+    def post(self, channel: str, count: int):
+        """Опубликовать в канале count новых сообщений"""
+        self.last_ids[channel] = self.last_ids.get(channel, self.messages_per_channel) + count
+
+    async def get_entity(self, username: str):
+        self.entity_calls += 1
+        await asyncio.sleep(self.latency / 4)
+        return self._peer(username)
+
+    async def __call__(self, request):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency * self.rnd.uniform(0.5, 1.5))
+            channel = self._names[request.peer.channel_id]
+            if request.peer.access_hash != self._peer(channel).access_hash:
+                raise ChannelInvalidError(request=None)
+            if self.flood_waits.get(channel):
+                seconds = self.flood_waits.pop(channel)
+                raise FloodWaitError(request=None, capture=seconds)
+            # Как в Telegram: от новых к старым, id < offset_id и id > min_id;
+            # с отрицательным add_offset — limit сообщений с id >= offset_id
+            top = self.last_ids.setdefault(channel, self.messages_per_channel)
+            if request.add_offset < 0:
+                upper = min(top, request.offset_id + request.limit - 1)
+            else:
+                upper = request.offset_id - 1 if request.offset_id else top
+            lower = max(request.min_id, upper - request.limit)
+            now = datetime.now(timezone.utc)
+            messages = [
+                FakeMessage(i, SAMPLE_POST.replace('Acme', f'Acme{i}'), now)
+                for i in range(upper, lower, -1)
+            ]
+            self.messages_served += len(messages)
+            return FakeHistory(messages)
+        finally:
+            self.in_flight -= 1
+
+    async def disconnect(self):
+        pass
@@ -0,0 +1,51 @@
+import asyncio
+
+from database import Database
+
+
+def test_batch_reports_exact_inserted_and_duplicate_counts(tmp_path, make_job):
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        try:
+            first = await db.add_jobs([make_job(0)])
+            # Повтор из базы, повтор внутри пачки и три новые вакансии
+            batch = await db.add_jobs([make_job(0), make_job(1), make_job(2), make_job(1), make_job(3)])
+            again = await db.add_jobs([make_job(i) for i in range(4)])
+            async with db.pool.reader() as conn:
+                async with conn.execute("SELECT COUNT(*) FROM jobs") as cursor:
+                    rows = (await cursor.fetchone())[0]
+            return first, batch, again, rows
+        finally:
+            await db.close()
+
+    first, batch, again, rows = asyncio.run(scenario())
+    assert first == {"inserted": 1, "duplicates": 0, "near_duplicates": 0}
+    assert batch == {"inserted": 3, "duplicates": 2, "near_duplicates": 0}
+    assert again == {"inserted": 0, "duplicates": 4, "near_duplicates": 0}
+    assert rows == 4
+
+
+def test_failed_batch_inserts_nothing(tmp_path, make_job, monkeypatch):
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+
+        async def broken_link_tags(conn, jobs):
+            raise RuntimeError('disk I/O error')
+
+        try:
+            # Строки уже вставлены executemany, но теги не записались:
+            # откатывается вся пачка
+            monkeypatch.setattr(db, '_link_tags', broken_link_tags)
+            result = await db.add_jobs([make_job(1), make_job(2)])
+            async with db.pool.reader() as conn:
+                async with conn.execute("SELECT COUNT(*) FROM jobs") as cursor:
+                    rows = (await cursor.fetchone())[0]
+            return result, rows
+        finally:
+            await db.close()
+
+    result, rows = asyncio.run(scenario())
+    assert result == {"inserted": 0, "duplicates": 0, "near_duplicates": 0}
+    assert rows == 0
@@ -0,0 +1,61 @@
+"""Набор бенчмарков: воспроизводимые данные, полнота замеров и сравнение результатов"""
+import asyncio
+import os
+import sys
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+if BENCH_DIR not in sys.path:
+    sys.path.insert(0, BENCH_DIR)
+
+from bench_db import read_cases, uncovered, write_cases  # noqa: E402
+from compare import compare  # noqa: E402
+from database import Database  # noqa: E402
+from generate import PostGenerator, build_db  # noqa: E402
+
+
+def test_generator_is_reproducible_for_a_seed():
+    assert list(PostGenerator(3).messages(40)) == list(PostGenerator(3).messages(40))
+    assert list(PostGenerator(3).messages(40)) != list(PostGenerator(4).messages(40))
+
+
+def test_build_db_has_exactly_the_requested_rows(tmp_path):
+    async def contents(path):
+        totals = await build_db(str(path), rows=120, seed=5, batch_size=50)
+        db = Database(str(path))
+        await db.init_db()
+        try:
+            async with db.pool.reader() as conn:
+                async with conn.execute(
+                    "SELECT title, company, posted_date, salary_min, experience_min FROM jobs ORDER BY id"
+                ) as cursor:
+                    jobs = [tuple(row) for row in await cursor.fetchall()]
+                async with conn.execute("SELECT COUNT(*) FROM applications") as cursor:
+                    applications = (await cursor.fetchone())[0]
+            return totals, jobs, applications
+        finally:
+            await db.close()
+
+    first = asyncio.run(contents(tmp_path / 'a.db'))
+    second = asyncio.run(contents(tmp_path / 'b.db'))
+    totals, jobs, applications = first
+    assert totals["rows"] == len(jobs) == 120
+    assert applications == 1
+    assert first == second
+
+
+def test_every_public_database_method_has_a_case(tmp_path):
+    db = Database(str(tmp_path / 'test.db'))
+    data = {"job_ids": [1], "applications": [], "cursor": None, "fresh": [], "rows": 0}
+    assert uncovered(read_cases(db, data) + write_cases(db, data)) == []
+
+
+def test_compare_flags_regressions_by_metric_direction():
+    base = {"results": {"api": {"p99_ms": 10.0, "rps": 1000}, "rows": 100, "parser": {"msgs_per_sec": 500}}}
+    new = {"results": {"api": {"p99_ms": 13.0, "rps": 1300}, "rows": 100, "parser": {"msgs_per_sec": 480}}}
+    verdicts = {path: mark for path, _, _, _, mark in compare(base, new, threshold=10)}
+    assert verdicts == {
+        "api.p99_ms": "regression",
+        "api.rps": "improvement",
+        "parser.msgs_per_sec": "",
+        "rows": "",
+    }
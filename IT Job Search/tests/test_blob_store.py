@@ -0,0 +1,102 @@
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime
+
+from blob_store import BlobStore
+from database import Database
+from models import Application
+from uploads import StoredUpload
+
+PDF = b'%PDF-1.4\n% test resume\n'
+
+
+def put(store: BlobStore, content: bytes = PDF) -> StoredUpload:
+    """Как put_upload, но без UploadFile: файл пишется во временный и фиксируется"""
+    os.makedirs(store._tmp_dir, exist_ok=True)
+    sha256 = hashlib.sha256(content).hexdigest()
+    part_path = os.path.join(store._tmp_dir, f"{sha256}.part")
+    with open(part_path, 'wb') as f:
+        f.write(content)
+    path = store.path_for(sha256)
+    store._commit(part_path, path)
+    return StoredUpload(path, len(content), sha256)
+
+
+def age(path: str, seconds: float = 7200):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def application(job_id: int, stored: StoredUpload) -> Application:
+    return Application(job_id=job_id, name='Test', email='test@example.com', message='Hi',
+                       resume_path=stored.path, applied_date=datetime.now())
+
+
+def run_with_db(tmp_path, scenario):
+    async def wrapper():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        try:
+            return await scenario(db, BlobStore(str(tmp_path / 'blobs')))
+        finally:
+            await db.close()
+    return asyncio.run(wrapper())
+
+
+def test_gc_removes_only_unreferenced_stale_blobs(tmp_path, make_job):
+    async def scenario(db, store):
+        job_id = await db.add_job(make_job())
+        kept = put(store, PDF + b'kept')
+        dropped = put(store, PDF + b'dropped')
+        await db.add_application(application(job_id, kept), resume=kept)
+        await db.add_application(application(job_id, dropped), resume=dropped)
+        async with db.pool.writer() as conn:
+            await conn.execute("DELETE FROM applications WHERE resume_sha256 = ?", (dropped.sha256,))
+        age(kept.path)
+        age(dropped.path)
+        result = await store.gc(db)
+        return result, kept, dropped
+
+    result, kept, dropped = run_with_db(tmp_path, scenario)
+    assert result['blobs_removed'] == 1
+    assert os.path.exists(kept.path)
+    assert not os.path.exists(dropped.path)
+
+
+def test_reupload_during_gc_keeps_blob(tmp_path, make_job):
+    async def scenario(db, store):
+        job_id = await db.add_job(make_job())
+        stored = put(store)
+        await db.add_application(application(job_id, stored), resume=stored)
+        async with db.pool.writer() as conn:
+            await conn.execute("DELETE FROM applications")
+        age(stored.path)
+
+        # Повторная загрузка между выбором кандидатов и транзакцией удаления
+        delete = db.delete_unreferenced_blobs
+
+        async def reupload_first(*args):
+            put(store)
+            return await delete(*args)
+
+        db.delete_unreferenced_blobs = reupload_first
+        result = await store.gc(db)
+        application_id = await db.add_application(application(job_id, stored), resume=stored)
+        return result, stored, application_id
+
+    result, stored, application_id = run_with_db(tmp_path, scenario)
+    assert result['blobs_removed'] == 0
+    assert os.path.exists(stored.path)
+    assert application_id is not None
+
+
+def test_application_is_not_linked_to_missing_blob(tmp_path, make_job):
+    async def scenario(db, store):
+        job_id = await db.add_job(make_job())
+        stored = put(store)
+        os.remove(stored.path)
+        return await db.add_application(application(job_id, stored), resume=stored)
+
+    assert run_with_db(tmp_path, scenario) is None
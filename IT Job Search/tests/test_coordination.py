@@ -0,0 +1,73 @@
+import asyncio
+
+from coordination import ChangeWatcher, LeaderElection
+from database import Database
+
+
+async def open_databases(path, count=2):
+    databases = [Database(path) for _ in range(count)]
+    for db in databases:
+        await db.init_db()
+    return databases
+
+
+async def noop():
+    pass
+
+
+async def wait_for(predicate, timeout=3.0):
+    for _ in range(int(timeout / 0.02)):
+        if predicate():
+            return True
+        await asyncio.sleep(0.02)
+    return predicate()
+
+
+def test_one_leader_and_takeover_after_expiry(tmp_path):
+    async def scenario():
+        databases = await open_databases(str(tmp_path / 'shared.db'))
+        elections = [LeaderElection(db, noop, noop, ttl=0.3) for db in databases]
+        try:
+            for election in elections:
+                election.start()
+            assert await wait_for(lambda: any(e.is_leader for e in elections))
+            await asyncio.sleep(0.3)
+            leaders = [e for e in elections if e.is_leader]
+            assert len(leaders) == 1
+
+            # Ведущий «умер»: аренда не продлевается и не освобождается
+            leader = leaders[0]
+            follower = next(e for e in elections if e is not leader)
+            leader._task.cancel()
+            leader._task = None
+            leader.is_leader = False
+            assert await wait_for(lambda: follower.is_leader)
+            return (await databases[0].get_lease('ingest'))['holder'] == follower.holder
+        finally:
+            for election in elections:
+                await election.close()
+            for db in databases:
+                await db.close()
+
+    assert asyncio.run(scenario())
+
+
+def test_write_in_one_process_reaches_the_other_watcher(tmp_path, make_job):
+    async def scenario():
+        writer_db, watcher_db = await open_databases(str(tmp_path / 'shared.db'))
+        changes = []
+        watcher = ChangeWatcher(watcher_db, changes.append)
+        try:
+            baseline = await watcher.check()
+            idle = await watcher.check()
+            await writer_db.add_job(make_job())
+            changed = await watcher.check()
+            return baseline, idle, changed, changes
+        finally:
+            await writer_db.close()
+            await watcher_db.close()
+
+    baseline, idle, changed, changes = asyncio.run(scenario())
+    assert baseline == () and idle == ()
+    assert 'jobs' in changed
+    assert changes == [changed]
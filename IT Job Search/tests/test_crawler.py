@@ -0,0 +1,52 @@
+import asyncio
+
+from crawler import ChannelCrawler
+from fake_telegram import FakeTelegramClient
+from telegram_parser import TelegramParser
+
+
+class FlakyParser(TelegramParser):
+    """Разбор падает на канале broken"""
+
+    async def parse_messages_async(self, messages, channel_username):
+        if channel_username == 'broken':
+            raise ValueError('bad message')
+        return self.parse_messages(messages, channel_username)
+
+
+def test_parse_and_save_errors_stay_in_their_channel():
+    parser = FlakyParser()
+    parser.client = FakeTelegramClient(latency=0, messages_per_channel=5)
+    crawler = ChannelCrawler(parser, ['ok', 'broken', 'unsaved'], min_interval=0)
+    saved = []
+
+    async def store(result):
+        if result.channel == 'unsaved':
+            raise RuntimeError('disk full')
+        saved.append(result.channel)
+
+    results = {r.channel: r for r in asyncio.run(crawler.crawl(on_result=store))}
+
+    assert saved == ['ok', 'broken']
+    assert results['ok'].ok and results['ok'].jobs
+    assert 'bad message' in results['broken'].error
+    # Нераспарсенные сообщения должны перечитаться в следующем цикле
+    assert results['broken'].last_message_id is None
+    assert 'disk full' in results['unsaved'].error
+
+
+def test_flood_wait_delays_only_its_channel():
+    parser = TelegramParser()
+    parser.client = FakeTelegramClient(latency=0.01, messages_per_channel=5,
+                                       flood_waits={'busy': 1, 'banned': 60})
+    channels = ['busy', 'banned'] + [f"channel{i}" for i in range(6)]
+    crawler = ChannelCrawler(parser, channels, max_concurrency=2, min_interval=0, max_flood_wait=5)
+
+    results = {r.channel: r for r in asyncio.run(crawler.crawl())}
+
+    assert parser.client.max_in_flight <= 2
+    # Короткое ожидание выдерживается и канал загружается повторно
+    assert results['busy'].ok and results['busy'].flood_waits == 1
+    # Ожидание дольше max_flood_wait откладывает канал до следующего цикла
+    assert not results['banned'].ok and results['banned'].last_message_id is None
+    assert all(results[f"channel{i}"].ok for i in range(6))
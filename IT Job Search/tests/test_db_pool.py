@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from db_pool import ConnectionPool, PoolClosedError
+
+
+def test_close_waits_for_checked_out_readers(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), readers=1)
+
+    async def scenario():
+        await pool.open()
+        checked_out = asyncio.Event()
+
+        async def slow_read():
+            async with pool.reader() as conn:
+                checked_out.set()
+                await asyncio.sleep(0.05)
+                async with conn.execute("SELECT 1") as cursor:
+                    return (await cursor.fetchone())[0]
+
+        task = asyncio.create_task(slow_read())
+        await checked_out.wait()
+        await pool.close()
+        assert task.done()
+        return await task
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_closed_pool_raises_until_reopened(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), readers=1)
+
+    async def scenario():
+        await pool.open()
+        await pool.close()
+        with pytest.raises(PoolClosedError):
+            async with pool.reader():
+                pass
+        with pytest.raises(PoolClosedError):
+            async with pool.writer():
+                pass
+        await pool.open()
+        try:
+            async with pool.reader() as conn:
+                async with conn.execute("SELECT 1") as cursor:
+                    return (await cursor.fetchone())[0]
+        finally:
+            await pool.close()
+
+    assert asyncio.run(scenario()) == 1
@@ -0,0 +1,46 @@
+import asyncio
+import random
+
+import dedup
+from database import Database
+
+DESCRIPTION = (
+    "We are building large scale recommendation systems for retail clients "
+    "and need an engineer who knows Python, PyTorch and feature stores"
+)
+
+
+def test_repeated_near_duplicate_is_counted_once(tmp_path, make_job):
+    original = make_job(0, description=DESCRIPTION)
+    near = make_job(1, description=DESCRIPTION + " well")
+
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        writes = []
+        db.add_write_listener(writes.append)
+        try:
+            results = [await db.add_jobs([original]), await db.add_jobs([near]), await db.add_jobs([near])]
+            return results, len(writes), await db.get_job_duplicates(1)
+        finally:
+            await db.close()
+
+    results, writes, duplicates = asyncio.run(scenario())
+    assert [r["inserted"] for r in results] == [1, 0, 0]
+    assert [r["near_duplicates"] for r in results] == [0, 1, 0]
+    assert [r["duplicates"] for r in results] == [0, 0, 1]
+    # Пачка без изменений не сбрасывает кэш ответов
+    assert writes == 2
+    assert [d["company"] for d in duplicates] == ["Acme 1"]
+
+
+def test_bands_share_a_bucket_up_to_guaranteed_distance():
+    rnd = random.Random(1)
+    for _ in range(500):
+        signature = rnd.getrandbits(dedup.BITS)
+        flipped = signature
+        for bit in rnd.sample(range(dedup.BITS), dedup.BLOCKS - 2):
+            flipped ^= 1 << bit
+        assert any(a == b for a, b in zip(dedup.bands(signature), dedup.bands(flipped)))
+    # 16-битные ключи: полоса отбирает около 1/65536 таблицы
+    assert max(dedup.bands((1 << dedup.BITS) - 1)) == (1 << 16) - 1
@@ -0,0 +1,71 @@
+import asyncio
+
+import aiosmtplib
+import pytest
+
+import email_service
+from email_service import ResumePartCache, SMTPConnection
+
+
+def write_pdf(tmp_path, name: str, size: int) -> str:
+    path = tmp_path / name
+    path.write_bytes(b'%PDF-1.4\n' + b'0' * size)
+    return str(path)
+
+
+def test_resume_parts_are_bounded_by_bytes(tmp_path):
+    paths = [write_pdf(tmp_path, f"{i}.pdf", 30_000) for i in range(3)]
+    cache = ResumePartCache(max_bytes=100_000)
+
+    async def scenario():
+        first = await cache.get(paths[0])
+        assert await cache.get(paths[0]) is first
+        for path in paths[1:]:
+            await cache.get(path)
+        return first
+
+    first = asyncio.run(scenario())
+    # base64 раздувает ~30 КБ до ~41 КБ: в 100 КБ помещаются два вложения
+    assert cache.size <= 100_000
+    assert len(cache._parts) == 2
+    assert paths[0] not in cache._parts
+    assert asyncio.run(cache.get(paths[0])) is not first
+
+
+def test_missing_resume_is_skipped(tmp_path):
+    cache = ResumePartCache()
+    assert asyncio.run(cache.get(str(tmp_path / 'missing.pdf'))) is None
+    assert cache.size == 0
+
+
+class RejectingSMTP:
+    """SMTP-клиент, у которого подключение проходит, а вход — нет"""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.is_connected = False
+        self.closed = False
+        RejectingSMTP.instances.append(self)
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def login(self, username, password):
+        raise aiosmtplib.SMTPAuthenticationError(535, 'Authentication failed')
+
+    def close(self):
+        self.is_connected = False
+        self.closed = True
+
+
+def test_failed_login_does_not_keep_the_client(monkeypatch):
+    monkeypatch.setattr(email_service.aiosmtplib, 'SMTP', RejectingSMTP)
+    connection = SMTPConnection('localhost', 25, username='user', password='wrong')
+
+    with pytest.raises(aiosmtplib.SMTPAuthenticationError):
+        asyncio.run(connection._connect())
+
+    assert connection._smtp is None
+    assert connection.connects == 0
+    assert RejectingSMTP.instances[-1].closed
@@ -0,0 +1,38 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from markupsafe import escape
+
+from email_service import EmailService
+from models import Application
+
+PAYLOADS = [
+    '<script>alert(1)</script>',
+    '"><img src=x onerror=alert(1)>',
+    "</p><a href='javascript:alert(1)'>click</a>",
+]
+
+
+def html_of(message) -> str:
+    part = next(p for p in message.walk() if p.get_content_type() == 'text/html')
+    return part.get_payload(decode=True).decode('utf-8')
+
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_user_fields_are_escaped(payload, make_job, tmp_path):
+    service = EmailService()
+    job = make_job(title=payload, company=payload)
+    application = Application(
+        job_id=1, name=payload, email='test@example.com', message=payload,
+        resume_path=str(tmp_path / 'missing.pdf'), applied_date=datetime.now(),
+    )
+    messages = [
+        asyncio.run(service.build_application_email(job, application, application.resume_path)),
+        service.build_confirmation_email(application, job),
+        *service.build_status_update_emails([(application, job)] * 2, 'accepted'),
+    ]
+    for message in messages:
+        body = html_of(message)
+        assert payload not in body
+        assert str(escape(payload)) in body
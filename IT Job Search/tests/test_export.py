@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+from confiq import settings
+from database import Database
+
+
+def test_export_requires_admin_token(api, make_job, monkeypatch):
+    monkeypatch.setattr(settings, 'ADMIN_TOKEN', 'secret')
+
+    async def scenario():
+        import main
+        async with api() as client:
+            for i in range(3):
+                await main.db.add_job(make_job(i))
+            statuses = [
+                (await client.get(url)).status_code
+                for url in ('/api/export/jobs', '/api/export/applications')
+            ]
+            response = await client.get('/api/export/jobs', headers={'X-Admin-Token': 'secret'})
+            return statuses, response
+
+    statuses, response = asyncio.run(scenario())
+    assert statuses == [403, 403]
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row['company'] for row in rows] == ['Acme 0', 'Acme 1', 'Acme 2']
+
+
+def test_export_does_not_hold_a_pool_reader(tmp_path, make_job):
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'), readers=1)
+        await db.init_db()
+        batches = db.iter_jobs(batch_size=1)
+        try:
+            for i in range(3):
+                await db.add_job(make_job(i))
+            first = await batches.__anext__()
+            # Выгрузка на середине, а единственный читатель пула свободен
+            stats = await asyncio.wait_for(db.get_stats(), timeout=1)
+            rest = [batch async for batch in batches]
+            return len(first), stats["total_jobs"], len(rest)
+        finally:
+            await batches.aclose()
+            await db.close()
+
+    assert asyncio.run(scenario()) == (1, 3, 2)
@@ -0,0 +1,87 @@
+"""Сверка JobExtractor с эталоном старой реализации.
+
+fixtures/extraction_golden.json записан прежним
+TelegramParser._parse_job_from_text на корпусе
+fixtures/extraction_messages.json. Все поля должны совпадать, кроме
+тегов: теги ищутся целыми словами, и ложные срабатывания старой
+реализации пропадают.
+"""
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from extraction import JobExtractor
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DATE = datetime(2024, 5, 1, tzinfo=timezone.utc)
+# «R» в любом слове, «R&D», «Git» в «GitHub», «Sql» в «NoSQL», «Spark» в «Sparkling»
+FALSE_POSITIVE_TAGS = {'R', 'Git', 'Sql', 'Spark'}
+# Теги по умолчанию, если в тексте не нашлось ни одного
+DEFAULT_TAGS = ['Python', 'Machine Learning']
+
+
+def load(name: str):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse(extractor: JobExtractor, text: str):
+    scan = extractor.scan(text) if text else None
+    if not scan or not scan["keywords"]:
+        return None
+    return extractor.extract(text, 'fixture', DATE, scan)
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return JobExtractor()
+
+
+CASES = list(zip(load('extraction_messages.json'), load('extraction_golden.json')))
+
+
+@pytest.mark.parametrize('text, expected', CASES, ids=[f"message{i}" for i in range(len(CASES))])
+def test_matches_golden_output(extractor, text, expected):
+    job = parse(extractor, text)
+    assert (job is None) == (expected["job"] is None)
+    if job is None:
+        return
+    actual = job.model_dump()
+    for field, value in expected["job"].items():
+        if field != 'tags':
+            assert actual[field] == value, field
+    # Пропасть могут только ложные теги; если пропали все — остаются теги по умолчанию
+    removed = set(expected["job"]["tags"]) - set(actual['tags'])
+    assert removed <= FALSE_POSITIVE_TAGS
+    if actual['tags'] != DEFAULT_TAGS:
+        assert set(actual['tags']) <= set(expected["job"]["tags"])
+
+
+def test_tags_match_whole_words(extractor):
+    job = parse(extractor, "Hiring ML Engineer: NoSQL, GitHub Actions, Rust and Python")
+    assert 'Python' in job.tags
+    assert not FALSE_POSITIVE_TAGS & set(job.tags)
+
+
+def test_default_experience_is_not_stored_as_range(extractor, tmp_path):
+    from database import Database
+
+    guessed = parse(extractor, "ML Engineer\nCompany: Acme\nWe build ranking models in Python")
+    stated = parse(extractor, "ML Engineer\nCompany: Globex\nExperience: 2-3 years with Python")
+    assert guessed.experience == stated.experience == '2-3 years'
+
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        try:
+            ids = [await db.add_job(job) for job in (guessed, stated)]
+            return [await db.get_job_by_id(job_id) for job_id in ids]
+        finally:
+            await db.close()
+
+    guessed, stated = asyncio.run(scenario())
+    assert (guessed.experience_min, guessed.experience_max) == (None, None)
+    assert (stated.experience_min, stated.experience_max) == (2, 3)
@@ -0,0 +1,35 @@
+import asyncio
+
+import metrics
+from confiq import settings
+
+
+def requests_seen(method: str, route: str, status: int) -> int:
+    return sum(metrics.http_series(method, route, status).counts)
+
+
+def test_requests_are_timed_by_route(api):
+    async def scenario():
+        before = requests_seen('GET', '/api/jobs/{job_id}', 404)
+        async with api() as client:
+            response = await client.get('/api/jobs/12345')
+        return response.status_code, requests_seen('GET', '/api/jobs/{job_id}', 404) - before
+
+    assert asyncio.run(scenario()) == (404, 1)
+
+
+def test_profile_header_returns_report(api, monkeypatch):
+    monkeypatch.setattr(settings, 'ADMIN_TOKEN', 'secret')
+
+    async def scenario():
+        async with api() as client:
+            plain = await client.get('/api/stats', headers={'X-Profile': 'tottime'})
+            profiled = await client.get('/api/stats', headers={
+                'X-Profile': 'tottime', 'X-Admin-Token': 'secret',
+            })
+        return plain, profiled
+
+    plain, profiled = asyncio.run(scenario())
+    assert plain.headers['content-type'] == 'application/json'
+    assert profiled.headers['x-profiled-status'] == '200'
+    assert 'function calls' in profiled.text
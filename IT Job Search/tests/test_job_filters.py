@@ -0,0 +1,124 @@
+"""Фильтры списка вакансий: теги, диапазоны и выбор ведущего условия.
+
+40 вакансий при limit=50 дают порог _driver_cap = isqrt(50 * 40 // 10) = 14:
+Rust (2 вакансии) и зарплата от 11k (10) ведут выборку, Python (30) и
+зарплата от 4k (30) проверяются у каждой строки.
+"""
+import asyncio
+
+import pytest
+
+from database import Database
+from models import JobFilter
+
+TOTAL = 40
+LIMIT = 50
+SALARIES = ['$3k-4k', '$5k-7k', '$9k-12k', 'Не указана']
+EXPERIENCE = ['1-2 years', '3+ years', '5-7 years', 'Не указан', '2-4 years']
+
+
+def tags(i):
+    names = ['Python'] if i < 30 else ['Go']
+    if i < 30 and i % 3 == 0:
+        names.append('Docker')
+    if i in (5, 33):
+        names.append('Rust')
+    return names
+
+
+def fields(i):
+    return dict(
+        tags=tags(i),
+        salary=SALARIES[i % 4],
+        experience=EXPERIENCE[i % 5],
+        description=(
+            f"Computer vision models for retail, vacancy number {i}" if i % 7 == 0
+            else f"Building recommendation models, vacancy number {i}"
+        ),
+    )
+
+
+def ids(predicate):
+    return {i for i in range(TOTAL) if predicate(i)}
+
+
+@pytest.fixture
+def jobs_api(api, make_job):
+    """Запрос к /api/jobs на общей выборке; результат — номера вакансий"""
+    def query(**params):
+        async def scenario():
+            import main
+            async with api() as client:
+                await main.db.add_jobs([make_job(i, **fields(i)) for i in range(TOTAL)])
+                response = await client.get('/api/jobs', params={'limit': LIMIT, **params})
+                assert response.status_code == 200, response.text
+                return {int(job['company'].split()[-1]) for job in response.json()}
+        return asyncio.run(scenario())
+    return query
+
+
+@pytest.mark.parametrize('params, expected', [
+    ({'tags': 'Python,Docker'}, ids(lambda i: i < 30 and i % 3 == 0)),
+    ({'tags': 'Python,Docker', 'tag_mode': 'any'}, ids(lambda i: i < 30)),
+    ({'tags': 'Rust,Go', 'tag_mode': 'any'}, ids(lambda i: i >= 30 or i == 5)),
+    # Редкий тег ведёт, частый проверяется; порядок в запросе не важен
+    ({'tags': 'Python,Rust'}, {5}),
+    ({'tags': 'Rust,Go'}, {33}),
+    ({'tags': 'Python'}, ids(lambda i: i < 30)),
+], ids=['all', 'any', 'any-rare', 'rare-with-common', 'rare-with-other', 'common'])
+def test_tag_filters(jobs_api, params, expected):
+    assert jobs_api(**params) == expected
+
+
+@pytest.mark.parametrize('params, expected', [
+    ({'salary_min': 11000}, ids(lambda i: i % 4 == 2)),
+    ({'salary_min': 4000}, ids(lambda i: i % 4 in (0, 1, 2))),
+    ({'salary_max': 4500}, ids(lambda i: i % 4 == 0)),
+    ({'salary_min': 5000, 'salary_max': 8000}, ids(lambda i: i % 4 == 1)),
+    # «3+ years» без верхней границы подходит под любой нижний порог
+    ({'experience_min': 4}, ids(lambda i: i % 5 in (1, 2, 4))),
+    ({'experience_max': 1}, ids(lambda i: i % 5 == 0)),
+    ({'experience_min': 2, 'experience_max': 2}, ids(lambda i: i % 5 in (0, 4))),
+], ids=['salary-from-rare', 'salary-from-common', 'salary-to', 'salary-both',
+        'experience-from', 'experience-to', 'experience-both'])
+def test_open_and_closed_ranges(jobs_api, params, expected):
+    assert jobs_api(**params) == expected
+
+
+@pytest.mark.parametrize('params, expected', [
+    ({'search': 'vision'}, ids(lambda i: i % 7 == 0)),
+    ({'search': 'vision', 'salary_min': 5000}, ids(lambda i: i % 7 == 0 and i % 4 in (1, 2))),
+    ({'search': 'vision', 'experience_min': 5, 'tags': 'Docker'},
+     ids(lambda i: i % 7 == 0 and i % 5 in (1, 2) and i < 30 and i % 3 == 0)),
+], ids=['search', 'search-salary', 'search-experience-tag'])
+def test_ranges_with_search(jobs_api, params, expected):
+    assert jobs_api(**params) == expected
+
+
+def test_rare_conditions_drive_the_query(tmp_path, make_job):
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        try:
+            await db.add_jobs([make_job(i, **fields(i)) for i in range(TOTAL)])
+            async with db.pool.reader() as conn:
+                cap = db._driver_cap(LIMIT, await db._jobs_total(conn))
+                return cap, [
+                    (await db._filter_sql(conn, filters, LIMIT))[0]
+                    for filters in (
+                        JobFilter(tags=['Python', 'Rust']),
+                        JobFilter(tags=['Python']),
+                        JobFilter(salary_min=11000),
+                        JobFilter(salary_min=4000),
+                    )
+                ]
+        finally:
+            await db.close()
+
+    cap, (rare_tag, common_tag, rare_range, common_range) = asyncio.run(scenario())
+    assert cap == 14
+    # Rust ведёт через job_tags, Python проверяется EXISTS у каждой строки
+    assert rare_tag.index('jobs.id IN (SELECT job_id') < rare_tag.index('EXISTS')
+    assert 'jobs.id IN' not in common_tag and 'EXISTS' in common_tag
+    assert 'jobs.id IN (SELECT id FROM jobs WHERE jobs.salary_max >= ?)' in rare_range
+    assert 'jobs.id IN' not in common_range and 'jobs.salary_max >= ?' in common_range
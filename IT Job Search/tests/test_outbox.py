@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime
+
+import aiosmtplib
+
+from database import Database
+from email_service import EmailService
+from models import Application
+from outbox import EmailOutbox
+
+
+class FlakyEmailService(EmailService):
+    """Вместо SMTP — заранее заданные ошибки, затем успешная отправка"""
+
+    def __init__(self, errors):
+        super().__init__()
+        self.errors = list(errors)
+        self.delivered = []
+
+    async def send(self, message):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.delivered.append(message)
+
+
+def deliver(tmp_path, make_job, errors, max_attempts=3):
+    """Поставить одно письмо и прогнать очередь; (статус, число попыток, доставлено)"""
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        try:
+            job_id = await db.add_job(make_job())
+            await db.add_application(Application(
+                job_id=job_id, name='Test', email='test@example.com', message='Hi',
+                resume_path=str(tmp_path / 'missing.pdf'), applied_date=datetime.now(),
+            ), emails=['application'])
+            service = FlakyEmailService(errors)
+            outbox = EmailOutbox(db, service, max_attempts=max_attempts, retry_base_delay=0)
+            for _ in range(max_attempts + 1):
+                await outbox.deliver_due()
+            async with db.pool.reader() as conn:
+                async with conn.execute("SELECT status, attempts FROM email_outbox") as cursor:
+                    status, attempts = await cursor.fetchone()
+            return status, attempts, len(service.delivered)
+        finally:
+            await db.close()
+    return asyncio.run(scenario())
+
+
+def test_transient_error_is_retried(tmp_path, make_job):
+    errors = [aiosmtplib.SMTPResponseException(451, 'Try again later')]
+    assert deliver(tmp_path, make_job, errors) == ('sent', 2, 1)
+
+
+def test_permanent_error_is_not_retried(tmp_path, make_job):
+    errors = [aiosmtplib.SMTPRecipientRefused(550, 'No such user', 'test@example.com')]
+    assert deliver(tmp_path, make_job, errors) == ('failed', 1, 0)
+
+
+def test_auth_error_postpones_without_spending_attempts(tmp_path, make_job):
+    errors = [aiosmtplib.SMTPAuthenticationError(535, 'Authentication failed')] * 5
+    assert deliver(tmp_path, make_job, errors) == ('pending', 0, 0)
+
+
+def test_gives_up_after_max_attempts(tmp_path, make_job):
+    errors = [aiosmtplib.SMTPServerDisconnected('down')] * 5
+    assert deliver(tmp_path, make_job, errors, max_attempts=3) == ('failed', 3, 0)
+
+
+def test_status_emails_are_rendered_together(tmp_path, make_job):
+    class CountingEmailService(FlakyEmailService):
+        renders = 0
+
+        def build_status_update_emails(self, recipients, new_status):
+            self.renders += 1
+            return super().build_status_update_emails(recipients, new_status)
+
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        try:
+            job_id = await db.add_job(make_job())
+            for i in range(3):
+                application_id = await db.add_application(Application(
+                    job_id=job_id, name=f"Test {i}", email=f"test{i}@example.com",
+                    message='Hi', resume_path='', applied_date=datetime.now(),
+                ))
+                assert await db.update_application_status(application_id, 'accepted', notify=True)
+            assert not await db.update_application_status(999, 'accepted', notify=True)
+            service = CountingEmailService([])
+            await EmailOutbox(db, service).deliver_due()
+            return service.renders, [m['To'] for m in service.delivered], await db.get_outbox_stats()
+        finally:
+            await db.close()
+
+    renders, recipients, stats = asyncio.run(scenario())
+    assert renders == 1
+    assert recipients == [f"test{i}@example.com" for i in range(3)]
+    assert stats == {'pending': 0, 'sent': 3, 'failed': 0}
@@ -0,0 +1,61 @@
+"""Курсоры /api/jobs: обход страниц и отказ на чужих курсорах"""
+import asyncio
+
+import pytest
+
+from pagination import encode_cursor
+
+TOTAL = 7
+
+
+def walk(api, make_job, params, bad_cursor=None):
+    """Номера вакансий по страницам из двух; bad_cursor — ответ на чужой курсор"""
+    async def scenario():
+        import main
+        async with api() as client:
+            await main.db.add_jobs([
+                make_job(i, salary=f"${i + 1}k-{i + 2}k",
+                         description=f"Computer vision models, vacancy number {i}")
+                for i in range(TOTAL)
+            ])
+            seen, cursor = [], None
+            while True:
+                query = {'limit': 2, **params, **({'cursor': cursor} if cursor else {})}
+                response = await client.get('/api/jobs', params=query)
+                assert response.status_code == 200, response.text
+                seen.extend(int(job['company'].split()[-1]) for job in response.json())
+                cursor = response.headers.get('X-Next-Cursor')
+                if not cursor:
+                    break
+            rejected = None
+            if bad_cursor is not None:
+                response = await client.get('/api/jobs', params={**params, 'cursor': bad_cursor})
+                rejected = response.status_code, response.json()['detail']
+            return seen, rejected
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('params', [{}, {'sort': 'salary'}, {'search': 'vision'}],
+                         ids=['date', 'salary', 'search'])
+def test_pages_cover_every_job_once(api, make_job, params):
+    seen, _ = walk(api, make_job, params)
+    assert sorted(seen) == list(range(TOTAL))
+    if params.get('sort') == 'salary':
+        assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.parametrize('params, cursor', [
+    # Курсор даты в сортировке по зарплате: s и m взялись бы как None
+    ({'sort': 'salary'}, encode_cursor({'k': 'date', 'c': '2024-01-01', 'i': 3})),
+    ({}, encode_cursor({'k': 'search', 'o': 2})),
+    ({}, encode_cursor({'c': '2024-01-01', 'i': 3})),
+    ({'sort': 'salary'}, encode_cursor({'k': 'salary', 's': 5000, 'i': 3})),
+    ({'search': 'vision'}, encode_cursor({'k': 'search', 'o': '2'})),
+    ({'search': 'vision'}, encode_cursor({'k': 'search', 'o': -2})),
+    ({}, 'not a cursor'),
+], ids=['other-sort', 'search-in-date', 'untagged', 'missing-key',
+        'offset-type', 'negative-offset', 'garbage'])
+def test_foreign_or_incomplete_cursor_is_rejected(api, make_job, params, cursor):
+    _, (status, detail) = walk(api, make_job, params, bad_cursor=cursor)
+    assert status == 400
+    assert 'урсор' in detail
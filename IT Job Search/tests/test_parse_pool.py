@@ -0,0 +1,36 @@
+"""Пул процессов для парсинга: тот же результат, что и в текущем процессе"""
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+
+from extraction import JOB_KEYWORDS, PRIORITY_LOCATIONS
+from parse_pool import ParsingPool
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DATE = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def items():
+    with open(os.path.join(FIXTURES_DIR, 'extraction_messages.json'), encoding='utf-8') as f:
+        messages = [text for text in json.load(f) if text]
+    # Номер канала в source проверяет, что порядок сообщений сохраняется
+    return [(text, f"channel{i}", DATE) for i, text in enumerate(messages * 3)]
+
+
+def parse(workers, **options):
+    async def scenario():
+        pool = ParsingPool(JOB_KEYWORDS, PRIORITY_LOCATIONS, workers=workers, **options)
+        try:
+            jobs = await pool.parse(items())
+        finally:
+            pool.close()
+        return [(job.model_dump(), job.experience_is_default) for job in jobs]
+    return asyncio.run(scenario())
+
+
+def test_workers_return_inline_results_in_order():
+    inline = parse(0)
+    assert inline
+    # Мелкие пачки и одна пачка в полёте: ожидание на семафоре не меняет порядок
+    assert parse(2, batch_size=4, max_pending=1) == inline
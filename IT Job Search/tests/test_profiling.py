@@ -0,0 +1,77 @@
+"""Профилирование по запросу администратора и журнал медленных запросов"""
+import asyncio
+import json
+import marshal
+
+from confiq import settings
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+
+def test_profiling_is_hidden_without_admin_token(api, make_job):
+    async def scenario():
+        import main
+        async with api() as client:
+            await main.db.add_job(make_job())
+            profile = await client.get('/api/admin/profile', params={'seconds': 0.05})
+            jobs = await client.get('/api/jobs', headers={'X-Profile': 'tottime', **ADMIN})
+            return profile.status_code, jobs
+    status, jobs = asyncio.run(scenario())
+    assert status == 404
+    # Без ADMIN_TOKEN заголовок X-Profile ни на что не влияет
+    assert jobs.headers['content-type'] == 'application/json'
+    assert len(jobs.json()) == 1
+
+
+def test_request_profile_and_process_samples(api, make_job, monkeypatch):
+    monkeypatch.setattr(settings, 'ADMIN_TOKEN', 'secret')
+
+    async def scenario():
+        import main
+        async with api() as client:
+            await main.db.add_job(make_job())
+            forbidden = await client.get('/api/admin/profile', params={'seconds': 0.05})
+            # Чужой токен: обычный ответ, без профиля. Разный limit —
+            # чтобы ответ не брался из кэша и запрос доходил до базы
+            plain = await client.get('/api/jobs', params={'limit': 10},
+                                     headers={'X-Profile': 'cumulative', 'X-Admin-Token': 'wrong'})
+            report = await client.get('/api/jobs', params={'limit': 11},
+                                      headers={'X-Profile': 'cumulative', **ADMIN})
+            dump = await client.get('/api/jobs', params={'limit': 12},
+                                    headers={'X-Profile': 'pstats', **ADMIN})
+            folded = await client.get('/api/admin/profile', params={'seconds': 0.05, 'interval': 0.005},
+                                      headers=ADMIN)
+            return forbidden.status_code, plain, report, dump, folded
+
+    forbidden, plain, report, dump, folded = asyncio.run(scenario())
+    assert forbidden == 403
+    assert len(plain.json()) == 1
+    assert report.headers['X-Profiled-Status'] == '200'
+    assert 'get_jobs_page' in report.text
+    assert any('get_jobs_page' in function for _, _, function in marshal.loads(dump.content))
+    stacks = folded.text.splitlines()
+    assert stacks
+    for line in stacks:
+        frames, count = line.rsplit(' ', 1)
+        assert int(count) > 0 and frames
+    assert folded.headers['X-Process-Id']
+
+
+def test_slow_query_log_keeps_shapes_not_values(api, make_job, monkeypatch):
+    monkeypatch.setattr(settings, 'ADMIN_TOKEN', 'secret')
+    # Порог ниже любого запроса: в журнал попадает всё
+    monkeypatch.setattr(settings, 'SLOW_QUERY_MS', 0.0001)
+
+    async def scenario():
+        import main
+        async with api() as client:
+            await main.db.add_job(make_job(contact_email='private@example.com'))
+            await client.get('/api/jobs', params={'location': 'Dubai'})
+            return (await client.get('/api/admin/slow-queries', headers=ADMIN)).json()
+
+    log = asyncio.run(scenario())
+    assert log['enabled'] and log['total'] >= log['kept'] > 0
+    methods = {entry['method'].split('.', 1)[0] for entry in log['queries']}
+    assert {'add_job', 'get_jobs_page'} <= methods
+    assert 'private@example.com' not in json.dumps(log)
+    assert 'Dubai' not in json.dumps(log)
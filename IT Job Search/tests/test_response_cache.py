@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from models import JobFilter
+from response_cache import CacheBackend, filter_key
+
+
+def test_filter_key_keeps_sql_sensitive_fields():
+    assert filter_key(JobFilter(location='dubai')) != filter_key(JobFilter(location='Dubai'))
+    assert filter_key(JobFilter(position='ML  Engineer')) != filter_key(JobFilter(position='ML Engineer'))
+
+
+def test_filter_key_normalizes_case_insensitive_fields():
+    assert filter_key(JobFilter(search='PyTorch  NLP')) == filter_key(JobFilter(search='pytorch nlp'))
+    assert filter_key(JobFilter(tags=['Docker', 'python'])) == filter_key(JobFilter(tags=['PYTHON', ' docker']))
+
+
+def test_backend_must_implement_storage():
+    class GetOnly(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+def test_location_case_is_not_served_from_other_entry(api, make_job):
+    async def scenario():
+        async with api() as client:
+            import main
+            await main.db.add_job(make_job(1, location='Dubai'))
+            lower = await client.get('/api/jobs', params={'location': 'dubai'})
+            exact = await client.get('/api/jobs', params={'location': 'Dubai'})
+            return lower.json(), exact.json()
+
+    lower, exact = asyncio.run(scenario())
+    assert lower == []
+    assert [job['location'] for job in exact] == ['Dubai']
+
+
+def test_write_invalidates_cached_stats(api, make_job):
+    async def scenario():
+        async with api() as client:
+            import main
+            first = await client.get('/api/stats')
+            await main.db.add_job(make_job(1))
+            second = await client.get('/api/stats')
+            return first.json()['total_jobs'], second.json()['total_jobs']
+
+    assert asyncio.run(scenario()) == (0, 1)
+
+
+def test_job_list_etag_changes_after_write(api, make_job):
+    async def scenario():
+        async with api() as client:
+            import main
+            await main.db.add_job(make_job(1))
+            first = await client.get('/api/jobs')
+            etag = first.headers['etag']
+            unchanged = await client.get('/api/jobs', headers={'If-None-Match': etag})
+            await main.db.add_job(make_job(2))
+            changed = await client.get('/api/jobs', headers={'If-None-Match': etag})
+            return unchanged.status_code, changed.status_code, len(changed.json()), changed.headers['etag'] != etag
+
+    assert asyncio.run(scenario()) == (304, 200, 2, True)
@@ -0,0 +1,59 @@
+import asyncio
+
+from crawler import ChannelCrawler
+from database import Database
+from fake_telegram import FakeTelegramClient
+from scheduler import IngestScheduler
+from telegram_parser import TelegramParser
+
+
+def make_scheduler(db: Database, interval: float = 60) -> IngestScheduler:
+    parser = TelegramParser()
+    parser.client = FakeTelegramClient(latency=0.01, messages_per_channel=3)
+    crawler = ChannelCrawler(parser, ['alpha', 'beta'], db=db, min_interval=0)
+    return IngestScheduler(db, crawler, parser, interval=interval)
+
+
+def test_concurrent_cycles_run_once(tmp_path):
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        try:
+            scheduler = make_scheduler(db)
+            statuses = await asyncio.gather(scheduler.run_cycle(), scheduler.run_cycle())
+            return statuses, await db.get_ingest_runs()
+        finally:
+            await db.close()
+
+    statuses, runs = asyncio.run(scenario())
+    assert statuses == ['ok', 'already_running']
+    assert [run['status'] for run in runs] == ['ok']
+
+
+def test_bookkeeping_errors_do_not_stop_the_loop(tmp_path):
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+
+        async def broken(*args, **kwargs):
+            raise RuntimeError('database is locked')
+
+        db.interrupt_ingest_runs = broken
+        db.finish_ingest_run = broken
+        scheduler = make_scheduler(db, interval=0.01)
+        try:
+            scheduler.start()
+            for _ in range(200):
+                if scheduler.cycles >= 2:
+                    break
+                await asyncio.sleep(0.01)
+            return scheduler.cycles, scheduler._task.done()
+        finally:
+            try:
+                await scheduler.close()
+            finally:
+                await db.close()
+
+    cycles, stopped = asyncio.run(scenario())
+    assert cycles >= 2
+    assert not stopped
@@ -0,0 +1,23 @@
+import asyncio
+
+from database import Database
+from models import JobFilter
+
+
+def test_snippet_escapes_message_html(tmp_path, make_job):
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        try:
+            await db.add_job(make_job(description='<img src=x onerror=alert(1)> PyTorch & NLP'))
+            items, _ = await db.get_jobs_page(JobFilter(search='pytorch'))
+            return items
+        finally:
+            await db.close()
+
+    items = asyncio.run(scenario())
+    assert len(items) == 1
+    snippet = items[0]['snippet']
+    assert '<img' not in snippet
+    assert '&lt;img src=x onerror=alert(1)&gt;' in snippet
+    assert '<mark>PyTorch</mark> &amp; NLP' in snippet
@@ -0,0 +1,77 @@
+"""Счётчики stat_counters и jobs_daily против полных агрегатов"""
+import asyncio
+from datetime import datetime
+
+from database import Database
+from models import Application
+
+AGGREGATES = {
+    'jobs_total': "SELECT '', COUNT(*) FROM jobs",
+    'jobs_by_location': "SELECT COALESCE(location, ''), COUNT(*) FROM jobs GROUP BY 1",
+    'applications_total': "SELECT '', COUNT(*) FROM applications",
+    'applications_by_status': "SELECT status, COUNT(*) FROM applications GROUP BY 1",
+    'jobs_by_tag': """
+        SELECT tags.name, COUNT(*) FROM job_tags JOIN tags ON tags.id = job_tags.tag_id
+        GROUP BY tags.name
+    """,
+}
+
+
+async def compare(db):
+    """Пары (счётчики, агрегаты) по каждой метрике; нулевые счётчики не учитываются"""
+    pairs = {}
+    async with db.pool.reader() as conn:
+        for metric, query in AGGREGATES.items():
+            async with conn.execute(
+                "SELECT key, value FROM stat_counters WHERE metric = ? AND value != 0", (metric,)
+            ) as cursor:
+                counters = dict(await cursor.fetchall())
+            async with conn.execute(query) as cursor:
+                actual = {key: count for key, count in await cursor.fetchall() if count}
+            pairs[metric] = counters, actual
+        async with conn.execute("SELECT day, source, count FROM jobs_daily WHERE count != 0") as cursor:
+            daily = sorted(map(tuple, await cursor.fetchall()))
+        async with conn.execute("""
+            SELECT date(created_at), COALESCE(source, ''), COUNT(*) FROM jobs GROUP BY 1, 2
+        """) as cursor:
+            pairs['jobs_daily'] = daily, sorted(map(tuple, await cursor.fetchall()))
+    return pairs
+
+
+def test_counters_match_aggregates_after_insert_update_and_delete(tmp_path, make_job):
+    async def scenario():
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        snapshots = []
+        try:
+            await db.add_jobs([
+                make_job(i, location=['Dubai', 'Remote', 'Canada'][i % 3],
+                         tags=['Python', 'Docker'] if i % 2 else ['Go'],
+                         source=f"t.me/channel{i % 2}")
+                for i in range(12)
+            ])
+            for job_id in range(1, 7):
+                await db.add_application(Application(
+                    job_id=job_id, name='Test', email='test@example.com', message='Hi',
+                    resume_path='resume.pdf', applied_date=datetime.now(),
+                ))
+            snapshots.append(await compare(db))
+
+            await db.update_application_status(1, 'viewed')
+            await db.update_application_status(2, 'rejected')
+            async with db.pool.writer() as conn:
+                await conn.execute("UPDATE jobs SET location = 'Serbia' WHERE id IN (1, 2)")
+                await conn.execute("DELETE FROM applications WHERE id = 3")
+                await conn.execute("DELETE FROM jobs WHERE id IN (8, 9, 11)")
+            snapshots.append(await compare(db))
+            return snapshots, await db.get_stats()
+        finally:
+            await db.close()
+
+    snapshots, stats = asyncio.run(scenario())
+    for pairs in snapshots:
+        for metric, (counters, actual) in pairs.items():
+            assert counters == actual, metric
+    assert stats['total_jobs'] == 9
+    assert stats['total_applications'] == 5
+    assert stats['applications_by_status'] == {'sent': 3, 'viewed': 1, 'rejected': 1}
@@ -0,0 +1,114 @@
+"""Офлайн-импорт экспорта Telegram Desktop: продолжение с контрольной точки"""
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import Database
+from extraction import JOB_KEYWORDS, PRIORITY_LOCATIONS
+from parse_pool import ParsingPool
+from telegram_import import TelegramImporter
+
+MESSAGES = 60
+BATCH_SIZE = 8
+WORDS = ['ranking', 'search', 'vision', 'speech', 'fraud', 'payments', 'retail', 'health',
+         'robotics', 'ads', 'forecasting', 'latency', 'labels', 'growth', 'pricing', 'maps']
+
+
+def write_export(path):
+    """Экспорт канала: каждое третье сообщение — вакансия, остальное — болтовня"""
+    rnd = random.Random(7)
+    started = datetime(2023, 1, 1)
+    messages = []
+    for i in range(1, MESSAGES + 1):
+        date = started + timedelta(hours=i)
+        text = f"Обсуждение {{в чате}} номер {i}"
+        if i % 3 == 0:
+            text = "\n".join([
+                "🚀 Senior ML Engineer",
+                f"Company: Acme {i}",
+                "Location: Dubai",
+                # Пары слов дают разные описания: почти-дубликатов среди постов нет
+                "We are hiring a machine learning engineer for " + " ".join(
+                    rnd.choice(WORDS) + rnd.choice(WORDS) for _ in range(40)
+                ),
+                "Experience: 3-5 years with Python and SQL",
+                "Salary: $5k-7k",
+                f"Contact: jobs{i}@example.com",
+            ])
+        messages.append({"id": i, "type": "message", "date": date.isoformat(), "text": text})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"name": "Tests", "type": "public_channel", "id": 1, "messages": messages},
+                  f, ensure_ascii=False, indent=1)
+
+
+class FailingPool:
+    """Обёртка над ParsingPool, которая падает на пачке с номером fail_on"""
+
+    def __init__(self, pool, fail_on):
+        self.pool = pool
+        self.fail_on = fail_on
+        self.batches = 0
+
+    async def parse(self, items):
+        self.batches += 1
+        if self.batches == self.fail_on:
+            raise RuntimeError('worker crashed')
+        return await self.pool.parse(items)
+
+
+async def import_runs(db_path, export, runs):
+    """Прогнать импорт по списку запусков: (обёртка пула или None, max_messages)"""
+    db = Database(db_path)
+    await db.init_db()
+    pool = ParsingPool(JOB_KEYWORDS, PRIORITY_LOCATIONS, workers=0)
+    checkpoints = []
+    try:
+        for wrap, max_messages in runs:
+            importer = TelegramImporter(db, wrap(pool) if wrap else pool,
+                                        batch_size=BATCH_SIZE, progress_interval=3600)
+            try:
+                checkpoints.append(await importer.import_file(export, 'tests', max_messages=max_messages))
+            except RuntimeError:
+                checkpoints.append(await db.get_import_checkpoint(str(export)))
+        async with db.pool.reader() as conn:
+            async with conn.execute("SELECT title, company, posted_date FROM jobs ORDER BY 2") as cursor:
+                rows = [tuple(r) for r in await cursor.fetchall()]
+        return checkpoints, rows, await db.get_channel_high_water_marks()
+    finally:
+        pool.close()
+        await db.close()
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / 'result.json'
+    write_export(path)
+    return path
+
+
+def test_interrupted_import_resumes_from_checkpoint(tmp_path, export):
+    (full,), full_rows, _ = asyncio.run(import_runs(tmp_path / 'full.db', export, [(None, None)]))
+    assert full['finished'] and full['messages_read'] == MESSAGES
+    assert len(full_rows) == MESSAGES // 3
+
+    checkpoints, rows, marks = asyncio.run(import_runs(tmp_path / 'resumed.db', export, [
+        (None, 2 * BATCH_SIZE),
+        # Третья пачка этого запуска падает: сохраняются только две
+        (lambda pool: FailingPool(pool, fail_on=3), None),
+        (None, None),
+        (None, None),
+    ]))
+    stopped, crashed, resumed, finished = checkpoints
+    assert (stopped['messages_read'], stopped['finished']) == (2 * BATCH_SIZE, 0)
+    assert (crashed['messages_read'], crashed['finished']) == (4 * BATCH_SIZE, 0)
+    assert crashed['last_message_id'] == 4 * BATCH_SIZE
+    # Продолжение читает файл с сохранённого смещения, а не сначала
+    assert resumed['messages_read'] == MESSAGES and resumed['finished']
+    assert resumed['duplicates'] == 0
+    assert resumed['jobs_inserted'] == full['jobs_inserted']
+    assert finished['messages_read'] == MESSAGES
+    assert rows == full_rows
+    assert marks['tests'] == MESSAGES
@@ -0,0 +1,76 @@
+import asyncio
+
+from confiq import settings
+from database import Database
+from fake_telegram import FakeTelegramClient
+from peer_cache import PeerCache
+from telegram_parser import TelegramParser
+
+
+def make_parser(client: FakeTelegramClient, peer_cache: PeerCache = None) -> TelegramParser:
+    parser = TelegramParser(peer_cache=peer_cache)
+    parser.client = client
+    return parser
+
+
+def test_gap_is_fetched_oldest_first_without_holes(monkeypatch):
+    monkeypatch.setattr(settings, 'MAX_BACKFILL_MESSAGES', 150)
+    client = FakeTelegramClient(latency=0, messages_per_channel=10)
+    parser = make_parser(client)
+    client.post('gap', 400)
+
+    async def scenario():
+        mark, fetched = 10, []
+        while True:
+            messages = await parser.fetch_messages('gap', min_id=mark)
+            if not messages:
+                return mark, fetched
+            assert len(messages) <= 150
+            fetched.extend(m.id for m in messages)
+            # Как crawler: новая отметка — максимальный загруженный id
+            mark = max(fetched)
+
+    mark, fetched = asyncio.run(scenario())
+    assert mark == 410
+    assert sorted(fetched) == list(range(11, 411))
+
+
+def test_first_crawl_takes_latest_messages(monkeypatch):
+    monkeypatch.setattr(settings, 'MESSAGES_LIMIT', 30)
+    client = FakeTelegramClient(latency=0, messages_per_channel=100)
+    messages = asyncio.run(make_parser(client).fetch_messages('fresh'))
+    assert [m.id for m in messages] == list(range(100, 70, -1))
+
+
+def test_resolved_peers_survive_restart_until_invalid(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'MESSAGES_LIMIT', 5)
+    # Сервер Telegram один на все «запуски» процесса
+    client = FakeTelegramClient(latency=0, messages_per_channel=10)
+
+    async def run_process(rotate=False):
+        db = Database(str(tmp_path / 'test.db'))
+        await db.init_db()
+        try:
+            parser = make_parser(client, PeerCache(db))
+            if rotate:
+                client.rotate_access_hash('jobs')
+            for _ in range(2):
+                assert len(await parser.fetch_messages('jobs')) == 5
+            return parser.peer_cache.metrics()
+        finally:
+            await db.close()
+
+    first = asyncio.run(run_process())
+    assert client.entity_calls == 1
+    assert (first['hits'], first['misses']) == (1, 1)
+
+    restarted = asyncio.run(run_process())
+    assert client.entity_calls == 1
+    assert (restarted['hits'], restarted['misses']) == (2, 0)
+
+    # Устаревший access_hash: канал разрешается заново один раз,
+    # и новое значение сохраняется для следующего запуска
+    asyncio.run(run_process(rotate=True))
+    assert client.entity_calls == 2
+    asyncio.run(run_process())
+    assert client.entity_calls == 2
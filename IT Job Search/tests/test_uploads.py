@@ -0,0 +1,48 @@
+import asyncio
+import os
+
+from confiq import settings
+
+FORM = {'name': 'Test', 'email': 'test@example.com', 'message': 'Hi'}
+
+
+def pdf(size: int) -> bytes:
+    return b'%PDF-1.4\n' + b'0' * size
+
+
+def post_resumes(api, make_job, tmp_path, *contents):
+    async def scenario():
+        async with api() as client:
+            import main
+            job_id = await main.db.add_job(make_job())
+            statuses = []
+            for content in contents:
+                response = await client.post('/api/applications', data={**FORM, 'job_id': job_id},
+                                             files={'resume': ('cv.pdf', content, 'application/pdf')})
+                statuses.append(response.status_code)
+            return statuses
+
+    statuses = asyncio.run(scenario())
+    leftovers = [name for _, _, names in os.walk(tmp_path / 'blobs') for name in names
+                 if name.endswith('.part')]
+    return statuses, leftovers
+
+
+def test_rejects_non_pdf_and_empty_files(api, make_job, tmp_path):
+    statuses, leftovers = post_resumes(api, make_job, tmp_path, b'MZ\x90\x00' + b'0' * 1024, b'', pdf(1024))
+    assert statuses == [400, 400, 200]
+    assert leftovers == []
+
+
+def test_size_limit_is_enforced_while_streaming(api, make_job, tmp_path, monkeypatch):
+    # Тело меньше запаса на поля формы: отказ даёт потоковая проверка, а не Content-Length
+    monkeypatch.setattr(settings, 'MAX_UPLOAD_SIZE', 4096)
+    statuses, leftovers = post_resumes(api, make_job, tmp_path, pdf(8192), pdf(1024))
+    assert statuses == [413, 200]
+    assert leftovers == []
+
+
+def test_oversized_body_is_rejected_before_parsing(api, make_job, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'MAX_UPLOAD_SIZE', 4096)
+    statuses, _ = post_resumes(api, make_job, tmp_path, pdf(256 * 1024))
+    assert statuses == [413]
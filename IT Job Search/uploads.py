@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+import os
+from typing import Tuple
+
+from fastapi import UploadFile
+
+from confiq import settings
+
+PDF_MAGIC = b'%PDF-'
+
+
+class UploadError(Exception):
+    """Загрузка отклонена; status_code — код ответа HTTP"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class StoredUpload:
+    """Сохранённый файл: путь, размер и SHA-256 содержимого"""
+
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+async def stream_pdf_upload(
+    upload: UploadFile,
+    part_path: str,
+    max_size: int = None,
+    chunk_size: int = None,
+) -> Tuple[int, str]:
+    """Потоково записать загруженный PDF в part_path.
+
+    Файл читается кусками по chunk_size и пишется в потоке (open/write не
+    блокируют event loop), поэтому в памяти одновременно не больше одного
+    куска. Первый кусок проверяется на сигнатуру %PDF-, размер — на
+    каждом куске: загрузка больше max_size прерывается, не дописываясь.
+    При любой ошибке part_path удаляется. Возвращает (размер, SHA-256).
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    digest = hashlib.sha256()
+    size = 0
+
+    f = await asyncio.to_thread(open, part_path, 'wb')
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            if size == 0 and not chunk.startswith(PDF_MAGIC):
+                raise UploadError(400, "Файл не является PDF")
+            size += len(chunk)
+            if size > max_size:
+                raise UploadError(
+                    413, f"Файл больше {max_size // (1024 * 1024)} МБ"
+                )
+            digest.update(chunk)
+            await asyncio.to_thread(f.write, chunk)
+
+        if size == 0:
+            raise UploadError(400, "Пустой файл")
+        await asyncio.to_thread(f.close)
+    except BaseException:
+        await asyncio.to_thread(_discard, f, part_path)
+        raise
+
+    return size, digest.hexdigest()
+
+
+def _discard(f, part_path: str):
+    f.close()
+    try:
+        os.remove(part_path)
+    except FileNotFoundError:
+        pass